@@ -0,0 +1,103 @@
+import time
+import click
+import numpy as np
+import pandas as pd
+import pandera as pa
+from src.data_io import infer_format, read_table
+from src.validation import get_taxi_data_schema, NativeSchemaValidator, read_taxi_csv
+
+
+def resample_frame(df, n_rows, random_state=123):
+    """
+    Draws a sample of the given size with replacement, so that sizes larger than the
+    source frame can be benchmarked.
+
+    Args:
+        df (pd.DataFrame): The source frame.
+        n_rows (int): Number of rows to draw.
+        random_state (int): Seed for the row draw. Defaults to 123.
+
+    Returns:
+        pd.DataFrame: The resampled frame with a fresh RangeIndex.
+    """
+    rng = np.random.default_rng(random_state)
+    positions = rng.integers(0, len(df), size=n_rows)
+    return df.iloc[positions].reset_index(drop=True)
+
+
+def time_backends(df, repeats=1):
+    """
+    Times one schema evaluation of the frame with the pandera and native backends.
+
+    Args:
+        df (pd.DataFrame): The frame to validate.
+        repeats (int): Number of timed runs per backend; the fastest one is kept. Defaults to 1.
+
+    Returns:
+        dict: Seconds per backend and the number of invalid rows each one found.
+    """
+    schema = get_taxi_data_schema()
+    native = NativeSchemaValidator(schema)
+
+    def run_pandera():
+        try:
+            schema.validate(df, lazy=True)
+            return None
+        except pa.errors.SchemaErrors as e:
+            return e.failure_cases["index"].dropna().unique()
+
+    results = {}
+    for name, run in [
+        ("pandera", run_pandera),
+        ("native", lambda: df.index[~native.validate(df).valid]),
+    ]:
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            invalid = run()
+            timings.append(time.perf_counter() - start)
+        results[name] = min(timings)
+        results[f"{name}_invalid"] = 0 if invalid is None else len(invalid)
+    return results
+
+
+@click.command()
+@click.option('--data-path', type=str, default="data/raw/yellow_tripdata_2024-01.parquet",
+              help="Sampled trip data to resample from")
+@click.option('--sizes', type=str, default="30000,1000000,10000000",
+              help="Comma-separated row counts to benchmark")
+@click.option('--repeats', type=int, default=1, help="Timed runs per backend and size")
+def main(data_path, sizes, repeats):
+    """
+    Benchmarks the pandera and native schema validation backends.
+
+    The trip data is resampled with replacement to each requested size, and both
+    backends validate the same frame. Prints wall time, throughput and the number
+    of invalid rows found per backend, so the two can be checked for agreement.
+
+    Args:
+        data_path (str): Path to the trip data to resample.
+        sizes (str): Comma-separated row counts.
+        repeats (int): Timed runs per backend and size; the fastest is reported.
+    """
+    # CSV sources go through the typed reader, as in the pipeline, so that string
+    # parsing is not part of the timed schema evaluation
+    source = read_taxi_csv(data_path) if infer_format(data_path) == "csv" else read_table(data_path)
+    rows = []
+    for n_rows in [int(size) for size in sizes.split(",")]:
+        df = resample_frame(source, n_rows)
+        results = time_backends(df, repeats)
+        rows.append({
+            "rows": n_rows,
+            "pandera_s": round(results["pandera"], 3),
+            "native_s": round(results["native"], 3),
+            "speedup": round(results["pandera"] / results["native"], 1),
+            "native_rows_per_s": int(n_rows / results["native"]),
+            "invalid_rows_match": results["pandera_invalid"] == results["native_invalid"],
+        })
+        click.echo(f"Benchmarked {n_rows} rows.")
+    click.echo(pd.DataFrame(rows).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,175 @@
+import os
+import shutil
+import tempfile
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 import click
+from src.data_io import DataCache, DEFAULT_CACHE_DIR, FORMAT_EXTENSIONS, infer_format, write_table
+
+MONTHLY_URL_TEMPLATE = "https://d37ci6vzurychx.cloudfront.net/trip-data/yellow_tripdata_{month}.parquet"
+
+
+@contextmanager
+def _local_parquet(data_set_link):
+    """Yields a local, seekable path for a parquet file.
+
+    Parquet readers need random access to the file footer, so remote files are
+    spooled to a temporary file in fixed-size chunks instead of being held in memory.
+    Args:
+        data_set_link (str): URL or file path to the parquet dataset.
+    Yields:
+        str: Path to a local copy of the parquet file.
+    """
+    if "://" not in data_set_link or data_set_link.startswith("file://"):
+        yield data_set_link.removeprefix("file://")
+        return
+
+    fd, tmp_path = tempfile.mkstemp(suffix=".parquet")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file, urllib.request.urlopen(data_set_link) as response:
+            shutil.copyfileobj(response, tmp_file, length=1 << 20)
+        yield tmp_path
+    finally:
+        os.remove(tmp_path)
+
+
+def reservoir_sample_parquet(parquet_path, sample_size, random_state=123, batch_size=65536):
+    """Draws a uniform random sample from a parquet file one batch at a time.
+
+    Every row is given a seeded uniform key and the rows with the smallest keys
+    are kept, so peak memory is bounded by the sample plus one batch no matter
+    how large the file is. The keys are drawn in file order, so the sample only
+    depends on the file and the seed, not on the batch size.
+    Args:
+        parquet_path (str): Local path to the parquet file.
+        sample_size (int): Number of rows to sample.
+        random_state (int, optional): Seed for random sampling. Defaults to 123.
+        batch_size (int, optional): Rows decoded per batch. Defaults to 65536.
+    Returns:
+        pd.DataFrame: The sampled rows.
+    Raises:
+        ValueError: If the file has fewer rows than `sample_size`.
+    """
+    rng = np.random.default_rng(random_state)
+    parquet_file = pq.ParquetFile(parquet_path)
+    if parquet_file.metadata.num_rows < sample_size:
+        raise ValueError(
+            f"Cannot take a sample of {sample_size} rows from {parquet_file.metadata.num_rows} rows."
+        )
+
+    kept = parquet_file.schema_arrow.empty_table()
+    kept_keys = np.empty(0)
+    for batch in parquet_file.iter_batches(batch_size=batch_size):
+        table = pa.concat_tables([kept, pa.Table.from_batches([batch])])
+        keys = np.concatenate([kept_keys, rng.random(batch.num_rows)])
+        if table.num_rows > sample_size:
+            keep = np.argpartition(keys, sample_size)[:sample_size]
+            table, keys = table.take(keep), keys[keep]
+        kept, kept_keys = table, keys
+
+    order = np.argsort(kept_keys, kind="stable")
+    return kept.take(order).to_pandas()
+
+
+def month_links(start_month, end_month, template=MONTHLY_URL_TEMPLATE):
+    """Expands an inclusive month range into monthly parquet links.
+    Args:
+        start_month (str): First month, formatted as YYYY-MM.
+        end_month (str): Last month, formatted as YYYY-MM.
+        template (str, optional): Link template with a `{month}` placeholder.
+            Defaults to the NYC TLC yellow taxi trip data URL.
+    Returns:
+        list[str]: One link per month, in calendar order.
+    """
+    months = pd.period_range(start_month, end_month, freq="M")
+    return [template.format(month=str(month)) for month in months]
+
+
+def _parse_months(ctx, param, value):
+    """Parses --months into a (first, last) month pair; a single month is a one-month range."""
+    if value is None:
+        return None
+    bounds = value.split(":")
+    if len(bounds) == 1:
+        bounds *= 2
+    try:
+        # Months must be written as YYYY-MM; pandas would also read words such as "january"
+        if len(bounds) != 2 or any(str(pd.Period(bound, freq="M")) != bound for bound in bounds):
+            raise ValueError(value)
+    except ValueError:
+        raise click.BadParameter(f"expected a month or a month range such as 2024-01:2024-12, got '{value}'")
+    return tuple(bounds)
 
-def download_and_save_data(data_set_link, output_csv, sample_size=30000, random_state=123):
-    """Downloads and saves a sample from a parquet dataset to a CSV file.
+
+def _month_quotas(sample_size, n_months):
+    """Splits the total sample size evenly across months, giving the remainder to the earliest months."""
+    base, remainder = divmod(sample_size, n_months)
+    return [base + (i < remainder) for i in range(n_months)]
+
+
+def _month_seeds(random_state, n_months):
+    """Derives an independent, reproducible seed for every month from a single seed."""
+    children = np.random.SeedSequence(random_state).spawn(n_months)
+    return [int(child.generate_state(1)[0]) for child in children]
+
+
+def _read_sample(data_set_link, sample_size, random_state, streaming, batch_size):
+    """Reads a single parquet dataset and returns a random sample of its rows."""
+    if streaming:
+        with _local_parquet(data_set_link) as parquet_path:
+            return reservoir_sample_parquet(parquet_path, sample_size, random_state, batch_size)
+    return pd.read_parquet(data_set_link).sample(sample_size, random_state=random_state)
+
+
+def _sample_parquet(data_set_link, sample_size, random_state, streaming, batch_size, cache_dir):
+    """Samples a single parquet dataset, reusing cached downloads and samples when possible."""
+    if cache_dir is None:
+        return _read_sample(data_set_link, sample_size, random_state, streaming, batch_size)
+
+    cache = DataCache(cache_dir)
+    parquet_path = cache.fetch(data_set_link)
+    return cache.load_frame(
+        parquet_path,
+        lambda: _read_sample(parquet_path, sample_size, random_state, streaming, batch_size),
+        sample_size=sample_size,
+        random_state=random_state,
+        streaming=streaming,
+    )
+
+
+def _save_sample(df, output_csv, output_format):
+    """Writes the sampled data and prints a short summary."""
+    output_path = write_table(df, output_csv, output_format or infer_format(output_csv))
+    print(f"Data saved to {output_path}")
+    print(f"Data shape: {df.shape}")
+    print(df.head(2))
+
+
+def download_and_save_data(data_set_link, output_csv, sample_size=30000, random_state=123,
+                           streaming=False, batch_size=65536, cache_dir=None,
+                           output_format=None):
+    """Downloads and saves a sample from a parquet dataset to a file.
     This function reads a parquet file from a provided URL, takes a random sample,
-    and saves it as a CSV file. It also prints information about the saved data.
+    and saves it as Parquet, Arrow IPC or CSV. It also prints information about the saved data.
     Args:
         data_set_link (str): URL or file path to the parquet dataset.
-        output_csv (str): File path where the CSV will be saved.
+        output_csv (str): File path where the sample will be saved.
         sample_size (int, optional): Number of rows to sample. Defaults to 30000.
         random_state (int, optional): Seed for random sampling. Defaults to 123.
+        streaming (bool, optional): Read the file batch by batch and reservoir sample it
+            instead of loading the whole file. Defaults to False, since the reservoir draws
+            other rows than pandas' `sample` for the same seed.
+        batch_size (int, optional): Rows decoded per batch in streaming mode. Defaults to 65536.
+        cache_dir (str, optional): Directory of the download and sample cache. Defaults to
+            None, no caching; the command line passes "data/cache".
+        output_format (str, optional): One of "parquet", "ipc" or "csv". Inferred from the
+            extension of `output_csv` when omitted.
     Returns:
         None
     Prints:
@@ -19,28 +178,107 @@ def download_and_save_data(data_set_link, output_csv, sample_size=30000, random_
         - First two rows of the dataset
     """
     
-    df = pd.read_parquet(data_set_link).sample(sample_size, random_state=random_state)
-    df.to_csv(output_csv, index=False)
-    print(f"Data saved to {output_csv}")
-    print(f"Data shape: {df.shape}")
-    print(df.head(2))
+    df = _sample_parquet(data_set_link, sample_size, random_state, streaming, batch_size, cache_dir)
+    _save_sample(df, output_csv, output_format)
+
+
+def download_and_save_months(data_set_links, output_csv, sample_size=30000, random_state=123,
+                             streaming=True, batch_size=65536, max_workers=None,
+                             cache_dir=None, output_format=None):
+    """Samples several monthly parquet datasets in parallel and saves them as one file.
+    Every month is read and sampled in its own worker process with a fixed row quota
+    and a seed derived from `random_state`, and the samples are merged in the order
+    of `data_set_links`. The output is therefore the same for any number of workers.
+    Args:
+        data_set_links (list[str]): URLs or file paths to the monthly parquet datasets.
+        output_csv (str): File path where the sample will be saved.
+        sample_size (int, optional): Total number of rows to sample across all months,
+            split evenly between them. Defaults to 30000.
+        random_state (int, optional): Seed the per-month seeds are derived from. Defaults to 123.
+        streaming (bool, optional): Reservoir sample each month batch by batch. Defaults to True.
+        batch_size (int, optional): Rows decoded per batch in streaming mode. Defaults to 65536.
+        max_workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+        cache_dir (str, optional): Directory of the download and sample cache. Defaults to
+            None, no caching; the command line passes "data/cache".
+        output_format (str, optional): One of "parquet", "ipc" or "csv". Inferred from the
+            extension of `output_csv` when omitted.
+    Returns:
+        None
+    """
+    n_months = len(data_set_links)
+    quotas = _month_quotas(sample_size, n_months)
+    seeds = _month_seeds(random_state, n_months)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        samples = list(executor.map(
+            _sample_parquet,
+            data_set_links,
+            quotas,
+            seeds,
+            [streaming] * n_months,
+            [batch_size] * n_months,
+            [cache_dir] * n_months,
+        ))
+
+    df = pd.concat(samples, ignore_index=True)
+    _save_sample(df, output_csv, output_format)
 
 @click.command()
 @click.option('--data-set-link', '-d', 
-              default="https://d37ci6vzurychx.cloudfront.net/trip-data/yellow_tripdata_2024-01.parquet",
-              help='URL or file path to the parquet dataset')
-@click.option('--output-csv', '-o', 
-              default='data/raw/yellow_tripdata_2024-01.csv',
-              help='File path where the CSV will be saved')
+              multiple=True,
+              default=["https://d37ci6vzurychx.cloudfront.net/trip-data/yellow_tripdata_2024-01.parquet"],
+              help='URL or file path to the parquet dataset; repeat to sample several months')
+@click.option('--months', '-m',
+              default=None,
+              callback=_parse_months,
+              help='Month such as 2024-01, or inclusive month range such as 2024-01:2024-12, '
+                   'used instead of --data-set-link')
+@click.option('--output', '--output-csv', '-o', 'output_csv',
+              default='data/raw/yellow_tripdata_2024-01.parquet',
+              help='File path where the sample will be saved')
+@click.option('--output-format', '-f',
+              type=click.Choice(list(FORMAT_EXTENSIONS)),
+              default=None,
+              help='Output format; inferred from the output extension by default')
 @click.option('--sample-size', '-n', 
               default=30000, 
               help='Number of rows to sample')
 @click.option('--random-state', '-r', 
               default=123, 
               help='Seed for random sampling')
-def main(data_set_link, output_csv, sample_size, random_state):
-    """Download and sample data from a parquet file and save to CSV."""
-    download_and_save_data(data_set_link, output_csv, sample_size, random_state)
+@click.option('--streaming/--no-streaming',
+              default=None,
+              help='Reservoir sample the parquet files one batch at a time. Defaults to streaming when '
+                   'sampling several months, which would otherwise each be loaded whole, and to '
+                   'pandas sampling for a single file, which keeps the rows drawn for a given seed')
+@click.option('--batch-size',
+              default=65536,
+              help='Rows decoded per batch in streaming mode')
+@click.option('--workers', '-w',
+              default=None,
+              type=int,
+              help='Worker processes used when sampling several months')
+@click.option('--cache-dir',
+              default=DEFAULT_CACHE_DIR,
+              help='Directory of the download and sample cache')
+@click.option('--no-cache',
+              is_flag=True,
+              help='Always download and sample again')
+def main(data_set_link, months, output_csv, output_format, sample_size, random_state, streaming, batch_size,
+         workers, cache_dir, no_cache):
+    """Download and sample data from a parquet file and save it for the pipeline."""
+    data_set_links = month_links(*months) if months else list(data_set_link)
+    cache_dir = None if no_cache else cache_dir
+    if streaming is None:
+        streaming = len(data_set_links) > 1
+    if len(data_set_links) == 1:
+        download_and_save_data(data_set_links[0], output_csv, sample_size, random_state,
+                               streaming=streaming, batch_size=batch_size, cache_dir=cache_dir,
+                               output_format=output_format)
+    else:
+        download_and_save_months(data_set_links, output_csv, sample_size, random_state,
+                                 streaming=streaming, batch_size=batch_size, max_workers=workers,
+                                 cache_dir=cache_dir, output_format=output_format)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -5,6 +5,8 @@ import numpy as np
 import pandas as pd
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
+from src.charts import ChartRenderer, DEFAULT_CHART_CACHE_DIR, RENDER_FORMATS
+from src.data_io import read_table
 
 @click.command()
 @click.option('--x-train-path', type=str, help="Path to X training data")
@@ -12,36 +14,48 @@ from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
 @click.option('--x-test-path', type=str, help="Path to X testing data")
 @click.option('--y-test-path', type=str, help="Path to y testing data")
 @click.option('--charts-dir', type=str, default="charts", help="Directory to save charts")
-def main(x_train_path, y_train_path, x_test_path, y_test_path, charts_dir='charts'):
+@click.option('--render-workers', type=int, default=None, help="Processes rendering the charts. Defaults to one per CPU.")
+@click.option('--chart-format', 'chart_formats', multiple=True, type=click.Choice(list(RENDER_FORMATS)),
+              help="Chart format to write; repeat for several. Defaults to png.")
+@click.option('--chart-cache-dir', type=str, default=DEFAULT_CHART_CACHE_DIR,
+              help="Directory of the rendered chart cache; empty to disable it.")
+def main(x_train_path, y_train_path, x_test_path, y_test_path, charts_dir='charts', render_workers=None,
+         chart_formats=(), chart_cache_dir=DEFAULT_CHART_CACHE_DIR):
     """
     Fits a simple linear regression model onto the training data and evaluates it on the test data.
     
     This function does the following steps:
-    1. Loads the training and testing data from the CSV files.
+    1. Loads the training and testing data from Parquet, Arrow IPC or CSV files.
     2. Fits a linear regression model using the training data.
     3. Makes predictions on the test data.
     4. Calculates and prints regression metrics (RMSE, R², MAE).
-    5. Generates and saves charts to visualize the regression results and performance metrics.
+    5. Generates charts to visualize the regression results and performance metrics, and renders
+       them together on a process pool.
     
     Args:
-        x_train_path (str): Path to the X training data CSV file.
-        y_train_path (str): Path to the y training data CSV file.
-        x_test_path (str): Path to the X testing data CSV file.
-        y_test_path (str): Path to the y testing data CSV file.
+        x_train_path (str): Path to the X training data file.
+        y_train_path (str): Path to the y training data file.
+        x_test_path (str): Path to the X testing data file.
+        y_test_path (str): Path to the y testing data file.
         charts_dir (str): Directory to save the generated charts. Defaults to 'charts'.
+        render_workers (int): Processes rendering the charts. Defaults to one per CPU.
+        chart_formats (tuple): Formats written for every chart. Defaults to png.
+        chart_cache_dir (str): Directory of the rendered chart cache, so unchanged charts are copied
+            rather than rendered again. Defaults to 'data/cache/charts'; empty disables it.
     """
     os.makedirs(charts_dir, exist_ok=True)
     
     try:
-        X_train = pd.read_csv(x_train_path)['trip_distance'].values.reshape(-1,1)
-        y_train = pd.read_csv(y_train_path)['fare_amount'].values
-        X_test = pd.read_csv(x_test_path)['trip_distance'].values.reshape(-1,1)
-        y_test = pd.read_csv(y_test_path)['fare_amount'].values
+        X_train = read_table(x_train_path, columns=['trip_distance'])['trip_distance'].values.reshape(-1,1)
+        y_train = read_table(y_train_path, columns=['fare_amount'])['fare_amount'].values
+        X_test = read_table(x_test_path, columns=['trip_distance'])['trip_distance'].values.reshape(-1,1)
+        y_test = read_table(y_test_path, columns=['fare_amount'])['fare_amount'].values
     except FileNotFoundError as e:
         click.echo(f"Error: {e}", err=True)
         raise SystemExit(1)
     
     np.random.seed(552)
+    renderer = ChartRenderer(render_workers, list(chart_formats), cache_dir=chart_cache_dir or None)
 
     # Fit our Linear Regression Model
     model = LinearRegression()
@@ -70,7 +84,7 @@ def main(x_train_path, y_train_path, x_test_path, y_test_path, charts_dir='chart
     )
 
     formula_svg_path = os.path.join(charts_dir, "Regression_Formula_Text.png")
-    formula_chart.save(formula_svg_path)
+    renderer.save(formula_chart, formula_svg_path)
     print(f"Regression formula saved to {formula_svg_path}.")
     
     print(test_predictions)
@@ -106,7 +120,7 @@ def main(x_train_path, y_train_path, x_test_path, y_test_path, charts_dir='chart
     )
 
     metrics_svg_path = os.path.join(charts_dir, "Regression_Performance_Metrics.png")
-    metrics_chart.save(metrics_svg_path)
+    renderer.save(metrics_chart, metrics_svg_path)
     print(f"Regression performance metrics saved to {metrics_svg_path}.")
 
     error_scatter = alt.Chart(test_predictions).mark_circle(size=60, opacity=0.3).encode(
@@ -129,7 +143,7 @@ def main(x_train_path, y_train_path, x_test_path, y_test_path, charts_dir='chart
 
     combined_chart_path = os.path.join(charts_dir, "Pred_Vs_Actual.png")
 
-    combined_chart.save(combined_chart_path)
+    renderer.save(combined_chart, combined_chart_path)
     print(f"Error scatter and diagonal chart saved to {combined_chart_path}.")
 
     scatter_plot = alt.Chart(test_predictions).mark_circle().encode(
@@ -150,9 +164,12 @@ def main(x_train_path, y_train_path, x_test_path, y_test_path, charts_dir='chart
     
     final_chart_path = os.path.join(charts_dir, "Final_Linear_Regression.png")
 
-    final_chart.save(final_chart_path)
+    renderer.save(final_chart, final_chart_path)
     print(f"Final Linear Regression Chart saved to {final_chart_path}.")
 
+    renderer.render()
+    print(f"Chart render times:\n{renderer.report()}")
+
 if __name__ == "__main__":
     main()
 
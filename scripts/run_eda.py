@@ -4,26 +4,77 @@ import altair as alt
 from sklearn.model_selection import train_test_split
 import pandera as pa
 from src.validation.schema_postEDA import get_taxi_postEDA_data_schema
+from src.validation.dtypes import optimize_dtypes, memory_usage_mb
+from src.charts import (
+    DEFAULT_BINS, DEFAULT_CHART_CACHE_DIR, DEFAULT_MAX_ROWS, MISSING_VALUE_MODES, RENDER_FORMATS, TRANSFORM_MODES, ChartRenderer,
+    StreamingCorrelation, chart_transforms, kde_grid, null_rates, resolve_transform_mode,
+)
+from src.data_io import DataCache, DEFAULT_CACHE_DIR, DEFAULT_FORMAT, DuplicateIndex, FORMAT_EXTENSIONS, infer_format, iter_table, read_table, write_table
 import click
 
-# Enable VegaFusion for Altair
-#alt.data_transformers.enable("vegafusion")
-
 #temporarily run as python -m scripts.run_eda
 
+# Columns read by run-all and split-dataset: the numeric columns behind the summary statistics,
+# correlation plot and missing values heatmap, plus the trip times, which keep trips that differ
+# only in time from being dropped as duplicates. Duplicates are found over these columns, so
+# trips that differ only in store_and_fwd_flag count as one trip.
+EDA_COLUMNS = [
+    "VendorID", "tpep_pickup_datetime", "tpep_dropoff_datetime", "passenger_count", "trip_distance",
+    "RatecodeID", "PULocationID", "DOLocationID", "payment_type", "fare_amount", "extra", "mta_tax",
+    "tip_amount", "tolls_amount", "improvement_surcharge", "total_amount", "congestion_surcharge", "Airport_fee",
+]
+# Negative fares are dropped by the reader rather than after loading every row, so they are
+# left out of the density chart as well as the train/test split
+EDA_FILTERS = ("fare_amount >= 0",)
+
 class TaxiDataAnalyzer:
-    def __init__(self, file_path, charts_dir="charts"):
+    def __init__(self, file_path, charts_dir="charts", cache_dir=None, data_format=DEFAULT_FORMAT,
+                 processed_dir="data/processed", columns=None, filters=None, compact_dtypes=True, duplicate_index=None, renderer=None,
+                 transform_mode="pre-aggregate", max_rows=DEFAULT_MAX_ROWS):
         """
         Initialize the TaxiDataAnalyzer with the dataset file path and optional schema.
 
         Args:
-            file_path (str): Path to the CSV dataset.
+            file_path (str): Path to the Parquet, Arrow IPC or CSV dataset.
             schema (pa.DataFrameSchema, optional): Pandera schema for validation.
             charts_dir (str, optional): Directory to save all charts. Defaults to "charts".
+            cache_dir (str, optional): Directory of the parsed data cache. Defaults to None, no cache;
+                the CLI passes "data/cache".
+            data_format (str, optional): Format of the split files written for modeling
+                ('parquet', 'ipc' or 'csv'). Defaults to 'parquet'.
+            processed_dir (str, optional): Directory the split files are written to.
+                Defaults to "data/processed".
+            columns (list, optional): Columns to load. Defaults to all columns.
+            filters (list, optional): Row predicates such as "fare_amount >= 0", pushed down
+                into the Parquet/Arrow reader. Defaults to no filtering.
+            compact_dtypes (bool, optional): Downcast numeric columns after loading, sizing
+                numeric code columns such as VendorID by their allowed values, and store string
+                code columns such as store_and_fwd_flag as categoricals. Defaults to True.
+            duplicate_index (DuplicateIndex, optional): Row-hash index shared between analyzers
+                so rows already loaded from another file are dropped too. Defaults to a fresh
+                index per load.
+            renderer (ChartRenderer, optional): Saves the charts, possibly queuing them to be
+                rendered together on a process pool. Defaults to saving each chart immediately,
+                reusing exports cached under `cache_dir`/charts when the chart has not changed.
+            transform_mode (str, optional): 'pre-aggregate' evaluates the chart transforms with
+                VegaFusion and embeds only their output; 'inline' embeds the chart data as is.
+                Falls back to 'inline' when VegaFusion is not installed. Defaults to 'pre-aggregate'.
+            max_rows (int, optional): Most rows a chart may embed; a chart over the limit raises
+                alt.MaxRowsError before it is rendered. None disables the limit. Defaults to 5000.
         """
         self.file_path = file_path
+        self.data_format = data_format
+        self.processed_dir = processed_dir
+        self.columns = columns
+        self.filters = filters
+        self.compact_dtypes = compact_dtypes
+        self.duplicate_index = duplicate_index
         self.schema = get_taxi_postEDA_data_schema()
         self.charts_dir = charts_dir
+        self.renderer = renderer or ChartRenderer(cache_dir=os.path.join(cache_dir, "charts") if cache_dir else None)
+        self.transform_mode = resolve_transform_mode(transform_mode)
+        self.max_rows = max_rows
+        self.cache = DataCache(cache_dir) if cache_dir else None
         self.df = None
         self.train_df = None
         self.test_df = None
@@ -36,10 +87,34 @@ class TaxiDataAnalyzer:
         os.makedirs(self.charts_dir, exist_ok=True)
 
     def load_data(self):
-        """Load dataset from the specified file path."""
+        """
+        Load dataset from the specified file path.
+
+        Only `self.columns` are decoded, and `self.filters` are pushed down into the
+        Parquet/Arrow reader so row groups that cannot match are skipped.
+        """
         try:
-            self.df = pd.read_csv(self.file_path).drop_duplicates()
+            if self.cache is None:
+                df = read_table(self.file_path, columns=self.columns, filters=self.filters)
+            else:
+                local_path = self.cache.fetch(self.file_path)
+                if infer_format(local_path) == "csv":
+                    df = self.cache.load_frame(
+                        local_path,
+                        lambda: read_table(local_path, columns=self.columns, filters=self.filters),
+                        reader="read_csv",
+                        columns=self.columns,
+                        filters=self.filters,
+                    )
+                else:
+                    df = read_table(local_path, columns=self.columns, filters=self.filters)
+            # Duplicates are found from 64-bit row hashes rather than pandas' per-column tables
+            self.df = (self.duplicate_index or DuplicateIndex()).drop_duplicates(df)
             click.echo(f"Data loaded successfully from {self.file_path}.")
+            if self.compact_dtypes:
+                before = memory_usage_mb(self.df)
+                self.df = optimize_dtypes(self.df)
+                click.echo(f"Memory usage reduced from {before:.2f} MB to {memory_usage_mb(self.df):.2f} MB.")
         except FileNotFoundError:
             click.echo(f"File not found: {self.file_path}")
         except pd.errors.ParserError as e:
@@ -49,6 +124,10 @@ class TaxiDataAnalyzer:
         """
         Create and save a density chart for a given column.
 
+        The kernel density estimate is computed here on a fixed grid, and only the grid
+        is embedded in the chart, so the spec size and render time do not grow with the
+        number of rows.
+
         Args:
             column (str): The column name to plot.
             title (str, optional): Title of the chart. Defaults to "Density Chart".
@@ -57,12 +136,12 @@ class TaxiDataAnalyzer:
             print("Data not loaded. Please load data before creating charts.")
             return
 
+        density = kde_grid(self.df[column]).rename(columns={"value": column})
         chart = (
-            alt.Chart(self.df)
-            .transform_density(column, as_=[column, "density"])
+            alt.Chart(density)
             .mark_area()
             .encode(
-                x=alt.X(column, title=column.capitalize()),
+                x=alt.X(f"{column}:Q", title=column.capitalize()),
                 y=alt.Y("density:Q", title="Density"),
             )
             .properties(title=title, width=600, height=400)
@@ -70,11 +149,16 @@ class TaxiDataAnalyzer:
 
         # Save the chart as PNG
         file_path = os.path.join(self.charts_dir, f"{title.replace(' ', '_')}.png")
-        chart.save(file_path)
+        self._save_chart(chart, file_path)
         print(f"Density chart saved to {file_path}.")
 
     def filter_negative_fares(self):
-        """Filter out rows with negative fare amounts."""
+        """
+        Filter out rows with negative fare amounts.
+
+        The run-all command already drops them while reading, with its default
+        "fare_amount >= 0" filter, so this only removes rows loaded without it.
+        """
         if self.df is None:
             print("Data not loaded. Please load data before filtering.")
             return
@@ -104,16 +188,16 @@ class TaxiDataAnalyzer:
         print(f"Dataset split into {len(self.train_df)} training and {len(self.test_df)} test samples.")
         
         # Save split data directly from DataFrames
-        processed_dir = "data/processed"
-        os.makedirs(processed_dir, exist_ok=True)
+        os.makedirs(self.processed_dir, exist_ok=True)
         
         # Save only the required columns from the original DataFrames
-        self.train_df[["trip_distance"]].to_csv(os.path.join(processed_dir, "X_train.csv"), index=False)
-        self.train_df[["fare_amount"]].to_csv(os.path.join(processed_dir, "y_train.csv"), index=False)
-        self.test_df[["trip_distance"]].to_csv(os.path.join(processed_dir, "X_test.csv"), index=False)
-        self.test_df[["fare_amount"]].to_csv(os.path.join(processed_dir, "y_test.csv"), index=False)
+        extension = FORMAT_EXTENSIONS[self.data_format]
+        write_table(self.train_df[["trip_distance"]], os.path.join(self.processed_dir, f"X_train{extension}"), self.data_format)
+        write_table(self.train_df[["fare_amount"]], os.path.join(self.processed_dir, f"y_train{extension}"), self.data_format)
+        write_table(self.test_df[["trip_distance"]], os.path.join(self.processed_dir, f"X_test{extension}"), self.data_format)
+        write_table(self.test_df[["fare_amount"]], os.path.join(self.processed_dir, f"y_test{extension}"), self.data_format)
         
-        print(f"CSV files saved to {processed_dir}")
+        print(f"{self.data_format.upper()} files saved to {self.processed_dir}")
 
     def display_summary_statistics(self, subset="train"):
         """
@@ -139,13 +223,32 @@ class TaxiDataAnalyzer:
         print(f"Summary Statistics for {subset.capitalize()} Dataset:")
         return df.describe()
 
-    def visualize_missing_values(self, subset="train"):
+    def visualize_missing_values(self, subset="train", bins=DEFAULT_BINS, time_column=None, freq="D", mode="auto"):
         """
         Create and save a heatmap to visualize missing values.
 
+        In "rows" mode, the heatmap has one cell per row and column, marking whether
+        the value is missing, and is as wide as the number of rows. In "binned" mode,
+        it shows the share of missing values per column in bins of rows (or time
+        buckets), so it has a fixed size and at most `bins` cells per column whatever
+        the number of rows. "auto" keeps the per-row heatmap for frames of at most
+        `bins` rows and switches to the binned one for larger frames, or whenever
+        `time_column` is given.
+
+        With a chart row limit (`max_rows`), the number of row bins is lowered so that
+        bins x columns cells fit under it, so wide frames still get a binned heatmap.
+        Time buckets are not capped, since their number follows from `freq`.
+
         Args:
             subset (str, optional): Which subset to visualize ('train', 'test', or 'all'). Defaults to 'train'.
+            bins (int, optional): Most row bins. Defaults to 200.
+            time_column (str, optional): Datetime column to bucket rows by instead of
+                their position, e.g. 'tpep_pickup_datetime'. Defaults to None.
+            freq (str, optional): Bucket size for `time_column`, e.g. 'D' or 'h'. Defaults to 'D'.
+            mode (str, optional): 'rows', 'binned' or 'auto'. Defaults to 'auto'.
         """
+        if mode not in MISSING_VALUE_MODES:
+            raise ValueError(f"Unknown missing values mode '{mode}'; choose from {list(MISSING_VALUE_MODES)}.")
         if subset == "train":
             df = self.train_df
         elif subset == "test":
@@ -160,24 +263,44 @@ class TaxiDataAnalyzer:
             print(f"{subset.capitalize()} data not available.")
             return
 
-        # Create heatmap
-        missing_value_chart = (
-            alt.Chart(df.isna().reset_index().melt(id_vars="index"))
-            .mark_rect()
-            .encode(
-                alt.X("index:O").axis(None),
-                alt.Y("variable").title(None),
-                alt.Color("value").title("NaN"),
-                alt.Stroke("value"),
+        if self.max_rows:
+            bins = max(1, min(bins, self.max_rows // max(df.shape[1], 1)))
+        if mode == "auto":
+            mode = "rows" if time_column is None and len(df) <= bins else "binned"
+
+        if mode == "rows":
+            # Create heatmap with one cell per row and column
+            missing_value_chart = (
+                alt.Chart(df.isna().reset_index().melt(id_vars="index"))
+                .mark_rect()
+                .encode(
+                    alt.X("index:O").axis(None),
+                    alt.Y("variable").title(None),
+                    alt.Color("value").title("NaN"),
+                    alt.Stroke("value"),
+                )
+                .properties(width=df.shape[0])
+            )
+        else:
+            # Create heatmap of null rates per bin
+            rates = null_rates(df, bins=bins, time_column=time_column, freq=freq)
+            missing_value_chart = (
+                alt.Chart(rates)
+                .mark_rect()
+                .encode(
+                    alt.X("bin:O").axis(None) if time_column is None else alt.X("bin:T").title(time_column),
+                    alt.Y("variable").title(None),
+                    alt.Color("null_rate:Q").title("NaN rate").scale(domain=(0, 1)),
+                    alt.Tooltip(["variable", "bin", "null_rate", "rows"]),
+                )
+                .properties(width=600)
             )
-            .properties(width=df.shape[0])
-        )
 
         # Save the chart as PNG
         file_path = os.path.join(
             self.charts_dir, f"Missing_Values_Heatmap_{subset.capitalize()}.png"
         )
-        missing_value_chart.save(file_path)
+        self._save_chart(missing_value_chart, file_path)
         print(f"Missing values heatmap saved to {file_path}.")
 
     def create_correlation_plot(self, subset="train", method="spearman"):
@@ -207,7 +330,57 @@ class TaxiDataAnalyzer:
             print("No numerical columns available for correlation.")
             return
 
-        corr_matrix = numeric_df.corr(method=method).stack().reset_index(name="corr")
+        self._save_correlation_chart(numeric_df.corr(method=method), method, subset.capitalize())
+
+    def create_streaming_correlation_plot(self, method="spearman", file_paths=None, chunk_size=1_000_000,
+                                          columns=None):
+        """
+        Create and save a correlation plot of whole data files, read in chunks so that
+        a year of trips never has to fit in memory.
+
+        Pearson correlations are computed exactly from sums accumulated chunk by chunk.
+        Spearman correlations take a second pass, ranking each chunk through quantile
+        sketches of the columns, and are accurate to about 1e-3.
+
+        Args:
+            method (str, optional): Correlation method ('pearson' or 'spearman'). Defaults to 'spearman'.
+            file_paths (list, optional): Files to correlate, e.g. one per month. Defaults to `self.file_path`.
+            chunk_size (int, optional): Rows read at a time. Defaults to 1,000,000.
+            columns (list, optional): Numeric columns to correlate. Defaults to every numeric column.
+        """
+        if method not in ("pearson", "spearman"):
+            print("Invalid method specified. Choose from 'pearson' or 'spearman'.")
+            return
+        local_paths = [
+            self.cache.fetch(path) if self.cache else path for path in (file_paths or [self.file_path])
+        ]
+
+        def chunks():
+            for path in local_paths:
+                yield from iter_table(path, columns=self.columns, filters=self.filters, chunk_size=chunk_size)
+
+        engine = None
+        for chunk in chunks():
+            if engine is None:
+                engine = StreamingCorrelation(columns or list(chunk.select_dtypes(include="number").columns))
+            engine.update(chunk)
+        if engine is None or not engine.columns:
+            print("No numerical columns available for correlation.")
+            return
+
+        corr = engine.pearson() if method == "pearson" else engine.spearman(chunks())
+        self._save_correlation_chart(corr, method, "Full")
+
+    def _save_correlation_chart(self, corr, method, label):
+        """
+        Save a correlation matrix as a bubble chart.
+
+        Args:
+            corr (pd.DataFrame): Correlation matrix.
+            method (str): Correlation method, for the title and file name.
+            label (str): Name of the correlated data, for the title and file name.
+        """
+        corr_matrix = corr.stack().reset_index(name="corr")
         # Remove self-correlation
         corr_matrix = corr_matrix[corr_matrix["level_0"] != corr_matrix["level_1"]]
         corr_matrix["abs_corr"] = corr_matrix["corr"].abs()
@@ -228,7 +401,7 @@ class TaxiDataAnalyzer:
                 ).scale(scheme='redblue', domain=(-1, 1)),
             )
             .properties(
-                title=f"Correlation Plot ({method.capitalize()}) for {subset.capitalize()} Dataset",
+                title=f"Correlation Plot ({method.capitalize()}) for {label} Dataset",
                 width=600,
                 height=600,
             )
@@ -237,9 +410,9 @@ class TaxiDataAnalyzer:
         # Save the chart as PNG
         file_path = os.path.join(
             self.charts_dir,
-            f"Correlation_Plot_{subset.capitalize()}_{method.capitalize()}.png",
+            f"Correlation_Plot_{label}_{method.capitalize()}.png",
         )
-        correlation_chart.save(file_path)
+        self._save_chart(correlation_chart, file_path)
         print(f"Correlation plot saved to {file_path}.")
 
     def validate_data_schema(self, subset="train"):
@@ -285,6 +458,24 @@ class TaxiDataAnalyzer:
             self.visualize_missing_values(subset="train")
             self.create_correlation_plot(subset="train")
             self.validate_data_schema(subset="train")
+        self.render_charts()
+
+    def _save_chart(self, chart, file_path):
+        """
+        Save a chart through the renderer, with the analyzer's transform mode and row limit.
+
+        Args:
+            chart (alt.Chart): The chart.
+            file_path (str): Output path.
+        """
+        with chart_transforms(self.transform_mode, self.max_rows):
+            self.renderer.save(chart, file_path)
+
+    def render_charts(self):
+        """Render the charts queued by the renderer and report how long each chart took."""
+        self.renderer.render()
+        if self.renderer.timings:
+            click.echo(f"Chart render times:\n{self.renderer.report()}")
 
 
 @click.group()
@@ -296,29 +487,50 @@ def cli():
 @cli.command()
 @click.argument('file_path', type=click.Path(exists=True))
 @click.option('--charts_dir', default="charts", help="Directory to save charts.")
-def run_all(file_path, charts_dir):
+@click.option('--cache_dir', default=DEFAULT_CACHE_DIR, help="Directory of the parsed data cache; empty to disable it.")
+@click.option('--data_format', default=DEFAULT_FORMAT, type=click.Choice(list(FORMAT_EXTENSIONS)), help="Format of the split files.")
+@click.option('--processed_dir', default="data/processed", help="Directory to save the split files.")
+@click.option('--columns', default=",".join(EDA_COLUMNS), help="Comma-separated columns to load; empty for all columns. Defaults to the columns the analysis uses.")
+@click.option('--filter', 'filters', multiple=True, default=EDA_FILTERS, help="Row predicate pushed into the reader. Defaults to 'fare_amount >= 0'.")
+@click.option('--render_workers', default=None, type=int, help="Processes rendering the charts. Defaults to one per CPU.")
+@click.option('--chart_format', 'chart_formats', multiple=True, type=click.Choice(list(RENDER_FORMATS)), help="Chart format to write; repeat for several. Defaults to png.")
+@click.option('--chart_cache_dir', default=DEFAULT_CHART_CACHE_DIR, help="Directory of the rendered chart cache; empty to disable it.")
+@click.option('--transform_mode', default="pre-aggregate", type=click.Choice(list(TRANSFORM_MODES)), help="Evaluate chart transforms with VegaFusion before rendering, or embed the chart data inline.")
+@click.option('--max_rows', default=DEFAULT_MAX_ROWS, type=int, help="Most rows a chart may embed; 0 disables the limit.")
+def run_all(file_path, charts_dir, cache_dir, data_format, processed_dir, columns, filters, render_workers, chart_formats, chart_cache_dir,
+            transform_mode, max_rows):
     """Run all analysis steps on the dataset."""
-    analyzer = TaxiDataAnalyzer(file_path, charts_dir)
+    analyzer = TaxiDataAnalyzer(file_path, charts_dir, cache_dir=cache_dir or None, data_format=data_format,
+                                processed_dir=processed_dir, columns=columns.split(",") if columns else None,
+                                filters=list(filters),
+                                renderer=ChartRenderer(render_workers, list(chart_formats),
+                                                       cache_dir=chart_cache_dir or None),
+                                transform_mode=transform_mode, max_rows=max_rows or None)
     analyzer.run_all()
 
 
 @cli.command()
 @click.argument('file_path', type=click.Path(exists=True))
 @click.option('--charts_dir', default="charts", help="Directory to save charts.")
-def load(file_path, charts_dir):
+@click.option('--cache_dir', default=DEFAULT_CACHE_DIR, help="Directory of the parsed data cache; empty to disable it.")
+@click.option('--columns', default=None, help="Comma-separated columns to load. Defaults to all columns.")
+@click.option('--filter', 'filters', multiple=True, help="Row predicate pushed into the reader, e.g. 'fare_amount >= 0'.")
+def load(file_path, charts_dir, cache_dir, columns, filters):
     """Load the dataset."""
-    analyzer = TaxiDataAnalyzer(file_path, charts_dir)
+    analyzer = TaxiDataAnalyzer(file_path, charts_dir, cache_dir=cache_dir or None,
+                                columns=columns.split(",") if columns else None, filters=list(filters))
     analyzer.load_data()
 
 
 @cli.command()
 @click.argument('file_path', type=click.Path(exists=True))
 @click.option('--charts_dir', default="charts", help="Directory to save charts.")
+@click.option('--cache_dir', default=DEFAULT_CACHE_DIR, help="Directory of the parsed data cache; empty to disable it.")
 @click.option('--column', required=True, help="Column to plot.")
 @click.option('--title', default="Density Chart", help="Title of the density chart.")
-def create_density_chart(file_path, charts_dir, column, title):
+def create_density_chart(file_path, charts_dir, cache_dir, column, title):
     """Create a density chart for a specified column."""
-    analyzer = TaxiDataAnalyzer(file_path, charts_dir)
+    analyzer = TaxiDataAnalyzer(file_path, charts_dir, cache_dir=cache_dir or None)
     analyzer.load_data()
     analyzer.create_density_chart(column, title)
 
@@ -326,9 +538,10 @@ def create_density_chart(file_path, charts_dir, column, title):
 @cli.command()
 @click.argument('file_path', type=click.Path(exists=True))
 @click.option('--charts_dir', default="charts", help="Directory to save charts.")
-def filter_negative_fares(file_path, charts_dir):
+@click.option('--cache_dir', default=DEFAULT_CACHE_DIR, help="Directory of the parsed data cache; empty to disable it.")
+def filter_negative_fares(file_path, charts_dir, cache_dir):
     """Filter out rows with negative fare amounts."""
-    analyzer = TaxiDataAnalyzer(file_path, charts_dir)
+    analyzer = TaxiDataAnalyzer(file_path, charts_dir, cache_dir=cache_dir or None)
     analyzer.load_data()
     analyzer.filter_negative_fares()
 
@@ -336,9 +549,16 @@ def filter_negative_fares(file_path, charts_dir):
 @cli.command()
 @click.argument('file_path', type=click.Path(exists=True))
 @click.option('--charts_dir', default="charts", help="Directory to save charts.")
-def split_dataset(file_path, charts_dir):
-    """Split the dataset into training and testing sets."""
-    analyzer = TaxiDataAnalyzer(file_path, charts_dir)
+@click.option('--cache_dir', default=DEFAULT_CACHE_DIR, help="Directory of the parsed data cache; empty to disable it.")
+@click.option('--data_format', default=DEFAULT_FORMAT, type=click.Choice(list(FORMAT_EXTENSIONS)), help="Format of the split files.")
+@click.option('--processed_dir', default="data/processed", help="Directory to save the split files.")
+@click.option('--columns', default=",".join(EDA_COLUMNS), help="Comma-separated columns to load; empty for all columns. Defaults to the columns run-all loads.")
+@click.option('--filter', 'filters', multiple=True, default=EDA_FILTERS, help="Row predicate pushed into the reader. Defaults to 'fare_amount >= 0', as in run-all.")
+def split_dataset(file_path, charts_dir, cache_dir, data_format, processed_dir, columns, filters):
+    """Split the dataset into training and testing sets, from the same rows as run-all."""
+    analyzer = TaxiDataAnalyzer(file_path, charts_dir, cache_dir=cache_dir or None, data_format=data_format,
+                                processed_dir=processed_dir, columns=columns.split(",") if columns else None,
+                                filters=list(filters))
     analyzer.load_data()
     analyzer.split_dataset()
 
@@ -346,12 +566,28 @@ def split_dataset(file_path, charts_dir):
 @cli.command()
 @click.argument('file_path', type=click.Path(exists=True))
 @click.option('--charts_dir', default="charts", help="Directory to save charts.")
+@click.option('--cache_dir', default=DEFAULT_CACHE_DIR, help="Directory of the parsed data cache; empty to disable it.")
 @click.option('--subset', default="train", type=click.Choice(['train', 'test', 'all']), help="Subset of the data to validate.")
-def validate_schema(file_path, charts_dir, subset):
+def validate_schema(file_path, charts_dir, cache_dir, subset):
     """Validate the data schema."""
-    analyzer = TaxiDataAnalyzer(file_path, charts_dir)
+    analyzer = TaxiDataAnalyzer(file_path, charts_dir, cache_dir=cache_dir or None)
     analyzer.load_data()
     analyzer.validate_data_schema(subset)
 
+
+@cli.command()
+@click.argument('file_paths', nargs=-1, required=True, type=click.Path(exists=True))
+@click.option('--charts_dir', default="charts", help="Directory to save charts.")
+@click.option('--cache_dir', default=DEFAULT_CACHE_DIR, help="Directory of the parsed data cache; empty to disable it.")
+@click.option('--method', default="spearman", type=click.Choice(['pearson', 'spearman']), help="Correlation method.")
+@click.option('--chunk_size', default=1_000_000, type=int, help="Rows read at a time.")
+@click.option('--columns', default=None, help="Comma-separated numeric columns to correlate. Defaults to all numeric columns.")
+@click.option('--filter', 'filters', multiple=True, help="Row predicate pushed into the reader, e.g. 'fare_amount >= 0'.")
+def streaming_correlation_plot(file_paths, charts_dir, cache_dir, method, chunk_size, columns, filters):
+    """Create a correlation plot of one or more files without loading them into memory."""
+    analyzer = TaxiDataAnalyzer(file_paths[0], charts_dir, cache_dir=cache_dir or None, filters=list(filters))
+    analyzer.create_streaming_correlation_plot(method, list(file_paths), chunk_size,
+                                               columns=columns.split(",") if columns else None)
+
 if __name__ == "__main__":
     cli()
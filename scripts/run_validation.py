@@ -5,6 +5,7 @@ import os
 import yaml
 import logging
 from src.validation.validate import DataValidator
+from src.data_io import write_table
 
 def load_config(config_path: str) -> dict:
     """
@@ -48,7 +49,8 @@ def main():
     config_path = os.path.join(project_root, "config", "validation_config.yaml")
     config = load_config(config_path)
     
-    data_path = config.get("data_path", "data/raw/yellow_tripdata_2024-01.csv")
+    data_path = config.get("data_path", "data/raw/yellow_tripdata_2024-01.parquet")
+    output_format = config.get("output_format", "parquet")
     delimiter = config.get("delimiter", ",")
     expected_columns = config.get("expected_columns", [
         "VendorID", "tpep_pickup_datetime", "tpep_dropoff_datetime",
@@ -58,15 +60,51 @@ def main():
         "tip_amount", "tolls_amount", "improvement_surcharge",
         "total_amount", "congestion_surcharge", "Airport_fee"
     ])
+    # Only the expected columns are decoded unless the config asks for more
+    columns = config.get("columns", expected_columns)
+    filters = config.get("filters", [])
     correlation_thresholds = config.get("correlation_thresholds", {})
     feature_label_threshold = correlation_thresholds.get("feature_label", 0.9)
     feature_feature_threshold = correlation_thresholds.get("feature_feature", 0.8)
+    chunk_size = config.get("chunk_size")
+    correlation_backend = config.get("correlation_backend", "deepchecks")
+    correlation_sample_size = config.get("correlation_sample_size", 100000)
+    pps_sample_size = config.get("pps_sample_size", 5000)
+    quarantine_dir = config.get("quarantine_dir")
+    if quarantine_dir:
+        quarantine_dir = os.path.join(project_root, quarantine_dir)
+    backend = config.get("validation_backend", "pandera")
+    executor = config.get("executor")
+    max_workers = config.get("max_workers")
+    parquet_config = config.get("parquet", {})
+    profiling_config = config.get("profiling", {})
+    cache_config = config.get("cache", {})
+    cache_dir = cache_config.get("dir", "data/cache") if cache_config.get("enabled", True) else None
+    incremental = cache_config.get("incremental", False)
+    convert_xlsx = cache_config.get("convert_xlsx", True)
     
     # Initialize the DataValidator with dynamic thresholds
     validator = DataValidator(
         target="VendorID",  # Adjust target as needed
         log_file=os.path.join(project_root, "logs", "validation_errors.log"),
-        correlation_log_file=os.path.join(project_root, "logs", "correlation_errors.log")
+        correlation_log_file=os.path.join(project_root, "logs", "correlation_errors.log"),
+        cache_dir=cache_dir,
+        chunk_size=chunk_size,
+        backend=backend,
+        executor=executor,
+        max_workers=max_workers,
+        incremental=incremental,
+        correlation_backend=correlation_backend,
+        correlation_sample_size=correlation_sample_size,
+        pps_sample_size=pps_sample_size,
+        quarantine_dir=quarantine_dir,
+        profile=profiling_config.get("enabled", False),
+        flamegraph=profiling_config.get("flamegraph", False),
+        track_memory=profiling_config.get("track_memory", True),
+        use_threads=parquet_config.get("use_threads", True),
+        buffer_size=parquet_config.get("buffer_size", 0),
+        memory_map=parquet_config.get("memory_map", False),
+        convert_xlsx=convert_xlsx
     )
     validator.correlation_validator.feature_threshold = feature_label_threshold
     validator.correlation_validator.feature_feature_threshold = feature_feature_threshold
@@ -75,28 +113,22 @@ def main():
     try:
         validated_df = validator.run_validation(
             file_path=data_path,
-            expected_columns=expected_columns
+            expected_columns=expected_columns,
+            columns=columns,
+            filters=filters
         )
         print("Data validation passed successfully.")
     except ValueError as ve:
         print(f"Data validation failed: {ve}")
         sys.exit(1)
     
-    # Save the validated data based on the file format
-    file_extension = data_path.split(".")[-1].lower()
-    if file_extension == "csv":
-        validated_data_path = os.path.join(project_root, "data", "processed", "yellow_tripdata_2024-01_validated.csv")
-        validated_df.to_csv(validated_data_path, index=False)
-    elif file_extension == "parquet":
-        validated_data_path = os.path.join(project_root, "data", "processed", "yellow_tripdata_2024-01_validated.parquet")
-        validated_df.to_parquet(validated_data_path, engine='pyarrow', index=False)
-    elif file_extension == "xlsx":
-        validated_data_path = os.path.join(project_root, "data", "processed", "yellow_tripdata_2024-01_validated.xlsx")
+    # Save the validated data in the configured hand-off format
+    validated_data_path = os.path.join(project_root, "data", "processed", "yellow_tripdata_2024-01_validated")
+    if output_format == "xlsx":
+        validated_data_path += ".xlsx"
         validated_df.to_excel(validated_data_path, engine='openpyxl', index=False)
     else:
-        # This case should not occur due to prior checks
-        validated_data_path = os.path.join(project_root, "data", "processed", "yellow_tripdata_2024-01_validated.csv")
-        validated_df.to_csv(validated_data_path, index=False)
+        validated_data_path = write_table(validated_df, validated_data_path, output_format)
     
     print(f"Validated data saved to {validated_data_path}")
 
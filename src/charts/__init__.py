@@ -0,0 +1,27 @@
+from .correlation import CorrelationSums, DEFAULT_SKETCH_SIZE, QuantileSketch, StreamingCorrelation
+from .density import DEFAULT_STEPS, kde_grid, scott_bandwidth
+from .missing import DEFAULT_BINS, MISSING_VALUE_MODES, null_rates
+from .rendering import ChartRenderer, DEFAULT_CHART_CACHE_BYTES, DEFAULT_CHART_CACHE_DIR, RENDER_FORMATS
+from .transforms import DEFAULT_MAX_ROWS, TRANSFORM_MODES, chart_transforms, resolve_transform_mode, vegafusion_available
+
+__all__ = [
+    "chart_transforms",
+    "ChartRenderer",
+    "CorrelationSums",
+    "DEFAULT_BINS",
+    "DEFAULT_CHART_CACHE_BYTES",
+    "DEFAULT_CHART_CACHE_DIR",
+    "DEFAULT_MAX_ROWS",
+    "MISSING_VALUE_MODES",
+    "DEFAULT_SKETCH_SIZE",
+    "DEFAULT_STEPS",
+    "kde_grid",
+    "null_rates",
+    "QuantileSketch",
+    "RENDER_FORMATS",
+    "resolve_transform_mode",
+    "scott_bandwidth",
+    "StreamingCorrelation",
+    "TRANSFORM_MODES",
+    "vegafusion_available",
+]
@@ -0,0 +1,249 @@
+import numpy as np
+import pandas as pd
+
+# Items kept per level of a quantile sketch; the rank error shrinks roughly as 1 / size
+DEFAULT_SKETCH_SIZE = 2048
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch of one numeric column, in the style of KLL.
+
+    Values are kept in levels of sorted arrays, a value at level i standing for
+    2 ** i input values. When a level outgrows `size`, it is compacted: every
+    other value, from a random offset, moves up a level with twice the weight.
+    The total weight stays exact and ranks stay unbiased, while memory grows only
+    with the logarithm of the number of values. Sketches of different chunks,
+    months or workers merge by pooling their levels.
+    """
+
+    def __init__(self, size: int = DEFAULT_SKETCH_SIZE, random_state: int = None):
+        """
+        :param size: Values kept per level before it is compacted.
+        :param random_state: Seed of the compaction offsets.
+        """
+        self.size = size
+        self.levels = []
+        self._rng = np.random.default_rng(random_state)
+
+    @property
+    def count(self) -> int:
+        """Number of values summarized."""
+        return sum(len(level) << i for i, level in enumerate(self.levels))
+
+    def update(self, values) -> "QuantileSketch":
+        """
+        Adds values to the sketch; nulls are ignored.
+
+        :param values: Numeric values.
+        :return: The sketch.
+        """
+        values = np.asarray(values, dtype="float64")
+        self._add(0, values[~np.isnan(values)])
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """
+        Adds the values summarized by another sketch.
+
+        :param other: Sketch of other values.
+        :return: The sketch.
+        """
+        for i, level in enumerate(other.levels):
+            self._add(i, level)
+        return self
+
+    def _add(self, i: int, values: np.ndarray):
+        while len(values):
+            if i == len(self.levels):
+                self.levels.append(np.empty(0))
+            merged = np.sort(np.concatenate([self.levels[i], values]))
+            if len(merged) <= self.size:
+                self.levels[i] = merged
+                return
+            # An odd value out stays at this level, so every compacted pair keeps its weight
+            if len(merged) % 2:
+                kept = self._rng.integers(len(merged))
+                self.levels[i] = merged[kept:kept + 1]
+                merged = np.delete(merged, kept)
+            else:
+                self.levels[i] = np.empty(0)
+            values = merged[self._rng.integers(2)::2]
+            i += 1
+
+    def cdf(self, values) -> np.ndarray:
+        """
+        Estimates the mid-rank of values as a fraction of the count: the share of values
+        below, plus half the share equal to them, as average ranks treat ties.
+
+        :param values: Values to rank; nulls stay null.
+        :return: The fractional ranks, between 0 and 1.
+        """
+        values = np.asarray(values, dtype="float64")
+        below = np.zeros(len(values))
+        for i, level in enumerate(self.levels):
+            below += (np.searchsorted(level, values, "left") + np.searchsorted(level, values, "right")) * (1 << i)
+        ranks = below / (2 * max(self.count, 1))
+        ranks[np.isnan(values)] = np.nan
+        return ranks
+
+
+class CorrelationSums:
+    """
+    Pairwise-complete moment sums from which Pearson correlations are computed.
+
+    For every pair of columns it holds the count, sums, sums of squares and cross
+    products over the rows where both are present, as pandas' `corr` does. Values
+    are shifted by the mean of the first block seen, so the sums stay small and a
+    constant column has an exactly zero variance. The sums of different chunks add
+    up, once shifted alike, so partial results merge exactly.
+    """
+
+    def __init__(self, columns: list):
+        """
+        :param columns: Names of the columns, in the order of the values passed to `update`.
+        """
+        self.columns = list(columns)
+        shape = (len(self.columns),) * 2
+        self.shift = None
+        self.count, self.sum, self.sum_squares, self.cross = (np.zeros(shape) for _ in range(4))
+
+    def update(self, values: np.ndarray) -> "CorrelationSums":
+        """
+        Adds a block of rows.
+
+        :param values: A rows x columns float array; NaN marks missing values.
+        :return: The sums.
+        """
+        present = ~np.isnan(values)
+        if self.shift is None:
+            counts = present.sum(axis=0)
+            self.shift = np.where(counts > 0, np.nansum(values, axis=0) / np.maximum(counts, 1), 0.0)
+        mask = present.astype("float64")
+        filled = np.where(present, values - self.shift, 0.0)
+        self.count += mask.T @ mask
+        # [i, j] sums column i over the rows where column j is present too
+        self.sum += filled.T @ mask
+        self.sum_squares += (filled ** 2).T @ mask
+        self.cross += filled.T @ filled
+        return self
+
+    def merge(self, other: "CorrelationSums") -> "CorrelationSums":
+        """
+        Adds the sums of other rows of the same columns.
+
+        :param other: Sums of other rows.
+        :return: The sums.
+        """
+        if other.columns != self.columns:
+            raise ValueError(f"Cannot merge sums of columns {other.columns} into sums of columns {self.columns}.")
+        if other.shift is None:
+            return self
+        if self.shift is None:
+            self.shift = other.shift
+        # Re-express the other sums around this shift: x - a = (x - b) + (b - a)
+        delta = other.shift - self.shift
+        self.count += other.count
+        self.sum += other.sum + delta[:, None] * other.count
+        self.sum_squares += other.sum_squares + 2 * delta[:, None] * other.sum + delta[:, None] ** 2 * other.count
+        self.cross += (other.cross + other.sum * delta[None, :] + other.sum.T * delta[:, None]
+                       + np.outer(delta, delta) * other.count)
+        return self
+
+    def correlation(self) -> pd.DataFrame:
+        """
+        :return: The Pearson correlation matrix; pairs with fewer than two rows or a
+            constant column are null.
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            covariance = self.cross - self.sum * self.sum.T / self.count
+            variance = np.maximum(self.sum_squares - self.sum ** 2 / self.count, 0)
+            corr = covariance / np.sqrt(variance * variance.T)
+        corr[self.count < 2] = np.nan
+        return pd.DataFrame(np.clip(corr, -1, 1), index=self.columns, columns=self.columns)
+
+
+class StreamingCorrelation:
+    """
+    Pearson and approximate Spearman correlation matrices of data read chunk by chunk.
+
+    `update` accumulates the Pearson sums and a quantile sketch of every column.
+    Spearman's coefficient is the Pearson correlation of ranks, which depend on the
+    whole column, so it takes a second pass: once the sketches have seen every
+    chunk, `rank_sums` ranks each chunk through them and accumulates the Pearson
+    sums of the ranks. Both passes can be split by month or worker, the partial
+    results being combined with `merge` and `CorrelationSums.merge`.
+    """
+
+    def __init__(self, columns: list, sketch_size: int = DEFAULT_SKETCH_SIZE, random_state: int = 123):
+        """
+        :param columns: Numeric columns to correlate.
+        :param sketch_size: Values kept per level of the quantile sketches.
+        :param random_state: Seed of the sketches' compaction.
+        """
+        self.columns = list(columns)
+        self.sums = CorrelationSums(self.columns)
+        self.sketches = [
+            QuantileSketch(sketch_size, None if random_state is None else random_state + i)
+            for i in range(len(self.columns))
+        ]
+
+    def _values(self, df: pd.DataFrame) -> np.ndarray:
+        return df[self.columns].to_numpy(dtype="float64", na_value=np.nan)
+
+    def update(self, df: pd.DataFrame) -> "StreamingCorrelation":
+        """
+        Adds a chunk of rows.
+
+        :param df: Chunk holding the correlated columns.
+        :return: The engine.
+        """
+        values = self._values(df)
+        self.sums.update(values)
+        for sketch, column in zip(self.sketches, values.T):
+            sketch.update(column)
+        return self
+
+    def merge(self, other: "StreamingCorrelation") -> "StreamingCorrelation":
+        """
+        Adds the partial result of other rows, e.g. another month or worker.
+
+        :param other: Engine updated with other rows of the same columns.
+        :return: The engine.
+        """
+        self.sums.merge(other.sums)
+        for sketch, other_sketch in zip(self.sketches, other.sketches):
+            sketch.merge(other_sketch)
+        return self
+
+    def pearson(self) -> pd.DataFrame:
+        """:return: The Pearson correlation matrix of the rows added so far."""
+        return self.sums.correlation()
+
+    def rank_sums(self, df: pd.DataFrame, sums: CorrelationSums = None) -> CorrelationSums:
+        """
+        Accumulates the Pearson sums of a chunk's ranks, estimated by the sketches.
+
+        :param df: Chunk holding the correlated columns.
+        :param sums: Rank sums to add to. Defaults to new sums.
+        :return: The rank sums.
+        """
+        values = self._values(df)
+        ranks = np.column_stack([sketch.cdf(column) for sketch, column in zip(self.sketches, values.T)])
+        return (sums or CorrelationSums(self.columns)).update(ranks.reshape(values.shape))
+
+    def spearman(self, chunks) -> pd.DataFrame:
+        """
+        Computes the approximate Spearman correlation matrix in a second pass over the data.
+
+        Values are ranked among all non-null values of their column, whereas pandas
+        re-ranks them among the rows where both columns of a pair are present, so the
+        two differ slightly for columns with nulls.
+
+        :param chunks: The chunks passed to `update`, read again.
+        :return: The Spearman correlation matrix.
+        """
+        sums = CorrelationSums(self.columns)
+        for chunk in chunks:
+            self.rank_sums(chunk, sums)
+        return sums.correlation()
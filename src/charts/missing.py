@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+# Row bins of the missing-value heatmap; frames with fewer rows get one bin per row
+DEFAULT_BINS = 200
+# "rows" draws one cell per row and column, "binned" the null rates of `null_rates`, and
+# "auto" picks "rows" for frames of at most DEFAULT_BINS rows and "binned" above that
+MISSING_VALUE_MODES = ("auto", "rows", "binned")
+
+
+def null_rates(df: pd.DataFrame, bins: int = DEFAULT_BINS, time_column: str = None, freq: str = "D") -> pd.DataFrame:
+    """
+    Computes the share of missing values of every column in bins of rows or time.
+
+    Rows are split into `bins` contiguous bins of (nearly) equal size, or, given
+    `time_column`, grouped by that column floored to `freq`. Columns are reduced
+    one at a time, so memory stays at one boolean column however many columns
+    the frame has, and the result has at most bins x columns rows.
+
+    :param df: Data frame to summarize.
+    :param bins: Number of row bins, when not binning by time.
+    :param time_column: Datetime column whose buckets replace the row bins.
+    :param freq: Bucket size for `time_column`, as a pandas frequency such as "D" or "h".
+    :return: A long frame with "bin", "variable", "null_rate" and "rows" columns. "bin" is the
+        first row number of the bin, or the start of the time bucket.
+    """
+    if time_column is not None:
+        buckets = pd.to_datetime(df[time_column]).dt.floor(freq)
+        codes, labels = pd.factorize(buckets, sort=True)
+        # Rows without a timestamp get their own trailing bucket
+        missing_time = codes < 0
+        if missing_time.any():
+            codes = np.where(missing_time, len(labels), codes)
+            labels = labels.append(pd.DatetimeIndex([pd.NaT]))
+        rows = np.bincount(codes, minlength=len(labels))
+        reduce = lambda nulls: np.bincount(codes, weights=nulls, minlength=len(labels))
+    else:
+        bins = min(bins, len(df))
+        starts = np.linspace(0, len(df), bins + 1).astype(np.int64)[:-1]
+        labels = starts
+        rows = np.diff(np.append(starts, len(df)))
+        reduce = lambda nulls: np.add.reduceat(nulls, starts) if bins else np.zeros(0)
+
+    frames = []
+    for column in df.columns:
+        nulls = df[column].isna().to_numpy().astype(np.int64)
+        frames.append(pd.DataFrame({"bin": labels, "variable": column, "null_rate": reduce(nulls) / rows, "rows": rows}))
+    if not frames:
+        return pd.DataFrame(columns=["bin", "variable", "null_rate", "rows"])
+    return pd.concat(frames, ignore_index=True)
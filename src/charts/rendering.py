@@ -0,0 +1,164 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+import altair as alt
+import vl_convert as vlc
+from ..data_io import DEFAULT_CACHE_DIR, DataCache
+
+RENDER_FORMATS = ("png", "svg", "pdf")
+# Rendered charts are cached apart from the data, under their own size cap
+DEFAULT_CHART_CACHE_DIR = os.path.join(DEFAULT_CACHE_DIR, "charts")
+DEFAULT_CHART_CACHE_BYTES = 256 * 1024**2
+
+
+def _render(spec: dict, path: str, file_format: str, scale_factor: float, vega: bool = False) -> float:
+    """
+    Renders a Vega-Lite spec, or a Vega spec pre-transformed by VegaFusion, to a file
+    with vl-convert, as Altair's `save` does, and returns the seconds taken.
+    """
+    start = time.perf_counter()
+    if file_format == "png":
+        content = (vlc.vega_to_png if vega else vlc.vegalite_to_png)(spec, scale=scale_factor)
+    elif file_format == "pdf":
+        content = (vlc.vega_to_pdf if vega else vlc.vegalite_to_pdf)(spec, scale=scale_factor)
+    else:
+        content = (vlc.vega_to_svg if vega else vlc.vegalite_to_svg)(spec).encode()
+    with open(path, "wb") as f:
+        f.write(content)
+    return time.perf_counter() - start
+
+
+def _modified(path: str):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+class ChartRenderer:
+    """
+    Saves Altair charts, either one at a time or queued and rendered together.
+
+    Exporting a chart to PNG, SVG or PDF runs the Vega renderer, which is CPU-bound
+    and holds the GIL, so charts saved one after another take the sum of their
+    render times. With more than one worker, `save` only records the chart's
+    Vega-Lite spec and `render` exports every queued chart in every format on a
+    process pool, so a run takes about as long as its slowest chart. With one
+    worker, charts are saved immediately with Altair, as before, since a pool of
+    one only adds the cost of starting it.
+
+    With `cache_dir`, every export is cached under a hash of the chart's Vega-Lite
+    spec, which holds its inline data, plus the format and scale. A chart whose
+    spec has not changed since it was last rendered is copied from the cache
+    without running the renderer, and the least recently used exports are evicted
+    once the cache grows past `cache_max_bytes`.
+
+    Every export is timed, and `report` lists the time of each chart and format.
+    """
+
+    def __init__(self, workers: int = 1, formats: list = None, scale_factor: float = 1.0,
+                 cache_dir: str = None, cache_max_bytes: int = DEFAULT_CHART_CACHE_BYTES):
+        """
+        :param workers: Processes rendering the queued charts; None uses one per CPU.
+        :param formats: Formats written for every chart, among RENDER_FORMATS. Defaults to
+            the extension of the path given to `save`.
+        :param scale_factor: Resolution multiplier of PNG and PDF exports.
+        :param cache_dir: Directory of the rendered chart cache, or None to disable it.
+        :param cache_max_bytes: Size above which the least recently used exports are evicted.
+        """
+        unknown = set(formats or ()) - set(RENDER_FORMATS)
+        if unknown:
+            raise ValueError(f"Unsupported chart formats {sorted(unknown)}; choose from {list(RENDER_FORMATS)}.")
+        self.workers = os.cpu_count() if workers is None else workers
+        self.formats = list(formats) if formats else None
+        self.scale_factor = scale_factor
+        self.cache = DataCache(cache_dir, max_bytes=cache_max_bytes) if cache_dir else None
+        self.queue = []
+        self.timings = []
+
+    def save(self, chart, path: str) -> list:
+        """
+        Saves a chart in every configured format, or queues it when rendering on a pool.
+
+        :param chart: The Altair chart.
+        :param path: Output path; its extension is replaced by each configured format.
+        :return: The paths the chart is (or will be) written to.
+        """
+        base, extension = os.path.splitext(path)
+        paths = [f"{base}.{file_format}" for file_format in self.formats or [extension.lstrip(".")]]
+        # The spec is plain JSON, so it hashes and pickles cheaply to the workers. With the
+        # VegaFusion data transformer, it is the Vega spec holding the transformed data.
+        vega = alt.data_transformers.active == "vegafusion"
+        spec = chart.to_dict(format="vega" if vega else "vega-lite") if self.cache or self.workers > 1 else None
+        digest = hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest() if self.cache else None
+        for chart_path in paths:
+            key = (digest, os.path.splitext(chart_path)[1], self.scale_factor)
+            if self._copy_cached(key, chart_path):
+                continue
+            if self.workers <= 1:
+                previous = _modified(chart_path)
+                start = time.perf_counter()
+                chart.save(chart_path, scale_factor=self.scale_factor)
+                self._record(chart_path, time.perf_counter() - start)
+                # A save that wrote nothing, e.g. a patched one, leaves nothing to cache
+                if _modified(chart_path) not in (None, previous):
+                    self._cache_export(key, chart_path)
+            else:
+                self.queue.append((spec, chart_path, key, vega))
+        return paths
+
+    def render(self) -> list:
+        """
+        Renders the queued charts on the process pool.
+
+        :return: The paths written.
+        """
+        if not self.queue:
+            return []
+        jobs, self.queue = self.queue, []
+        # Spawned workers do not inherit the state of the Vega runtime or of the caller's threads
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(jobs)),
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = [
+                (path, key, pool.submit(_render, spec, path, os.path.splitext(path)[1].lstrip("."),
+                                        self.scale_factor, vega))
+                for spec, path, key, vega in jobs
+            ]
+            for path, key, future in futures:
+                self._record(path, future.result())
+                self._cache_export(key, path)
+        return [path for _, path, _, _ in jobs]
+
+    def _copy_cached(self, key: tuple, path: str) -> bool:
+        """Writes an export from the cache, returning whether it was there."""
+        cached_path = self.cache.cached_file("chart", *key) if self.cache else None
+        if cached_path is None:
+            return False
+        start = time.perf_counter()
+        shutil.copyfile(cached_path, path)
+        self._record(path, time.perf_counter() - start, cached=True)
+        return True
+
+    def _cache_export(self, key: tuple, path: str):
+        if self.cache:
+            self.cache.store_file(path, "chart", *key)
+
+    def _record(self, path: str, seconds: float, cached: bool = False):
+        self.timings.append({
+            "chart": os.path.splitext(os.path.basename(path))[0],
+            "format": os.path.splitext(path)[1].lstrip("."),
+            "path": path,
+            "seconds": round(seconds, 3),
+            "cached": cached,
+        })
+
+    def report(self) -> str:
+        """:return: One "chart.format: seconds" line per export, slowest first."""
+        return "\n".join(
+            f"{timing['chart']}.{timing['format']}: {timing['seconds']:.3f}s" + (" (cached)" if timing["cached"] else "")
+            for timing in sorted(self.timings, key=lambda timing: -timing["seconds"])
+        )
@@ -0,0 +1,56 @@
+import contextlib
+import functools
+import logging
+import altair as alt
+
+# "pre-aggregate" evaluates a chart's transforms with VegaFusion and embeds only their
+# output; "inline" embeds the chart's data as it is and leaves transforms to the renderer
+TRANSFORM_MODES = ("pre-aggregate", "inline")
+# Altair's own default limit on the rows embedded in a chart
+DEFAULT_MAX_ROWS = 5000
+
+
+@functools.lru_cache(maxsize=None)
+def vegafusion_available() -> bool:
+    """:return: Whether VegaFusion can be imported."""
+    try:
+        import vegafusion  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def resolve_transform_mode(mode: str) -> str:
+    """
+    Checks a transform mode and falls back to "inline" when "pre-aggregate" needs
+    VegaFusion and it is not installed.
+
+    :param mode: One of TRANSFORM_MODES.
+    :return: The mode that can be used.
+    """
+    if mode not in TRANSFORM_MODES:
+        raise ValueError(f"Unknown transform mode '{mode}'; choose from {list(TRANSFORM_MODES)}.")
+    if mode == "pre-aggregate" and not vegafusion_available():
+        logging.warning("VegaFusion is not installed; chart data is embedded inline instead of pre-aggregated.")
+        return "inline"
+    return mode
+
+
+@contextlib.contextmanager
+def chart_transforms(mode: str = "pre-aggregate", max_rows: int = DEFAULT_MAX_ROWS):
+    """
+    Serializes the charts built in the block with the given transform mode and row limit.
+
+    In "pre-aggregate" mode, Altair's VegaFusion data transformer compiles each chart
+    to Vega and evaluates its density, bin, aggregate and filter transforms in Python,
+    so the spec only holds their (usually small) output. The row limit applies to the
+    data embedded in the spec, after those transforms in "pre-aggregate" mode, and a
+    chart over the limit raises alt.MaxRowsError as it is serialized, before any
+    rendering starts.
+
+    :param mode: One of TRANSFORM_MODES, as returned by `resolve_transform_mode`.
+    :param max_rows: Most rows a chart may embed, or None for no limit.
+    """
+    transformer = "vegafusion" if resolve_transform_mode(mode) == "pre-aggregate" else "default"
+    with alt.data_transformers.enable(transformer, max_rows=max_rows):
+        yield
@@ -0,0 +1,46 @@
+from .cache import DataCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, DEFAULT_TTL
+from .dedupe import DuplicateIndex, duplicated_rows, hash_rows
+from .formats import (
+    DEFAULT_FORMAT,
+    FORMAT_EXTENSIONS,
+    apply_filters,
+    infer_format,
+    iter_frames,
+    iter_parquet,
+    iter_parquet_row_group_chunks,
+    iter_parquet_row_groups,
+    iter_table,
+    parse_predicate,
+    read_columns,
+    read_parquet,
+    read_table,
+    row_group_metadata,
+    with_format,
+    write_table,
+)
+
+__all__ = [
+    "DataCache",
+    "DEFAULT_CACHE_DIR",
+    "DEFAULT_MAX_BYTES",
+    "DEFAULT_TTL",
+    "DEFAULT_FORMAT",
+    "DuplicateIndex",
+    "FORMAT_EXTENSIONS",
+    "apply_filters",
+    "duplicated_rows",
+    "hash_rows",
+    "infer_format",
+    "iter_frames",
+    "iter_parquet",
+    "iter_parquet_row_group_chunks",
+    "iter_parquet_row_groups",
+    "iter_table",
+    "parse_predicate",
+    "read_columns",
+    "read_parquet",
+    "read_table",
+    "row_group_metadata",
+    "with_format",
+    "write_table",
+]
@@ -0,0 +1,334 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+import pandas as pd
+
+DEFAULT_CACHE_DIR = "data/cache"
+DEFAULT_MAX_BYTES = 5 * 1024**3
+# How long a download is served without asking the server whether it changed
+DEFAULT_TTL = 24 * 3600
+
+
+def _is_remote(source: str) -> bool:
+    return "://" in source and not source.startswith("file://")
+
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _key(*parts) -> str:
+    return hashlib.sha256("\0".join(str(part) for part in parts).encode()).hexdigest()
+
+
+class DataCache:
+    """
+    Local on-disk cache for downloaded trip data and parsed data frames.
+
+    Remote files are keyed by their URL plus the ETag (or size and modification
+    time) reported by the server, which is only asked again once `ttl` seconds have
+    passed since it last confirmed the cached copy. Parsed frames are keyed by a
+    fingerprint of their source file plus the parameters used to parse it. Every hit
+    checks that the entry still has the size and modification time it was stored
+    with; `verify_hash` also re-hashes its content against the stored SHA-256. The
+    least recently used entries are evicted once the cache grows past `max_bytes`.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 verify: bool = True, offline: bool = False, timeout: float = 30, ttl: float = DEFAULT_TTL,
+                 verify_hash: bool = False):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.verify = verify
+        self.verify_hash = verify_hash
+        self.ttl = ttl
+        self.offline = offline
+        self.timeout = timeout
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _paths(self, key: str, suffix: str):
+        return (os.path.join(self.cache_dir, f"{key}.data{suffix}"),
+                os.path.join(self.cache_dir, f"{key}.json"))
+
+    def _read_meta(self, meta_path: str):
+        try:
+            with open(meta_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, meta_path: str, meta: dict):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def _lookup(self, key: str):
+        """Returns the path of a valid entry, or None if it is missing or corrupt."""
+        meta = self._read_meta(os.path.join(self.cache_dir, f"{key}.json"))
+        if meta is None:
+            return None
+        data_path, meta_path = self._paths(key, meta["suffix"])
+        try:
+            stat = os.stat(data_path)
+        except FileNotFoundError:
+            return None
+        if self.verify and (
+            (stat.st_size, stat.st_mtime_ns) != (meta["size"], meta.get("mtime_ns", stat.st_mtime_ns))
+            or self.verify_hash and _sha256_file(data_path) != meta["sha256"]
+        ):
+            logging.warning(f"Cache entry for '{meta['source']}' failed its integrity check; discarding it.")
+            self.remove(key)
+            return None
+        meta["last_access"] = time.time()
+        self._write_meta(meta_path, meta)
+        return data_path
+
+    def _store(self, key: str, suffix: str, tmp_path: str, meta: dict) -> str:
+        data_path, meta_path = self._paths(key, suffix)
+        meta.update(
+            suffix=suffix,
+            size=os.path.getsize(tmp_path),
+            sha256=_sha256_file(tmp_path),
+            last_access=time.time(),
+        )
+        os.replace(tmp_path, data_path)
+        meta["mtime_ns"] = os.stat(data_path).st_mtime_ns
+        self._write_meta(meta_path, meta)
+        # The new entry is kept even when it alone exceeds `max_bytes`, so its path stays valid
+        self.evict(keep=key)
+        return data_path
+
+    def _touch(self, key: str, **fields):
+        """Updates fields of an entry's metadata."""
+        meta_path = os.path.join(self.cache_dir, f"{key}.json")
+        meta = self._read_meta(meta_path)
+        if meta is not None:
+            meta.update(fields)
+            self._write_meta(meta_path, meta)
+
+    def remove(self, key: str):
+        meta_path = os.path.join(self.cache_dir, f"{key}.json")
+        meta = self._read_meta(meta_path)
+        paths = [meta_path]
+        if meta is not None:
+            paths.append(self._paths(key, meta["suffix"])[0])
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def entries(self) -> list:
+        """Lists the metadata of every entry, least recently used first."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                meta = self._read_meta(os.path.join(self.cache_dir, name))
+                if meta is not None:
+                    entries.append(dict(meta, key=name[: -len(".json")]))
+        return sorted(entries, key=lambda meta: meta["last_access"])
+
+    def evict(self, keep: str = None):
+        """
+        Removes least recently used entries until the cache fits in `max_bytes`.
+
+        :param keep: Key of an entry that is never removed, e.g. the one just stored.
+        """
+        entries = self.entries()
+        total = sum(meta["size"] for meta in entries)
+        for meta in entries:
+            if total <= self.max_bytes:
+                break
+            if meta["key"] == keep:
+                continue
+            self.remove(meta["key"])
+            total -= meta["size"]
+
+    def _remote_validator(self, url: str) -> str:
+        request = urllib.request.Request(url, method="HEAD")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            etag = response.headers.get("ETag")
+            if etag:
+                return etag
+            return f"{response.headers.get('Content-Length')}:{response.headers.get('Last-Modified')}"
+
+    def fetch(self, source: str) -> str:
+        """
+        Returns a local path for `source`, downloading remote files only when the
+        server reports a version that is not cached yet.
+
+        Local paths are returned unchanged. A copy the server confirmed less than
+        `ttl` seconds ago is returned without contacting it. When the server cannot
+        be reached (or the cache is offline), the most recently used copy of the URL
+        is returned.
+
+        :param source: URL or local file path.
+        :return: Path to a local copy of the file.
+        """
+        if not _is_remote(source):
+            return source.removeprefix("file://")
+
+        downloads = [meta for meta in reversed(self.entries())
+                     if meta.get("source") == source and meta.get("kind") == "download"]
+        for meta in downloads:
+            if time.time() - meta.get("checked_at", 0) < self.ttl:
+                path = self._lookup(meta["key"])
+                if path is not None:
+                    logging.info(f"Using cached copy of '{source}'.")
+                    return path
+
+        validator = None
+        if not self.offline:
+            try:
+                validator = self._remote_validator(source)
+            except (urllib.error.URLError, OSError) as e:
+                logging.warning(f"Could not reach '{source}' ({e}); falling back to the cache.")
+
+        if validator is None:
+            for meta in downloads:
+                path = self._lookup(meta["key"])
+                if path is not None:
+                    return path
+            raise FileNotFoundError(f"'{source}' is unreachable and not in the cache.")
+
+        key = _key("download", source, validator)
+        path = self._lookup(key)
+        if path is not None:
+            logging.info(f"Using cached copy of '{source}'.")
+            self._touch(key, checked_at=time.time())
+            return path
+
+        suffix = os.path.splitext(source.split("?")[0])[1]
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f, urllib.request.urlopen(source, timeout=self.timeout) as response:
+                shutil.copyfileobj(response, f, length=1 << 20)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        logging.info(f"Downloaded '{source}' into the cache.")
+        return self._store(key, suffix, tmp_path,
+                           {"kind": "download", "source": source, "validator": validator, "checked_at": time.time()})
+
+    def fingerprint(self, path: str) -> str:
+        """Identifies the current version of a local file by its path, size and modification time."""
+        stat = os.stat(path)
+        return f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    def cached_frame(self, kind: str, *parts):
+        """
+        Returns the frame stored under `kind` and key `parts`, or None if there is none.
+
+        :param kind: Kind of entry, e.g. "frame" for parsed files.
+        :param parts: Values that together identify the frame.
+        :return: The cached data frame, or None.
+        """
+        cached_path = self._lookup(_key(kind, *parts))
+        return None if cached_path is None else pd.read_parquet(cached_path)
+
+    def store_frame(self, df: pd.DataFrame, kind: str, *parts, source: str = None, **meta) -> bool:
+        """
+        Stores a frame as parquet under `kind` and key `parts`.
+
+        :param df: Data frame to store.
+        :param kind: Kind of entry, e.g. "frame" for parsed files.
+        :param parts: Values that together identify the frame.
+        :param source: File or URL the frame was derived from, for listing.
+        :param meta: Extra metadata saved with the entry.
+        :return: Whether the frame could be stored.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            df.to_parquet(tmp_path, engine="pyarrow")
+        except Exception as e:
+            os.remove(tmp_path)
+            logging.warning(f"Could not cache {kind} for '{source}': {e}")
+            return False
+        self._store(_key(kind, *parts), ".parquet", tmp_path, dict(meta, kind=kind, source=source))
+        return True
+
+    def cached_file(self, kind: str, *parts):
+        """
+        Returns the path of the file stored under `kind` and key `parts`, or None if there is none.
+
+        :param kind: Kind of entry, e.g. "chart" for rendered charts.
+        :param parts: Values that together identify the file.
+        :return: Path to the cached file, or None.
+        """
+        return self._lookup(_key(kind, *parts))
+
+    def store_file(self, path: str, kind: str, *parts, **meta) -> str:
+        """
+        Stores a copy of a file under `kind` and key `parts`.
+
+        :param path: File to store; its extension is kept.
+        :param kind: Kind of entry, e.g. "chart" for rendered charts.
+        :param parts: Values that together identify the file.
+        :param meta: Extra metadata saved with the entry.
+        :return: Path to the cached copy.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        shutil.copyfile(path, tmp_path)
+        return self._store(_key(kind, *parts), os.path.splitext(path)[1], tmp_path, dict(meta, kind=kind, source=path))
+
+    def convert(self, path: str, suffix: str, converter, **params):
+        """
+        Returns a cached conversion of the local file `path`, running
+        `converter(path, destination)` only when neither the file nor `params`
+        have changed since the last conversion.
+
+        :param path: Local file to convert.
+        :param suffix: File extension of the converted file, e.g. ".parquet".
+        :param converter: Callable writing the converted file to the destination path it is given.
+        :param params: Conversion parameters that are part of the cache key.
+        :return: Path to the converted file, or None if the conversion failed.
+        """
+        key = _key("converted", self.fingerprint(path), json.dumps(params, sort_keys=True, default=str))
+        cached_path = self._lookup(key)
+        if cached_path is not None:
+            logging.info(f"Using cached conversion of '{path}'.")
+            return cached_path
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            converter(path, tmp_path)
+        except Exception as e:
+            os.remove(tmp_path)
+            logging.warning(f"Could not convert '{path}': {e}")
+            return None
+        return self._store(key, suffix, tmp_path, dict(kind="converted", source=path, params=params))
+
+    def load_frame(self, path: str, loader, **params) -> pd.DataFrame:
+        """
+        Returns the frame `loader()` would parse from `path`, reusing a cached
+        parquet copy when neither the file nor `params` have changed.
+
+        :param path: Local file the frame is parsed from.
+        :param loader: Zero-argument callable that parses the frame.
+        :param params: Parsing parameters that are part of the cache key.
+        :return: The parsed data frame.
+        """
+        parts = (self.fingerprint(path), json.dumps(params, sort_keys=True, default=str))
+        df = self.cached_frame("frame", *parts)
+        if df is not None:
+            logging.info(f"Using cached frame for '{path}'.")
+            return df
+
+        df = loader()
+        self.store_frame(df, "frame", *parts, source=path, params=params)
+        return df
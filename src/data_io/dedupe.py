@@ -0,0 +1,151 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# In-memory hashes kept before sorted runs are spilled to disk (8 bytes each, 128 MiB).
+DEFAULT_MAX_IN_MEMORY = 1 << 24
+# Sorted runs kept in memory before they are merged into one.
+_MAX_RUNS = 8
+
+
+def hash_rows(df: pd.DataFrame, columns=None) -> np.ndarray:
+    """
+    Hashes every row of a data frame to a 64-bit value.
+
+    Columns are hashed one at a time and folded into a running row hash, so only one
+    column's temporaries are alive at once. Numeric and boolean columns are hashed
+    as float64, so the same row hashes the same whether an integer column came back
+    as int64 or, with nulls in the chunk, as float64. Strings, categoricals and
+    datetimes are hashed by value.
+
+    :param df: Data frame to hash.
+    :param columns: Columns that identify a row. Defaults to all columns.
+    :return: A uint64 array with one hash per row.
+    """
+    names = list(df.columns if columns is None else columns)
+    # Same multiplicative mixing pandas uses to combine column hashes
+    hashes = np.full(len(df), 0x345678, dtype=np.uint64)
+    multiplier = np.uint64(1000003)
+    for position, name in enumerate(names):
+        values = df[name]
+        if pd.api.types.is_numeric_dtype(values.dtype) and not isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype("float64")
+        hashes ^= pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+        hashes *= multiplier
+        multiplier += np.uint64(82520 + 2 * (len(names) - position))
+    hashes += np.uint64(97531)
+    return hashes
+
+
+def duplicated_rows(df: pd.DataFrame, columns=None) -> np.ndarray:
+    """
+    Marks rows that repeat an earlier row, like `df.duplicated()`, from 64-bit row hashes.
+
+    :param df: Data frame to check.
+    :param columns: Columns that identify a row. Defaults to all columns.
+    :return: A boolean array, True for every occurrence after the first.
+    """
+    hashes = hash_rows(df, columns)
+    duplicated = np.ones(len(hashes), dtype=bool)
+    duplicated[np.unique(hashes, return_index=True)[1]] = False
+    return duplicated
+
+
+def _sorted_contains(run: np.ndarray, hashes: np.ndarray) -> np.ndarray:
+    if not len(run):
+        return np.zeros(len(hashes), dtype=bool)
+    positions = np.minimum(np.searchsorted(run, hashes), len(run) - 1)
+    return run[positions] == hashes
+
+
+class DuplicateIndex:
+    """
+    Remembers the rows seen so far as 64-bit hashes, so duplicates can be dropped
+    from a stream of chunks, or across files, without holding the rows themselves.
+
+    Hashes are kept as sorted NumPy runs (8 bytes per distinct row, versus the
+    per-column hash tables `DataFrame.duplicated` builds over object columns). When
+    more than `max_in_memory` hashes are held and a `spill_dir` is set, the runs are
+    merged and written to a memory-mapped .npy file that later lookups binary-search.
+
+    Two distinct rows collide with probability about n^2 / 2^65, i.e. below one in a
+    million for 6 billion rows.
+    """
+
+    def __init__(self, columns=None, spill_dir: str = None, max_in_memory: int = DEFAULT_MAX_IN_MEMORY):
+        """
+        :param columns: Columns that identify a row. Defaults to all columns.
+        :param spill_dir: Directory for spilled hash runs, or None to keep everything in memory.
+        :param max_in_memory: Number of hashes held in memory before spilling.
+        """
+        self.columns = columns
+        self.max_in_memory = max_in_memory
+        self._spill_dir = tempfile.mkdtemp(prefix="dedupe-", dir=spill_dir) if spill_dir else None
+        self._runs = []
+        self._spilled = []
+
+    def __len__(self) -> int:
+        return sum(len(run) for run in self._runs) + sum(len(run) for run in self._spilled)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Forgets every hash and removes the spilled runs."""
+        self._runs, self._spilled = [], []
+        if self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+
+    def _contains(self, hashes: np.ndarray) -> np.ndarray:
+        seen = np.zeros(len(hashes), dtype=bool)
+        for run in self._runs + self._spilled:
+            seen |= _sorted_contains(run, hashes)
+        return seen
+
+    def _add(self, hashes: np.ndarray):
+        # `hashes` is sorted and unique, so it is a run of its own
+        if len(hashes):
+            self._runs.append(hashes)
+        if len(self._runs) > _MAX_RUNS:
+            self._runs = [np.sort(np.concatenate(self._runs))]
+        in_memory = sum(len(run) for run in self._runs)
+        if self._spill_dir is not None and in_memory > self.max_in_memory:
+            path = os.path.join(self._spill_dir, f"run-{len(self._spilled)}.npy")
+            np.save(path, np.sort(np.concatenate(self._runs)))
+            self._spilled.append(np.load(path, mmap_mode="r"))
+            self._runs = []
+
+    def mark(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Marks the rows of a chunk that were seen before, in this chunk or an earlier one,
+        and remembers the rest.
+
+        :param df: The next chunk.
+        :return: A boolean array, True for duplicate rows.
+        """
+        hashes = hash_rows(df, self.columns)
+        unique, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+        seen = self._contains(unique)
+        duplicated = seen[inverse]
+        first_occurrence = np.zeros(len(hashes), dtype=bool)
+        first_occurrence[first] = True
+        duplicated |= ~first_occurrence
+        self._add(unique[~seen])
+        return duplicated
+
+    def drop_duplicates(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Drops the rows of a chunk that were seen before, keeping first occurrences.
+
+        :param df: The next chunk.
+        :return: The chunk without duplicate rows.
+        """
+        duplicated = self.mark(df)
+        return df[~duplicated] if duplicated.any() else df
@@ -0,0 +1,401 @@
+import ast
+import collections
+import hashlib
+import operator
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+
+# File formats used to hand data between pipeline stages, and their file extensions.
+FORMAT_EXTENSIONS = {
+    "parquet": ".parquet",
+    "ipc": ".arrow",
+    "csv": ".csv",
+}
+DEFAULT_FORMAT = "parquet"
+
+_EXTENSION_FORMATS = {
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "ipc",
+    ".feather": "ipc",
+    ".ipc": "ipc",
+    ".csv": "csv",
+}
+
+
+_OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+_PREDICATE_PATTERN = re.compile(r"^\s*(\w+)\s*(==|!=|<=|>=|<|>)\s*(.+?)\s*$")
+
+
+def parse_predicate(predicate) -> tuple:
+    """
+    Normalises a predicate such as "fare_amount >= 0" into a (column, op, value) tuple.
+
+    :param predicate: A predicate string or a (column, op, value) tuple.
+    :return: The predicate as a (column, op, value) tuple.
+    :raises ValueError: If the predicate cannot be parsed.
+    """
+    if isinstance(predicate, (tuple, list)):
+        column, op, value = predicate
+    else:
+        match = _PREDICATE_PATTERN.match(predicate)
+        if match is None:
+            raise ValueError(f"Cannot parse predicate '{predicate}': expected '<column> <op> <value>'.")
+        column, op, value = match.groups()
+        try:
+            value = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            pass  # bare words are compared as strings
+    if op not in _OPERATORS:
+        raise ValueError(f"Unsupported operator '{op}': expected one of {list(_OPERATORS)}.")
+    return column, op, value
+
+
+def _filter_expression(filters):
+    expression = None
+    for column, op, value in map(parse_predicate, filters):
+        term = _OPERATORS[op](ds.field(column), value)
+        expression = term if expression is None else expression & term
+    return expression
+
+
+def read_columns(columns, filters):
+    """
+    Returns the columns a reader has to decode to project `columns` and evaluate `filters`.
+
+    :param columns: Requested columns, or None for all columns.
+    :param filters: Iterable of predicates accepted by `parse_predicate`.
+    :return: The columns to decode, or None for all columns.
+    """
+    if columns is None:
+        return None
+    filter_columns = [parse_predicate(predicate)[0] for predicate in filters or []]
+    return list(columns) + [column for column in filter_columns if column not in columns]
+
+
+def apply_filters(df: pd.DataFrame, filters, columns: list = None) -> pd.DataFrame:
+    """
+    Keeps the rows of an in-memory frame that satisfy every predicate.
+
+    Used for formats that cannot push predicates into the reader. Rows where a
+    compared value is missing are dropped, as they are by the Arrow reader.
+
+    :param df: Data frame to filter.
+    :param filters: Iterable of predicates accepted by `parse_predicate`.
+    :param columns: Columns to keep after filtering, in that order, as the Arrow reader
+        returns them. Columns missing from the frame are skipped. Defaults to all columns.
+    :return: The filtered data frame.
+    """
+    mask = pd.Series(True, index=df.index)
+    for column, op, value in map(parse_predicate, filters or []):
+        mask &= _OPERATORS[op](df[column], value) & df[column].notna()
+    if columns is not None:
+        return df.loc[mask, [column for column in columns if column in df.columns]]
+    return df[mask]
+
+
+def infer_format(path: str) -> str:
+    """
+    Infers the table format of a file from its extension.
+
+    :param path: File path.
+    :return: One of the keys of FORMAT_EXTENSIONS.
+    :raises ValueError: If the extension is not a known table format.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in _EXTENSION_FORMATS:
+        raise ValueError(f"Unsupported table format: expected one of {sorted(_EXTENSION_FORMATS)}, got '{ext}'.")
+    return _EXTENSION_FORMATS[ext]
+
+
+def with_format(path: str, file_format: str) -> str:
+    """
+    Replaces the extension of `path` with the one of `file_format`.
+
+    :param path: File path.
+    :param file_format: One of the keys of FORMAT_EXTENSIONS.
+    :return: The path with the matching extension.
+    """
+    if file_format not in FORMAT_EXTENSIONS:
+        raise ValueError(f"Unsupported table format: expected one of {list(FORMAT_EXTENSIONS)}, got '{file_format}'.")
+    return os.path.splitext(path)[0] + FORMAT_EXTENSIONS[file_format]
+
+
+def write_table(df: pd.DataFrame, path: str, file_format: str = None, compression: str = "zstd") -> str:
+    """
+    Writes a data frame in a pipeline hand-off format.
+
+    Parquet and Arrow IPC keep the column dtypes and are written compressed;
+    CSV is only meant for exporting data out of the pipeline.
+
+    :param df: Data frame to write.
+    :param path: Destination path; its extension is replaced to match `file_format`.
+    :param file_format: One of the keys of FORMAT_EXTENSIONS. Inferred from `path` when omitted.
+    :param compression: Compression codec for Parquet and Arrow IPC.
+    :return: The path that was written.
+    """
+    file_format = file_format or infer_format(path)
+    path = with_format(path, file_format)
+    if file_format == "parquet":
+        df.to_parquet(path, engine="pyarrow", compression=compression, index=False)
+    elif file_format == "ipc":
+        df.reset_index(drop=True).to_feather(path, compression=compression)
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+
+def read_table(path: str, file_format: str = None, columns: list = None, filters: list = None) -> pd.DataFrame:
+    """
+    Reads a data frame written by `write_table`.
+
+    For Parquet and Arrow IPC, the column projection and predicates are pushed
+    into the Arrow reader, so unused columns are never decoded and Parquet row
+    groups whose statistics rule out every row are skipped. CSV files are
+    projected while parsing and filtered afterwards.
+
+    :param path: File path.
+    :param file_format: One of the keys of FORMAT_EXTENSIONS. Inferred from `path` when omitted.
+    :param columns: Columns to read. Columns missing from the file are skipped. Defaults to all columns.
+    :param filters: Predicates such as "fare_amount >= 0" or ("fare_amount", ">=", 0) that
+        every returned row must satisfy.
+    :return: The data frame.
+    """
+    file_format = file_format or infer_format(path)
+    if file_format == "csv":
+        needed = read_columns(columns, filters)
+        usecols = None if needed is None else (lambda column: column in needed)
+        return apply_filters(pd.read_csv(path, usecols=usecols), filters, columns)
+
+    dataset = ds.dataset(path, format="parquet" if file_format == "parquet" else "ipc")
+    if columns is not None:
+        columns = [column for column in columns if column in dataset.schema.names]
+    expression = _filter_expression(filters) if filters else None
+    return dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+
+def iter_frames(batches, chunk_size: int):
+    """
+    Regroups a stream of Arrow record batches into data frames of `chunk_size` rows.
+
+    :param batches: Iterable of pyarrow RecordBatches sharing one schema.
+    :param chunk_size: Rows per frame; only the last frame may be shorter.
+    :return: Iterator of data frames.
+    """
+    pending, pending_rows = [], 0
+    for batch in batches:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        while pending_rows >= chunk_size:
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, chunk_size).to_pandas()
+            pending = table.slice(chunk_size).to_batches()
+            pending_rows -= chunk_size
+    if pending_rows:
+        yield pa.Table.from_batches(pending).to_pandas()
+
+
+def iter_table(path: str, file_format: str = None, columns: list = None, filters: list = None,
+               chunk_size: int = 65536):
+    """
+    Reads a table file as a stream of data frames, holding about one chunk in memory at a time.
+
+    Projection and predicates are pushed into the reader as in `read_table`.
+
+    :param path: File path.
+    :param file_format: One of the keys of FORMAT_EXTENSIONS. Inferred from `path` when omitted.
+    :param columns: Columns to read. Defaults to all columns.
+    :param filters: Predicates every returned row must satisfy.
+    :param chunk_size: Rows per data frame.
+    :return: Iterator of data frames.
+    """
+    file_format = file_format or infer_format(path)
+    if file_format == "csv":
+        needed = read_columns(columns, filters)
+        usecols = None if needed is None else (lambda column: column in needed)
+        for chunk in pd.read_csv(path, usecols=usecols, chunksize=chunk_size):
+            yield apply_filters(chunk, filters, columns)
+        return
+
+    dataset = ds.dataset(path, format="parquet" if file_format == "parquet" else "ipc")
+    if columns is not None:
+        columns = [column for column in columns if column in dataset.schema.names]
+    expression = _filter_expression(filters) if filters else None
+    yield from iter_frames(dataset.to_batches(columns=columns, filter=expression, batch_size=chunk_size), chunk_size)
+
+
+def _parquet_dataset(path: str, buffer_size: int = 0, memory_map: bool = False):
+    # A buffer size of 0 reads every column chunk in one call rather than through a buffered stream
+    scan_options = ds.ParquetFragmentScanOptions(use_buffered_stream=buffer_size > 0,
+                                                 buffer_size=buffer_size or 8192)
+    file_format = ds.ParquetFileFormat(default_fragment_scan_options=scan_options)
+    return ds.dataset(os.path.abspath(path), format=file_format, filesystem=pafs.LocalFileSystem(use_mmap=memory_map))
+
+
+def _parquet_row_groups(path: str, columns: list, filters: list, buffer_size: int = 0, memory_map: bool = False):
+    """Lists the row group fragments of a Parquet file that the filters may match, with the read function."""
+    dataset = _parquet_dataset(path, buffer_size, memory_map)
+    if columns is not None:
+        columns = [column for column in columns if column in dataset.schema.names]
+    expression = _filter_expression(filters) if filters else None
+    row_groups = [
+        row_group
+        for fragment in dataset.get_fragments(filter=expression)
+        for row_group in fragment.split_by_row_group(expression, schema=dataset.schema)
+    ]
+
+    def read(row_group):
+        # Each row group is decoded on one thread; the parallelism is across row groups
+        return row_group.to_table(schema=dataset.schema, columns=columns, filter=expression, use_threads=False)
+
+    return row_groups, read
+
+
+def _decode_ahead(items: list, read, use_threads: bool, max_workers: int):
+    """Yields (item, read(item)) in order, reading `max_workers` items ahead on a thread pool."""
+    if not use_threads:
+        for item in items:
+            yield item, read(item)
+        return
+
+    workers = max_workers or os.cpu_count() or 1
+    pool = ThreadPoolExecutor(max_workers=workers)
+    pending = collections.deque()
+    try:
+        for item in items:
+            pending.append((item, pool.submit(read, item)))
+            if len(pending) > workers:
+                item, future = pending.popleft()
+                yield item, future.result()
+        while pending:
+            item, future = pending.popleft()
+            yield item, future.result()
+    finally:
+        # Row groups not yet started are dropped if the consumer stops early
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def iter_parquet_row_groups(path: str, columns: list = None, filters: list = None, use_threads: bool = True,
+                            buffer_size: int = 0, memory_map: bool = False, max_workers: int = None):
+    """
+    Reads a local Parquet file row group by row group, decoding several row groups at once.
+
+    Row groups whose statistics rule out every row are skipped. The others are
+    decoded on a thread pool, `max_workers` row groups ahead of the consumer, and
+    yielded in file order, so the first ones can be processed while later ones are
+    still being read and memory holds only the row groups in flight.
+
+    :param path: Path of a local Parquet file.
+    :param columns: Columns to read. Columns missing from the file are skipped. Defaults to all columns.
+    :param filters: Predicates every returned row must satisfy.
+    :param use_threads: Decode row groups on a thread pool; otherwise one at a time on the calling thread.
+    :param buffer_size: Read column chunks through a buffered stream of this many bytes,
+        which bounds read memory for very wide row groups; 0 reads each column chunk whole.
+    :param memory_map: Memory-map the file instead of reading it into buffers.
+    :param max_workers: Row groups decoded at once. Defaults to the CPU count.
+    :return: Iterator of pyarrow Tables, one per row group.
+    """
+    row_groups, read = _parquet_row_groups(path, columns, filters, buffer_size, memory_map)
+    for _, table in _decode_ahead(row_groups, read, use_threads, max_workers):
+        yield table
+
+
+def row_group_metadata(row_group) -> dict:
+    """
+    Describes the content of a Parquet row group without decoding it: its row count and,
+    for every column chunk, its compressed size, statistics and a SHA-256 digest of its
+    compressed bytes. Offsets are left out, so a row group written again unchanged, e.g.
+    into a file that gained another month, has the same description.
+
+    :param row_group: A dataset fragment holding a single row group.
+    :return: A JSON-serializable description, with the row group's index in the file
+        under "row_group"; non-JSON statistics are given as strings.
+    """
+    info = row_group.row_groups[0]
+    metadata = row_group.metadata.row_group(info.id)
+    column_chunks = []
+    with open(row_group.path, "rb") as f:
+        for i in range(metadata.num_columns):
+            chunk = metadata.column(i)
+            statistics = chunk.statistics
+            # A column chunk starts at its dictionary page when it has one
+            f.seek(chunk.dictionary_page_offset if chunk.has_dictionary_page else chunk.data_page_offset)
+            column_chunks.append({
+                "column": chunk.path_in_schema,
+                "compressed_bytes": chunk.total_compressed_size,
+                "statistics": None if statistics is None or not statistics.has_min_max else [
+                    str(statistics.min), str(statistics.max), statistics.null_count,
+                ],
+                "digest": hashlib.sha256(f.read(chunk.total_compressed_size)).hexdigest(),
+            })
+    return {"row_group": info.id, "rows": metadata.num_rows, "column_chunks": column_chunks}
+
+
+def iter_parquet_row_group_chunks(path: str, columns: list = None, filters: list = None, chunk_size: int = 65536,
+                                  **read_options):
+    """
+    Streams a local Parquet file as data frames of at most `chunk_size` rows that never
+    span two row groups, each with the description of its row group.
+
+    The description identifies a chunk's rows without decoding them, which is how
+    incremental validation keys its cached results for Parquet files.
+
+    :param path: Path of a local Parquet file.
+    :param columns: Columns to read. Defaults to all columns.
+    :param filters: Predicates every returned row must satisfy.
+    :param chunk_size: Most rows per data frame.
+    :param read_options: use_threads, buffer_size, memory_map and max_workers, as for `iter_parquet_row_groups`.
+    :return: Iterator of (row group metadata as in `row_group_metadata`, offset of the chunk in
+        the row group's returned rows, data frame).
+    """
+    use_threads = read_options.pop("use_threads", True)
+    max_workers = read_options.pop("max_workers", None)
+    row_groups, read = _parquet_row_groups(path, columns, filters, **read_options)
+    for row_group, table in _decode_ahead(row_groups, read, use_threads, max_workers):
+        metadata = row_group_metadata(row_group)
+        for start in range(0, table.num_rows, chunk_size):
+            yield metadata, start, table.slice(start, chunk_size).to_pandas()
+
+
+def read_parquet(path: str, columns: list = None, filters: list = None, **read_options) -> pd.DataFrame:
+    """
+    Reads a local Parquet file with its row groups decoded in parallel.
+
+    :param path: Path of a local Parquet file.
+    :param columns: Columns to read. Defaults to all columns.
+    :param filters: Predicates every returned row must satisfy.
+    :param read_options: use_threads, buffer_size, memory_map and max_workers, as for `iter_parquet_row_groups`.
+    :return: The data frame.
+    """
+    tables = list(iter_parquet_row_groups(path, columns, filters, **read_options))
+    if not tables:
+        return read_table(path, "parquet", columns=columns, filters=filters)
+    return pa.concat_tables(tables).to_pandas()
+
+
+def iter_parquet(path: str, columns: list = None, filters: list = None, chunk_size: int = 65536, **read_options):
+    """
+    Streams a local Parquet file as data frames of `chunk_size` rows, decoding row groups in parallel.
+
+    :param path: Path of a local Parquet file.
+    :param columns: Columns to read. Defaults to all columns.
+    :param filters: Predicates every returned row must satisfy.
+    :param chunk_size: Rows per data frame.
+    :param read_options: use_threads, buffer_size, memory_map and max_workers, as for `iter_parquet_row_groups`.
+    :return: Iterator of data frames.
+    """
+    tables = iter_parquet_row_groups(path, columns, filters, **read_options)
+    yield from iter_frames((batch for table in tables for batch in table.to_batches()), chunk_size)
@@ -1,9 +1,30 @@
 from .schema import get_taxi_data_schema
 from .correlation_validator import CorrelationValidator
 from .validate import DataValidator
+from .native import NativeSchemaValidator, NativeValidationResult
+from .parallel import ParallelSchemaValidator
+from .incremental import ValidationResultCache, schema_fingerprint
+from .profiling import ValidationProfiler
+from .composition import FusedSchemaValidator, FusedValidationResult, compose_schemas
+from .dtypes import optimize_dtypes, memory_usage_mb
+from .readers import read_taxi_csv, recover_numeric, schema_arrow_types
 
 __all__ = [
     "get_taxi_data_schema",
     "CorrelationValidator",
     "DataValidator",
+    "NativeSchemaValidator",
+    "NativeValidationResult",
+    "ParallelSchemaValidator",
+    "ValidationResultCache",
+    "schema_fingerprint",
+    "ValidationProfiler",
+    "FusedSchemaValidator",
+    "FusedValidationResult",
+    "compose_schemas",
+    "optimize_dtypes",
+    "memory_usage_mb",
+    "read_taxi_csv",
+    "recover_numeric",
+    "schema_arrow_types",
 ]
\ No newline at end of file
@@ -0,0 +1,176 @@
+import json
+import numpy as np
+import pandas as pd
+from pandera import DataFrameSchema
+from .incremental import check_fingerprint
+from .native import (
+    FailureRecorder, NativeSchemaValidator, NativeValidationResult, column_check_failures, dtype_mismatch,
+    frame_check_failures, lazy_empty_rows,
+)
+from .profiling import ValidationProfiler
+
+
+def _check_key(check) -> str:
+    # Checks with the same code, statistics and error compute the same outcome
+    return json.dumps(check_fingerprint(check), sort_keys=True)
+
+
+class FusedValidationResult:
+    """
+    Outcome of evaluating several schemas in one pass.
+
+    Attributes:
+        results (dict): The NativeValidationResult of every schema, by name.
+    """
+
+    def __init__(self, results: dict):
+        self.results = results
+
+    @property
+    def passed(self) -> bool:
+        return all(result.passed for result in self.results.values())
+
+    @property
+    def failed_schemas(self) -> list:
+        """Names of the schemas that failed, in plan order."""
+        return [name for name, result in self.results.items() if not result.passed]
+
+    @property
+    def valid(self) -> np.ndarray:
+        """Rows that pass every schema."""
+        return np.logical_and.reduce([result.valid for result in self.results.values()])
+
+    def report(self) -> pd.DataFrame:
+        """Returns the failure counts of every schema as a table with schema, column, check and failures columns."""
+        reports = [result.report().assign(schema=name) for name, result in self.results.items()]
+        if not reports:
+            return pd.DataFrame(columns=["schema", "column", "check", "failures"])
+        return pd.concat(reports, ignore_index=True)[["schema", "column", "check", "failures"]]
+
+
+class FusedSchemaValidator:
+    """
+    Evaluates several pandera schemas as one plan, in a single pass over the frame.
+
+    Every schema is compiled as for the native backend, and each coercion, column
+    check and frame check is keyed by what it computes: the column and dtype, or
+    the column plus the check's code and statistics. A step shared by several
+    schemas, such as the duplicate and empty-row checks each of them repeats, is
+    evaluated once, so the frame is scanned and its rows hashed once however many
+    schemas check it. Each schema still gets its own result, assembled from the
+    outcomes of its own steps.
+
+    Frame checks see the frame with every schema's coercions applied, so schemas
+    that disagree on a column's dtype or on coercing it cannot be fused.
+    """
+
+    def __init__(self, schemas: dict):
+        """
+        :param schemas: The pandera schemas to fuse, by name.
+        """
+        self.schemas = dict(schemas)
+        # column -> (column, dtype, coerce); column -> {key: (label, evaluate)}; key -> (label, check)
+        self.dtypes, self.column_checks, self.frame_checks = {}, {}, {}
+        # schema name -> ([(column name, column, [(key, label)])], [(key, label)])
+        self.members = {}
+        for name, schema in self.schemas.items():
+            compiled = NativeSchemaValidator(schema)
+            columns = []
+            for column_name, column, checks in compiled.columns:
+                dtype = (str(column.dtype), bool(schema.coerce or column.coerce))
+                if self.dtypes.setdefault(column_name, (column,) + dtype)[1:] != dtype:
+                    raise ValueError(
+                        f"Schemas disagree on column '{column_name}': (dtype, coerce) "
+                        f"{self.dtypes[column_name][1:]} vs {dtype}."
+                    )
+                column_checks = self.column_checks.setdefault(column_name, {})
+                keys = []
+                for check, (label, evaluate) in zip(column.checks, checks):
+                    key = (column_name, _check_key(check))
+                    column_checks.setdefault(key, (label, evaluate))
+                    keys.append((key, label))
+                columns.append((column_name, column, keys))
+            frame_keys = []
+            for label, check in compiled.frame_checks:
+                key = (None, _check_key(check))
+                self.frame_checks.setdefault(key, (label, check))
+                frame_keys.append((key, label))
+            self.members[name] = (columns, frame_keys)
+
+    def validate(self, df: pd.DataFrame, profiler: ValidationProfiler = None) -> FusedValidationResult:
+        """
+        Evaluates every distinct step of the plan once and attributes the outcomes to each schema.
+
+        :param df: Data frame to validate.
+        :param profiler: Records the time and memory of every distinct step, if given.
+        :return: The per-schema results.
+        """
+        profiler = profiler or ValidationProfiler(enabled=False)
+        rows = len(df)
+        outcomes, nulls, coerced_columns = {}, {}, {}
+        for column_name, (column, dtype, coerce) in self.dtypes.items():
+            if column_name not in df.columns:
+                continue
+            with profiler.step(column_name, "column", rows):
+                series = df[column_name]
+                if coerce:
+                    with profiler.step(f"coerce_dtype('{dtype}')", "coercion", rows):
+                        series, outcomes[(column_name, "dtype")] = NativeSchemaValidator.coerce(series, dtype)
+                    coerced_columns[column_name] = series
+                else:
+                    outcomes[(column_name, "dtype")] = dtype_mismatch(column, series)
+                nulls[column_name] = null = series.isna().to_numpy()
+                values = series.to_numpy()
+                for key, (label, evaluate) in self.column_checks[column_name].items():
+                    with profiler.step(label, "column_check", rows):
+                        outcomes[key] = column_check_failures(evaluate, series, values, null)
+
+        coerced = df.assign(**coerced_columns)
+        empty_rows = lazy_empty_rows(coerced)
+        for key, (label, check) in self.frame_checks.items():
+            with profiler.step(label, "frame_check", rows):
+                outcomes[key] = frame_check_failures(check, coerced, empty_rows)
+
+        return FusedValidationResult({
+            name: self._attribute(name, df, coerced_columns, outcomes, nulls)
+            for name in self.schemas
+        })
+
+    def _attribute(self, name: str, df: pd.DataFrame, coerced_columns: dict, outcomes: dict,
+                   nulls: dict) -> NativeValidationResult:
+        """Assembles one schema's result from the shared outcomes, as NativeSchemaValidator would report it."""
+        columns, frame_keys = self.members[name]
+        failures = FailureRecorder(len(df))
+        for column_name, column, keys in columns:
+            if column_name not in df.columns:
+                failures.record(column_name, "column_in_dataframe", column.required)
+                continue
+            _, dtype, coerce = self.dtypes[column_name]
+            label = f"coerce_dtype('{dtype}')" if coerce else f"dtype('{dtype}')"
+            failures.record(column_name, label, outcomes[(column_name, "dtype")])
+            if not column.nullable:
+                failures.record(column_name, "not_nullable", nulls[column_name])
+            for key, label in keys:
+                failures.record(column_name, label, outcomes[key])
+        for key, label in frame_keys:
+            failures.record(None, label, outcomes[key])
+        coerced = df.assign(**{
+            column_name: coerced_columns[column_name] for column_name, _, _ in columns if column_name in coerced_columns
+        })
+        return NativeValidationResult(failures.valid, failures.failure_counts, coerced)
+
+
+def compose_schemas(*schemas, **named_schemas) -> FusedSchemaValidator:
+    """
+    Fuses schemas, or functions that build them, into one evaluation plan.
+
+    :param schemas: Schema factories, named after the function.
+    :param named_schemas: Schemas or schema factories by name.
+    :return: The fused validator.
+    """
+    named = {factory.__name__: factory for factory in schemas}
+    named.update(named_schemas)
+    return FusedSchemaValidator({
+        name: schema if isinstance(schema, DataFrameSchema) else schema()
+        for name, schema in named.items()
+    })
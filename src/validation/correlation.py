@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+from scipy.stats import rankdata
+
+# Rows of the one-hot matrix multiplied at once when counting joint bins
+_ROW_BLOCK = 16384
+
+
+def sample_rows(df: pd.DataFrame, sample_size: int = None, random_state: int = 123) -> pd.DataFrame:
+    """
+    Draws a seeded sample of rows without replacement.
+
+    :param df: Data frame to sample.
+    :param sample_size: Number of rows to keep, or None to keep every row.
+    :param random_state: Seed for the sample.
+    :return: The sampled rows, or `df` itself when it is not larger than `sample_size`.
+    """
+    if sample_size is None or len(df) <= sample_size:
+        return df
+    return df.sample(n=sample_size, random_state=random_state)
+
+
+def feature_columns(df: pd.DataFrame, target: str) -> list:
+    """Columns checked against the target; datetime columns are left out, as deepchecks does."""
+    return [
+        column for column in df.columns
+        if column != target and not pd.api.types.is_datetime64_any_dtype(df[column].dtype)
+    ]
+
+
+def is_categorical(series: pd.Series, bins: int) -> bool:
+    """Non-numeric columns and integer columns with at most `bins` distinct values are categorical."""
+    if isinstance(series.dtype, pd.CategoricalDtype) or not pd.api.types.is_numeric_dtype(series.dtype):
+        return True
+    return pd.api.types.is_integer_dtype(series.dtype) and series.nunique() <= bins
+
+
+def _numeric_values(series: pd.Series) -> np.ndarray:
+    return series.to_numpy(dtype="float64", na_value=np.nan)
+
+
+def bin_codes(series: pd.Series, bins: int) -> np.ndarray:
+    """
+    Discretises a column into at most `bins` codes plus one code (`bins`) for nulls.
+
+    Categorical columns keep their `bins - 1` most frequent levels and lump the rest
+    together; numeric columns are cut at their quantiles.
+    """
+    missing = series.isna().to_numpy()
+    if is_categorical(series, bins):
+        counts = series.value_counts()
+        top = counts.index[: bins - 1] if len(counts) > bins else counts.index
+        codes = pd.Categorical(series, categories=top).codes.astype(np.int64)
+        codes[codes < 0] = len(top)
+    else:
+        values = _numeric_values(series)
+        edges = np.unique(np.nanquantile(values, np.linspace(0, 1, bins + 1)[1:-1])) if (~missing).any() else []
+        codes = np.searchsorted(edges, values, side="right").astype(np.int64)
+    codes[missing] = bins
+    return codes
+
+
+def spearman_blocks(values: np.ndarray, block_size: int = 32):
+    """
+    Yields the Spearman correlation matrix of the columns of `values` one block of
+    rows at a time, as the Pearson correlation of column ranks.
+
+    Nulls are replaced by the column median before ranking. Each block is a single
+    matrix product, so callers can stop at the first block that breaches a threshold
+    without computing the rest.
+
+    :param values: A float (rows x columns) array.
+    :param block_size: Number of columns per block.
+    :return: An iterator of (start column, correlations of columns start..start+block with all columns).
+    """
+    medians = np.nanmedian(values, axis=0)
+    values = np.where(np.isnan(values), medians, values)
+    ranks = rankdata(values, axis=0)
+    ranks -= ranks.mean(axis=0)
+    norms = np.linalg.norm(ranks, axis=0)
+    norms[norms == 0] = np.inf  # constant columns correlate with nothing
+    ranks /= norms
+    for start in range(0, ranks.shape[1], block_size):
+        yield start, ranks[:, start:start + block_size].T @ ranks
+
+
+def mutual_information_matrix(codes: np.ndarray, n_codes: int):
+    """
+    Computes the mutual information of every pair of binned columns at once.
+
+    The joint histograms of all pairs are the blocks of O.T @ O, where O is the
+    one-hot encoding of the codes; it is accumulated over row blocks so memory stays
+    bounded.
+
+    :param codes: An int (rows x columns) array of bin codes in [0, n_codes).
+    :param n_codes: Number of distinct codes per column.
+    :return: The (columns x columns) mutual information matrix in nats and the entropy of every column.
+    """
+    n_rows, n_columns = codes.shape
+    offsets = np.arange(n_columns) * n_codes
+    joint = np.zeros((n_columns * n_codes, n_columns * n_codes))
+    for start in range(0, n_rows, _ROW_BLOCK):
+        block = codes[start:start + _ROW_BLOCK] + offsets
+        one_hot = np.zeros((len(block), n_columns * n_codes), dtype=np.float32)
+        np.put_along_axis(one_hot, block, 1.0, axis=1)
+        joint += one_hot.T @ one_hot
+    joint = joint.reshape(n_columns, n_codes, n_columns, n_codes).transpose(0, 2, 1, 3) / n_rows
+
+    marginals = joint[np.arange(n_columns), np.arange(n_columns)].diagonal(axis1=1, axis2=2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        entropy = -np.nansum(marginals * np.log(marginals), axis=1)
+        expected = marginals[:, None, :, None] * marginals[None, :, None, :]
+        information = np.nansum(joint * np.log(joint / expected), axis=(2, 3))
+    return np.maximum(information, 0.0), entropy
+
+
+class NumpyCorrelationBackend:
+    """
+    Correlation checks computed with vectorised NumPy on a seeded subsample.
+
+    Feature-label strength is the share of the label's entropy a feature explains,
+    MI(feature, label) / H(label) over binned columns, which like deepchecks' PPS is
+    0 for useless and 1 for perfect predictors. Feature-feature strength is the
+    absolute Spearman correlation for two numeric columns and the normalised mutual
+    information MI / sqrt(H(a) H(b)) when either column is categorical, mirroring
+    deepchecks' Spearman / Cramer's V split.
+    """
+
+    def __init__(self, sample_size: int = 100000, bins: int = 16, block_size: int = 32, random_state: int = 123):
+        self.sample_size = sample_size
+        self.bins = bins
+        self.block_size = block_size
+        self.random_state = random_state
+
+    def feature_label_scores(self, df: pd.DataFrame, target: str) -> pd.Series:
+        """
+        :return: The predictive strength of every feature for `target`, strongest first.
+        """
+        df = sample_rows(df, self.sample_size, self.random_state)
+        features = feature_columns(df, target)
+        codes = np.column_stack([bin_codes(df[column], self.bins) for column in features + [target]])
+        information, entropy = mutual_information_matrix(codes, self.bins + 1)
+        label_entropy = entropy[-1]
+        scores = information[:-1, -1] / label_entropy if label_entropy > 0 else np.zeros(len(features))
+        return pd.Series(np.clip(scores, 0, 1), index=features).sort_values(ascending=False)
+
+    def feature_feature_breaches(self, df: pd.DataFrame, target: str, threshold: float) -> list:
+        """
+        Finds feature pairs whose correlation reaches `threshold`.
+
+        Numeric pairs are checked block by block and the search stops at the first
+        block with a breach; categorical pairs are only scored if no numeric pair breached.
+
+        :return: (feature, feature, strength) tuples for the breaching pairs found.
+        """
+        df = sample_rows(df, self.sample_size, self.random_state)
+        features = feature_columns(df, target)
+        categorical = [column for column in features if is_categorical(df[column], self.bins)]
+        numeric = [column for column in features if column not in categorical]
+
+        if len(numeric) > 1:
+            values = np.column_stack([_numeric_values(df[column]) for column in numeric])
+            for start, block in spearman_blocks(values, self.block_size):
+                strength = np.abs(block)
+                rows, columns = np.nonzero(np.triu(strength >= threshold, k=start + 1))
+                if len(rows):
+                    return [(numeric[start + i], numeric[j], float(strength[i, j])) for i, j in zip(rows, columns)]
+
+        if not categorical:
+            return []
+        codes = np.column_stack([bin_codes(df[column], self.bins) for column in features])
+        information, entropy = mutual_information_matrix(codes, self.bins + 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            strength = np.nan_to_num(information / np.sqrt(np.outer(entropy, entropy)))
+        involves_categorical = np.array([column in categorical for column in features])
+        pairs = np.triu(strength >= threshold, k=1) & (involves_categorical[:, None] | involves_categorical[None, :])
+        return [(features[i], features[j], float(strength[i, j])) for i, j in zip(*np.nonzero(pairs))]
@@ -2,36 +2,110 @@ import logging
 import pandas as pd
 from deepchecks.tabular import Dataset
 from deepchecks.tabular.checks import FeatureLabelCorrelation, FeatureFeatureCorrelation
+from .correlation import NumpyCorrelationBackend
+from .pps import PPSCorrelationBackend
+from .profiling import ValidationProfiler
 
 class CorrelationValidator:
+    BACKENDS = ["deepchecks", "numpy", "pps"]
+
     def __init__(self, target: str, feature_threshold: float = 0.9, feature_feature_threshold: float = 0.8,
-                 log_file: str = None):
+                 log_file: str = None, backend: str = "deepchecks", sample_size: int = 100000,
+                 pps_sample_size: int = 5000, max_workers: int = None, cache=None,
+                 profiler: ValidationProfiler = None):
+        """
+        :param target: Label column.
+        :param feature_threshold: Maximum acceptable feature-label strength.
+        :param feature_feature_threshold: Maximum acceptable feature-feature strength.
+        :param backend: "deepchecks" for its correlation checks on the full frame, "numpy" for
+            the vectorised Spearman and binned mutual information checks, or "pps" for
+            predictive power scores on a shared subsample, scored on a process pool.
+        :param sample_size: Rows sampled by the numpy backend, or None for every row.
+        :param pps_sample_size: Rows in the stratified sample of the pps backend.
+        :param max_workers: Worker processes of the pps backend. Defaults to the CPU count.
+        :param cache: DataCache in which the pps backend keeps its scores, or None.
+        :param profiler: Records the time and memory of every correlation step, if given.
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown correlation backend: expected one of {self.BACKENDS}, got '{backend}'.")
         self.target = target
         self.feature_threshold = feature_threshold
         self.feature_feature_threshold = feature_feature_threshold
-       
-    
-    def check_feature_label_correlation(self, df: pd.DataFrame):
-        dataset = Dataset(df, label=self.target)
-        check = FeatureLabelCorrelation().add_condition_feature_pps_less_than(self.feature_threshold)
-        result = check.run(dataset)
-        if not result.passed_conditions():
+        self.backend = backend
+        self.numpy_backend = NumpyCorrelationBackend(sample_size=sample_size) if backend == "numpy" else None
+        self.pps_backend = (
+            PPSCorrelationBackend(sample_size=pps_sample_size, max_workers=max_workers, cache=cache)
+            if backend == "pps" else None
+        )
+        self.profiler = profiler or ValidationProfiler(enabled=False)
+
+    def _feature_label_passed(self, scores: pd.Series) -> bool:
+        breaches = scores[scores >= self.feature_threshold]
+        if len(breaches):
+            logging.error(f"Features above the threshold: {breaches.round(3).to_dict()}")
+        return not len(breaches)
+
+    def _feature_feature_passed(self, breaches: list) -> bool:
+        if breaches:
+            logging.error(f"Feature pairs above the threshold: {[(a, b, round(s, 3)) for a, b, s in breaches]}")
+        return not breaches
+
+    def _pair_breaches(self, pair_scores: pd.DataFrame) -> list:
+        breaches = pair_scores[pair_scores["ppscore"] >= self.feature_feature_threshold]
+        return list(breaches.itertuples(index=False, name=None))
+
+    def _report_feature_label(self, passed: bool):
+        if not passed:
             logging.error("Feature-Label correlation exceeds the threshold.")
             raise ValueError("Feature-Label correlation exceeds the maximum acceptable threshold.")
         else:
             logging.info("Feature-Label correlation is within the acceptable threshold.")
-    
-    def check_feature_feature_correlation(self, df: pd.DataFrame):
-        dataset = Dataset(df, label=self.target)
-        check = FeatureFeatureCorrelation().add_condition_pps_less_than(self.feature_feature_threshold)
-        result = check.run(dataset)
-        
-        if not result.passed_conditions():
+
+    def _report_feature_feature(self, passed: bool):
+        if not passed:
             logging.error("Feature-Feature correlation exceeds the threshold.")
             raise ValueError("Feature-Feature correlation exceeds the maximum acceptable threshold.")
         else:
             logging.info("Feature-Feature correlation is within the acceptable threshold.")
+
+    def check_feature_label_correlation(self, df: pd.DataFrame):
+        with self.profiler.step("feature_label_correlation", "correlation", len(df)):
+            passed = self._feature_label_check(df)
+        self._report_feature_label(passed)
+
+    def _feature_label_check(self, df: pd.DataFrame) -> bool:
+        if self.numpy_backend is not None:
+            return self._feature_label_passed(self.numpy_backend.feature_label_scores(df, self.target))
+        if self.pps_backend is not None:
+            return self._feature_label_passed(self.pps_backend.scores(df, self.target, pairs=False)[0])
+        dataset = Dataset(df, label=self.target)
+        check = FeatureLabelCorrelation().add_condition_feature_pps_less_than(self.feature_threshold)
+        return check.run(dataset).passed_conditions()
+    
+    def check_feature_feature_correlation(self, df: pd.DataFrame):
+        with self.profiler.step("feature_feature_correlation", "correlation", len(df)):
+            passed = self._feature_feature_check(df)
+        self._report_feature_feature(passed)
+
+    def _feature_feature_check(self, df: pd.DataFrame) -> bool:
+        if self.numpy_backend is not None:
+            breaches = self.numpy_backend.feature_feature_breaches(df, self.target, self.feature_feature_threshold)
+            return self._feature_feature_passed(breaches)
+        if self.pps_backend is not None:
+            return self._feature_feature_passed(self._pair_breaches(self.pps_backend.scores(df, self.target)[1]))
+        dataset = Dataset(df, label=self.target)
+        check = FeatureFeatureCorrelation().add_condition_max_number_of_pairs_above_threshold(
+            self.feature_feature_threshold
+        )
+        return check.run(dataset).passed_conditions()
     
     def run_all_checks(self, df: pd.DataFrame):
+        if self.pps_backend is not None:
+            # One sample, one Dataset and one batch of pool jobs serve both checks
+            with self.profiler.step("pps_scores", "correlation", len(df)):
+                label_scores, pair_scores = self.pps_backend.scores(df, self.target)
+            self._report_feature_label(self._feature_label_passed(label_scores))
+            self._report_feature_feature(self._feature_feature_passed(self._pair_breaches(pair_scores)))
+            return
         self.check_feature_label_correlation(df)
         self.check_feature_feature_correlation(df)
@@ -0,0 +1,83 @@
+import logging
+import numpy as np
+import pandas as pd
+from pandera import DataFrameSchema
+from .schema import get_taxi_data_schema
+
+
+def _allowed_values(column) -> list:
+    for check in column.checks:
+        if check.name == "isin":
+            return list(check.statistics["allowed_values"])
+    return None
+
+
+def _downcast_integer(series: pd.Series, allowed: list = None) -> pd.Series:
+    # Size integer codes by the values the schema allows, so every chunk or month
+    # of the same column ends up with the same dtype; other columns by their data.
+    values = pd.Series(allowed) if allowed and series.isin(allowed).all() else series
+    if values.empty:
+        return series
+    target = pd.to_numeric(
+        pd.Series([values.min(), values.max()]),
+        downcast="unsigned" if values.min() >= 0 else "integer",
+    ).dtype
+    return series.astype(target)
+
+
+def _downcast_float(series: pd.Series) -> pd.Series:
+    # Only downcast when every value survives the round trip exactly (e.g. counts and codes).
+    downcast = series.astype(np.float32)
+    if np.array_equal(downcast.astype(series.dtype).to_numpy(), series.to_numpy(), equal_nan=True):
+        return downcast
+    return series
+
+
+def memory_usage_mb(df: pd.DataFrame) -> float:
+    """Returns the deep memory usage of a data frame in megabytes."""
+    return df.memory_usage(deep=True).sum() / 1024**2
+
+
+def optimize_dtypes(df: pd.DataFrame, schema: DataFrameSchema = None, categorical_codes: bool = False) -> pd.DataFrame:
+    """
+    Converts the columns described by the taxi schema to compact dtypes.
+
+    - Integer columns are downcast to the smallest integer type; code columns
+      with an `isin` check are sized by their allowed values.
+    - Float columns are downcast to float32 when no value changes.
+    - String code columns (such as `store_and_fwd_flag`) become categoricals.
+    - With `categorical_codes`, numeric code columns become categoricals too.
+      They are kept numeric by default, since 1-byte integers are as compact as
+      categorical codes and keep the columns usable for statistics.
+
+    Columns that are not in the schema, or whose dtype does not match it, are left untouched.
+
+    :param df: Data frame to convert.
+    :param schema: Schema whose columns drive the conversion. Defaults to the taxi data schema.
+    :param categorical_codes: Also store numeric code columns as categoricals.
+    :return: A data frame with compact dtypes.
+    """
+    schema = schema or get_taxi_data_schema()
+    before = memory_usage_mb(df)
+    converted = {}
+
+    for name, column in schema.columns.items():
+        if name not in df.columns:
+            continue
+        series = df[name]
+        allowed = _allowed_values(column)
+        if allowed and (categorical_codes or not pd.api.types.is_numeric_dtype(series)):
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                continue
+            extra = [value for value in series.dropna().unique() if value not in allowed]
+            converted[name] = series.astype(pd.CategoricalDtype(allowed + sorted(extra, key=str)))
+        elif pd.api.types.is_integer_dtype(series):
+            converted[name] = _downcast_integer(series, allowed)
+        elif pd.api.types.is_float_dtype(series):
+            converted[name] = _downcast_float(series)
+
+    optimized = df.assign(**converted)
+    logging.info(
+        f"Optimized dtypes: memory usage reduced from {before:.2f} MB to {memory_usage_mb(optimized):.2f} MB."
+    )
+    return optimized
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import numpy as np
+import pandas as pd
+from pandera import DataFrameSchema
+from ..data_io import DataCache, hash_rows
+
+
+def _function_fingerprint(fn) -> str:
+    # Bytecode and constants identify a check function across runs, unlike its repr
+    code = getattr(fn, "__code__", None)
+    if code is None:
+        return repr(fn)
+    return code.co_code.hex() + repr(code.co_consts) + repr(code.co_names)
+
+
+def check_fingerprint(check) -> dict:
+    """
+    Describes everything about a pandera check that decides its outcome: its name, error,
+    statistics and the bytecode of its function. Checks with equal fingerprints compute
+    the same result, which FusedSchemaValidator uses to evaluate shared checks once.
+    """
+    return {
+        "name": check.name,
+        "error": check.error,
+        "element_wise": check.element_wise,
+        "ignore_na": check.ignore_na,
+        "statistics": repr(check.statistics),
+        "fn": _function_fingerprint(check._check_fn),
+    }
+
+
+def schema_fingerprint(schema: DataFrameSchema) -> str:
+    """
+    Hashes everything about a schema that decides which rows pass it: column dtypes,
+    nullability, coercion and the statistics and code of every check.
+
+    :param schema: The pandera schema.
+    :return: A hex digest that changes whenever the compiled schema does.
+    """
+    description = {
+        "coerce": schema.coerce,
+        "strict": schema.strict,
+        "columns": {
+            name: {
+                "dtype": str(column.dtype),
+                "nullable": column.nullable,
+                "coerce": column.coerce,
+                "required": column.required,
+                "unique": column.unique,
+                "checks": [check_fingerprint(check) for check in column.checks],
+            }
+            for name, column in schema.columns.items()
+        },
+        "checks": [check_fingerprint(check) for check in schema.checks],
+    }
+    return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+
+def chunk_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Hashes the content of a chunk: its column names, dtypes and 64-bit row hashes.
+
+    :param df: The chunk.
+    :return: A hex digest that is the same for identical chunks from any file.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[name, str(dtype)] for name, dtype in df.dtypes.items()]).encode())
+    digest.update(hash_rows(df).tobytes())
+    return digest.hexdigest()
+
+
+def row_group_fingerprint(metadata: dict, start: int, rows: int, columns: list = None, filters: list = None) -> str:
+    """
+    Hashes the content of a chunk of a Parquet row group without decoding it: the row
+    group's column chunk statistics and compressed byte digests, the chunk's rows within
+    it, and the projection and filters it was read with. The file's path and position in
+    it are not part of the key, so unchanged row groups of a rewritten file, e.g. a year
+    file that gained a month, keep their cached results.
+
+    :param metadata: The row group's `row_group_metadata`.
+    :param start: Offset of the chunk in the row group's returned rows.
+    :param rows: Number of rows in the chunk.
+    :param columns: Columns the chunk was read with.
+    :param filters: Predicates the chunk was read with.
+    :return: A hex digest that changes whenever the row group's content or the read does.
+    """
+    description = {
+        "row_group": {"rows": metadata["rows"], "column_chunks": metadata["column_chunks"]},
+        "rows": [start, rows],
+        "columns": columns,
+        "filters": [list(predicate) if isinstance(predicate, tuple) else predicate for predicate in filters or []],
+    }
+    return hashlib.sha256(json.dumps(description, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class ValidationResultCache:
+    """
+    Stores the outcome of validating a chunk, keyed by the chunk's fingerprint and the
+    validation settings, so unchanged chunks are not validated again. Chunks of Parquet
+    files are fingerprinted from their row group's metadata, other chunks from their rows.
+
+    Each entry holds the row-validity mask and the failure report of one chunk.
+    Failure cases refer to rows by position within the chunk, so a cached chunk
+    can be reused at any offset in any file. Failure case values are stored as
+    strings, the form in which they are logged.
+    """
+
+    def __init__(self, cache: DataCache, schema: DataFrameSchema, **settings):
+        """
+        :param cache: The data cache the results are kept in.
+        :param schema: The schema the chunks are validated against.
+        :param settings: Anything else the result depends on, such as the backend and thresholds.
+        """
+        self.cache = cache
+        self.settings = settings
+        self.settings_key = hashlib.sha256(
+            (schema_fingerprint(schema) + json.dumps(settings, sort_keys=True, default=str)).encode()
+        ).hexdigest()
+
+    def get(self, df: pd.DataFrame, fingerprint: str):
+        """
+        Looks up the cached result of validating a chunk.
+
+        :param df: The chunk.
+        :param fingerprint: The chunk's `chunk_fingerprint` or `row_group_fingerprint`.
+        :return: A boolean mask of the invalid rows and the failure report (None if the
+            chunk passed), or None if the chunk has not been validated with these settings.
+        """
+        mask = self.cache.cached_frame("validation-mask", fingerprint, self.settings_key)
+        if mask is None or len(mask) != len(df):
+            return None
+        report = self.cache.cached_frame("validation-report", fingerprint, self.settings_key)
+        if report is None:
+            return None
+        invalid = ~mask["valid"].to_numpy()
+        if report.empty:
+            return invalid, None
+        if "index" in report.columns:
+            positions = report["index"]
+            labels = pd.Series(df.index.take(positions.fillna(0).astype("int64")), index=report.index)
+            report["index"] = labels.astype(object).where(positions.notna(), None)
+        return invalid, report
+
+    def put(self, df: pd.DataFrame, fingerprint: str, invalid: np.ndarray, report: pd.DataFrame):
+        """
+        Stores the result of validating a chunk.
+
+        :param df: The chunk.
+        :param fingerprint: The chunk's `chunk_fingerprint` or `row_group_fingerprint`.
+        :param invalid: Boolean mask of the invalid rows, or None if the chunk passed.
+        :param report: The failure report, or None if the chunk passed.
+        """
+        valid = np.ones(len(df), dtype=bool) if invalid is None else ~np.asarray(invalid, dtype=bool)
+        if report is None:
+            report = pd.DataFrame()
+        else:
+            report = report.reset_index(drop=True)
+            if "failure_case" in report.columns:
+                report["failure_case"] = report["failure_case"].astype(str)
+            if "index" in report.columns:
+                labels = report["index"]
+                positions = pd.Series(df.index.get_indexer(labels.fillna(-1)), index=report.index)
+                report["index"] = positions.where(labels.notna()).astype("Int64")
+        self.cache.store_frame(pd.DataFrame({"valid": valid}), "validation-mask", fingerprint, self.settings_key)
+        self.cache.store_frame(report, "validation-report", fingerprint, self.settings_key)
@@ -0,0 +1,238 @@
+import numpy as np
+import pandas as pd
+from pandera import Check, DataFrameSchema
+from pandera.engines import pandas_engine
+from .schema import get_taxi_data_schema
+from .profiling import ValidationProfiler
+
+# Built-in pandera checks evaluated directly on the column's NumPy values.
+_NUMPY_CHECKS = {
+    "greater_than_or_equal_to": lambda values, stats: values >= stats["min_value"],
+    "greater_than": lambda values, stats: values > stats["min_value"],
+    "less_than_or_equal_to": lambda values, stats: values <= stats["max_value"],
+    "less_than": lambda values, stats: values < stats["max_value"],
+    "equal_to": lambda values, stats: values == stats["value"],
+    "not_equal_to": lambda values, stats: values != stats["value"],
+}
+
+
+# The helpers below evaluate single steps of a compiled schema. They are shared with
+# FusedSchemaValidator, which runs the steps of several schemas in one plan.
+
+
+def check_label(check: Check) -> str:
+    """Returns the label pandera puts in the "check" column of its failure cases."""
+    return check.error or check.name
+
+
+def dtype_mismatch(column, series: pd.Series) -> bool:
+    """Whether a column that is not coerced has a dtype other than the schema's."""
+    return column.dtype is not None and not column.dtype.check(pandas_engine.Engine.dtype(series.dtype))
+
+
+def column_check_failures(evaluate, series: pd.Series, values: np.ndarray, null: np.ndarray):
+    """
+    Returns the failing-row mask of a compiled column check, or whether it failed as a whole.
+
+    :param evaluate: Compiled check, called with the column and its NumPy values.
+    :param series: The (coerced) column.
+    :param values: The column's values.
+    :param null: Mask of the column's nulls, which pass.
+    """
+    try:
+        output = evaluate(series, values)
+    except Exception:
+        # pandera reports a check that raises as a failure of the whole column
+        output = False
+    if np.ndim(output) == 0:
+        return not bool(output)
+    return ~(np.asarray(output, dtype=bool) | null)
+
+
+def frame_check_failures(check: Check, frame: pd.DataFrame, empty_rows):
+    """
+    Returns the failing-row mask of a frame-level check, or whether it failed as a whole.
+    `empty_rows` is called for the mask of fully empty rows, which pass, when it is needed.
+    """
+    output = check._check_fn(frame)
+    if np.ndim(output) == 0:
+        return not bool(output)
+    if isinstance(output, pd.DataFrame):
+        output = output.all(axis=1)
+    return ~(np.asarray(output, dtype=bool) | empty_rows())
+
+
+def lazy_empty_rows(frame: pd.DataFrame):
+    """Returns a function computing the mask of fully empty rows of `frame` once, on first call."""
+    mask = []
+
+    def empty_rows():
+        if not mask:
+            mask.append(frame.isna().all(axis=1).to_numpy())
+        return mask[0]
+
+    return empty_rows
+
+
+class FailureRecorder:
+    """Folds check outcomes into a row-validity mask and failure counts per (column, check)."""
+
+    def __init__(self, rows: int):
+        self.valid = np.ones(rows, dtype=bool)
+        self.failure_counts = {}
+
+    def record(self, column, check: str, failed):
+        """
+        :param failed: Mask of the failing rows, or a bool for a check that passes or fails as a whole.
+        """
+        if np.ndim(failed) == 0:
+            if not failed:
+                return
+            count = 1
+        else:
+            count = int(failed.sum())
+            if not count:
+                return
+            self.valid[failed] = False
+        self.failure_counts[(column, check)] = self.failure_counts.get((column, check), 0) + count
+
+
+class NativeValidationResult:
+    """
+    Outcome of a native schema evaluation.
+
+    Attributes:
+        valid (np.ndarray): Boolean row-validity mask, one entry per input row.
+        failure_counts (dict): Number of failing rows per (column, check) pair; frame-level
+            checks use None as the column. Checks that fail as a whole count 1.
+        coerced (pd.DataFrame): The input with every schema column coerced to its dtype.
+    """
+
+    def __init__(self, valid: np.ndarray, failure_counts: dict, coerced: pd.DataFrame):
+        self.valid = valid
+        self.failure_counts = failure_counts
+        self.coerced = coerced
+
+    @property
+    def passed(self) -> bool:
+        return not self.failure_counts
+
+    def report(self) -> pd.DataFrame:
+        """Returns the failure counts as a table with column, check and failures columns."""
+        return pd.DataFrame(
+            [(column, check, count) for (column, check), count in self.failure_counts.items()],
+            columns=["column", "check", "failures"],
+        )
+
+
+class NativeSchemaValidator:
+    """
+    Evaluates a pandera schema with fused, vectorised NumPy mask operations.
+
+    The schema is compiled once into a list of per-column programs. Each column
+    is coerced and checked in a single pass over its values, and all failures are
+    folded into one row-validity mask plus per-check failure counts, without
+    building pandera's per-element failure case table. Built-in comparison checks
+    run directly on NumPy arrays; `isin` and custom checks run vectorised on the
+    column. Frame-level checks run once on the coerced frame.
+
+    Null values pass column checks and fully empty rows pass frame checks, as in
+    pandera, so for frames whose columns have (or cleanly coerce to) the schema
+    dtypes the invalid rows are exactly the ones the pandera path drops.
+    """
+
+    def __init__(self, schema: DataFrameSchema = None):
+        self.schema = schema or get_taxi_data_schema()
+        self.columns = [
+            (name, column, [self._compile_check(check) for check in column.checks])
+            for name, column in self.schema.columns.items()
+        ]
+        self.frame_checks = [(check_label(check), check) for check in self.schema.checks]
+
+    def _compile_check(self, check: Check):
+        label = check_label(check)
+        if check.name in _NUMPY_CHECKS and not check.element_wise:
+            compare = _NUMPY_CHECKS[check.name]
+            statistics = check.statistics
+            return label, lambda series, values: compare(values, statistics)
+        if check.name == "isin":
+            allowed = check.statistics["allowed_values"]
+            return label, lambda series, values: series.isin(allowed).to_numpy()
+        if check.element_wise:
+            return label, lambda series, values: series.map(check._check_fn)
+        return label, lambda series, values: check._check_fn(series)
+
+    @staticmethod
+    def coerce(series: pd.Series, dtype: str):
+        """Returns the coerced column and a mask of non-null values that could not be coerced."""
+        no_failures = np.zeros(len(series), dtype=bool)
+        if str(series.dtype) == dtype:
+            return series, no_failures
+        if dtype in ("int64", "float64"):
+            numeric = pd.to_numeric(series, errors="coerce")
+            failed = numeric.isna().to_numpy() & series.notna().to_numpy()
+            if dtype == "int64":
+                failed |= numeric.notna().to_numpy() & (numeric.to_numpy() % 1 != 0)
+                if failed.any() or numeric.isna().any():
+                    return series, failed
+            return numeric.astype(dtype), failed
+        if dtype == "datetime64[ns]":
+            converted = pd.to_datetime(series, errors="coerce")
+            return converted, converted.isna().to_numpy() & series.notna().to_numpy()
+        if dtype == "str":
+            if series.dtype == object:
+                return series, no_failures
+            return series.astype(object).where(series.notna(), None).map(
+                lambda value: value if value is None else str(value)
+            ), no_failures
+        try:
+            return series.astype(dtype), no_failures
+        except (TypeError, ValueError):
+            return series, series.notna().to_numpy()
+
+    def validate(self, df: pd.DataFrame, profiler: ValidationProfiler = None) -> NativeValidationResult:
+        """
+        Evaluates the compiled schema on a data frame.
+
+        :param df: Data frame to validate.
+        :param profiler: Records the time and memory of every coercion, column check and
+            frame check, under the column name, if given.
+        :return: The row-validity mask, per-check failure counts and the coerced frame.
+        """
+        profiler = profiler or ValidationProfiler(enabled=False)
+        rows = len(df)
+        failures = FailureRecorder(rows)
+        record = failures.record
+
+        coerced_columns = {}
+        for name, column, checks in self.columns:
+            if name not in df.columns:
+                record(name, "column_in_dataframe", column.required)
+                continue
+            dtype = str(column.dtype)
+            with profiler.step(name, "column", rows):
+                with profiler.step(f"coerce_dtype('{dtype}')", "coercion", rows):
+                    series, failed = (
+                        self.coerce(df[name], dtype) if self.schema.coerce or column.coerce else (df[name], None)
+                    )
+                if failed is not None:
+                    record(name, f"coerce_dtype('{dtype}')", failed)
+                    coerced_columns[name] = series
+                else:
+                    record(name, f"dtype('{dtype}')", dtype_mismatch(column, series))
+
+                null = series.isna().to_numpy()
+                if not column.nullable:
+                    record(name, "not_nullable", null)
+                values = series.to_numpy()
+                for label, evaluate in checks:
+                    with profiler.step(label, "column_check", rows):
+                        record(name, label, column_check_failures(evaluate, series, values, null))
+
+        coerced = df.assign(**coerced_columns)
+        empty_rows = lazy_empty_rows(coerced)
+        for label, check in self.frame_checks:
+            with profiler.step(label, "frame_check", rows):
+                record(None, label, frame_check_failures(check, coerced, empty_rows))
+
+        return NativeValidationResult(failures.valid, failures.failure_counts, coerced)
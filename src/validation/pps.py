@@ -0,0 +1,134 @@
+import hashlib
+import itertools
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import deepchecks.ppscore as pps
+from deepchecks.tabular import Dataset
+from deepchecks.tabular.utils.task_inference import infer_task_type_by_labels
+from deepchecks.tabular.utils.task_type import TaskType
+from ..data_io import DataCache, hash_rows
+
+
+def stratified_sample(df: pd.DataFrame, target: str, sample_size: int, random_state: int = 123) -> pd.DataFrame:
+    """
+    Draws a seeded sample of about `sample_size` rows that keeps the share of every target class.
+
+    :param df: Data frame to sample.
+    :param target: Column to stratify on.
+    :param sample_size: Number of rows to keep.
+    :param random_state: Seed for the sample.
+    :return: The sampled rows in their original order, or `df` itself if it is not larger than `sample_size`.
+    """
+    if len(df) <= sample_size:
+        return df
+    fraction = sample_size / len(df)
+    return df.groupby(target, dropna=False, group_keys=False, observed=True).sample(
+        frac=fraction, random_state=random_state
+    ).sort_index()
+
+
+def column_fingerprint(series: pd.Series) -> str:
+    """Hashes a column's name, dtype and values."""
+    digest = hashlib.sha256(f"{series.name}:{series.dtype}".encode())
+    digest.update(hash_rows(series.to_frame()).tobytes())
+    return digest.hexdigest()
+
+
+def _pps_score(frame: pd.DataFrame, x: str, y: str, random_state: int) -> float:
+    # ppscore treats object targets as classification and numeric ones as regression
+    return float(pps.score(frame, x, y, sample=None, random_seed=random_state)["ppscore"])
+
+
+class PPSCorrelationBackend:
+    """
+    Predictive power scores with deepchecks' ppscore, computed once per column pair.
+
+    The frame is reduced to a stratified, seeded sample, and a single deepchecks
+    Dataset built on it decides the features, which of them are categorical and the
+    label's task type. Every feature-label and feature-feature direction is then an
+    independent job run on a process pool, each shipped just its two sampled
+    columns. Scores are cached by the fingerprints of those columns, in memory and,
+    given a DataCache, on disk, so changing thresholds or other columns does not
+    score an unchanged pair again. A pair's strength is the larger of its two
+    directional scores.
+    """
+
+    def __init__(self, sample_size: int = 5000, max_workers: int = None, cache: DataCache = None,
+                 random_state: int = 123):
+        self.sample_size = sample_size
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cache = cache
+        self.random_state = random_state
+        self._scores = None
+
+    def _cached_scores(self) -> dict:
+        if self._scores is None:
+            self._scores = {}
+            table = self.cache.cached_frame("pps-scores", self.random_state) if self.cache is not None else None
+            if table is not None:
+                self._scores = {(x, y): score for x, y, score in table.itertuples(index=False)}
+        return self._scores
+
+    def _store_scores(self):
+        if self.cache is not None:
+            table = pd.DataFrame(
+                [(x, y, score) for (x, y), score in self._scores.items()], columns=["x", "y", "ppscore"]
+            )
+            self.cache.store_frame(table, "pps-scores", self.random_state, source="pps")
+
+    def _prepare(self, df: pd.DataFrame, target: str):
+        sample = stratified_sample(df, target, self.sample_size, self.random_state)
+        dataset = Dataset(sample, label=target)
+        features = dataset.numerical_features + dataset.cat_features
+        frame = sample[features + [target]].copy()
+        for column in dataset.cat_features:
+            frame[column] = frame[column].astype(object)
+        if infer_task_type_by_labels(frame[target]) != TaskType.REGRESSION:
+            frame[target] = frame[target].astype(object)
+        return frame, features
+
+    def scores(self, df: pd.DataFrame, target: str, pairs: bool = True):
+        """
+        Computes the feature-label scores and, if `pairs` is set, the feature-feature scores.
+
+        :param df: Data frame to score.
+        :param target: Label column.
+        :param pairs: Whether to score feature pairs too.
+        :return: The feature-label scores, strongest first, and a table of feature pairs
+            with their strength (None if `pairs` is not set).
+        """
+        frame, features = self._prepare(df, target)
+        fingerprints = {column: column_fingerprint(frame[column]) for column in frame.columns}
+        directions = [(feature, target) for feature in features]
+        if pairs:
+            directions += list(itertools.permutations(features, 2))
+
+        scores = self._cached_scores()
+        missing = [(x, y) for x, y in directions if (fingerprints[x], fingerprints[y]) not in scores]
+        logging.info(f"Scoring {len(missing)} of {len(directions)} PPS directions; the rest are cached.")
+        if missing:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                results = pool.map(
+                    _pps_score,
+                    [frame[[x, y]] for x, y in missing],
+                    [x for x, _ in missing],
+                    [y for _, y in missing],
+                    itertools.repeat(self.random_state),
+                )
+                for (x, y), score in zip(missing, results):
+                    scores[(fingerprints[x], fingerprints[y])] = score
+            self._store_scores()
+
+        def score(x, y):
+            return scores[(fingerprints[x], fingerprints[y])]
+
+        label_scores = pd.Series({feature: score(feature, target) for feature in features}).sort_values(ascending=False)
+        if not pairs:
+            return label_scores, None
+        pair_scores = pd.DataFrame(
+            [(a, b, max(score(a, b), score(b, a))) for a, b in itertools.combinations(features, 2)],
+            columns=["feature_a", "feature_b", "ppscore"],
+        ).sort_values("ppscore", ascending=False, ignore_index=True)
+        return label_scores, pair_scores
@@ -0,0 +1,144 @@
+import contextlib
+import json
+import os
+import time
+import tracemalloc
+import pandas as pd
+
+
+class ValidationProfiler:
+    """
+    Records wall time, rows per second and peak memory of named validation steps.
+
+    Steps nest: a step opened inside another is recorded under the path of every
+    enclosing step, e.g. "validate;schema;VendorID;isin([1, 2])". Repeated steps,
+    such as the same check on every chunk, are summed per path. Peak memory is the
+    highest traced Python and NumPy allocation while the step ran, above what was
+    allocated when it started; it is measured with tracemalloc, which slows down
+    allocation-heavy code, so it can be switched off with `track_memory`.
+
+    A disabled profiler accepts every call and records nothing, so callers can
+    instrument their code unconditionally.
+    """
+
+    def __init__(self, enabled: bool = True, track_memory: bool = True):
+        self.enabled = enabled
+        self.track_memory = track_memory and enabled
+        self.steps = {}
+        self._stack = []
+        self._started_tracing = False
+
+    @contextlib.contextmanager
+    def step(self, name: str, kind: str, rows: int = None):
+        """
+        Times the enclosed block as step `name`.
+
+        :param name: Step name, unique among the steps of the enclosing step.
+        :param kind: Step category, such as "load", "column_check", "frame_check" or "correlation".
+        :param rows: Rows processed by the step, for its throughput. Steps that only know
+            their row count at the end can set "rows" on the yielded step record instead.
+        """
+        if not self.enabled:
+            yield {}
+            return
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        path = self._child_path(name)
+        frame = {"path": path, "peak": 0, "rows": rows}
+        if self.track_memory:
+            frame["start"], traced_peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                # Keep the enclosing step's peak so far before the peak is reset for this one
+                parent = self._stack[-1]
+                parent["peak"] = max(parent["peak"], traced_peak - parent["start"])
+            tracemalloc.reset_peak()
+        self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield frame
+        finally:
+            seconds = time.perf_counter() - start
+            self._stack.pop()
+            peak = 0
+            if self.track_memory:
+                _, traced_peak = tracemalloc.get_traced_memory()
+                peak = max(traced_peak - frame["start"], frame["peak"], 0)
+                if self._stack:
+                    # tracemalloc has a single peak, so the enclosing step keeps the maximum of its children
+                    parent = self._stack[-1]
+                    parent["peak"] = max(parent["peak"], peak + frame["start"] - parent["start"])
+            self._record(path, kind, seconds, frame["rows"], peak)
+
+    def iterate(self, items, name: str, kind: str = "load"):
+        """Yields from `items`, timing the production of each item (e.g. each chunk read) as step `name`."""
+        items = iter(items)
+        while True:
+            with self.step(name, kind) as step:
+                item = next(items, None)
+                if isinstance(item, pd.DataFrame):
+                    step["rows"] = len(item)
+            if item is None:
+                return
+            yield item
+
+    def _child_path(self, name: str) -> str:
+        # Semicolons separate the frames of a folded stack
+        return ";".join([frame["path"] for frame in self._stack[-1:]] + [name.replace(";", ",")])
+
+    def _record(self, path: str, kind: str, seconds: float, rows: int, peak: int):
+        entry = self.steps.setdefault(path, {"kind": kind, "calls": 0, "seconds": 0.0, "rows": None, "peak_bytes": 0})
+        entry["calls"] += 1
+        entry["seconds"] += seconds
+        if rows is not None:
+            entry["rows"] = (entry["rows"] or 0) + rows
+        entry["peak_bytes"] = max(entry["peak_bytes"], peak)
+
+    def report(self) -> list:
+        """
+        :return: One record per step path with its kind, calls, total seconds, rows,
+            rows per second and peak memory in MB, in the order the steps first ran.
+        """
+        records = []
+        for path, entry in self.steps.items():
+            rows = entry["rows"]
+            records.append({
+                "step": path,
+                "kind": entry["kind"],
+                "calls": entry["calls"],
+                "seconds": round(entry["seconds"], 6),
+                "rows": rows,
+                "rows_per_second": round(rows / entry["seconds"], 1) if rows and entry["seconds"] > 0 else None,
+                "peak_memory_mb": round(entry["peak_bytes"] / 1024 ** 2, 3) if self.track_memory else None,
+            })
+        return records
+
+    def write_json(self, path: str) -> str:
+        """Writes the step report as JSON and returns its path."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"steps": self.report()}, f, indent=2)
+        return path
+
+    def write_folded(self, path: str) -> str:
+        """
+        Writes the steps in the folded stack format read by flamegraph.pl, inferno and
+        speedscope: one "outer;inner <microseconds>" line per step, holding the time
+        spent in the step itself rather than in its child steps.
+        """
+        self_time = {step: entry["seconds"] for step, entry in self.steps.items()}
+        for step, entry in self.steps.items():
+            parent = step.rpartition(";")[0]
+            if parent in self_time:
+                self_time[parent] -= entry["seconds"]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            for step, seconds in self_time.items():
+                f.write(f"{step} {max(int(seconds * 1e6), 0)}\n")
+        return path
+
+    def close(self):
+        """Stops the memory tracing started by this profiler."""
+        if self._started_tracing and not self._stack:
+            tracemalloc.stop()
+            self._started_tracing = False
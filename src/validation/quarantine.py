@@ -0,0 +1,73 @@
+import os
+import numpy as np
+import pandas as pd
+from ..data_io import write_table
+
+# Failure case values and row numbers shown per check in the log summary
+SUMMARY_SAMPLES = 3
+
+
+def invalid_mask(index: pd.Index, failure_cases: pd.DataFrame) -> np.ndarray:
+    """
+    Marks the rows named in pandera failure cases.
+
+    :param index: Index of the validated frame.
+    :param failure_cases: Failure cases with an "index" column of row labels.
+    :return: A boolean array, True for invalid rows.
+    """
+    return index.isin(failure_cases["index"].dropna().unique())
+
+
+def summarize_failures(failure_cases: pd.DataFrame, samples: int = SUMMARY_SAMPLES) -> pd.DataFrame:
+    """
+    Condenses failure cases into one row per check with its failure count and a few
+    sample values and row numbers. Frame-wide checks are reported once per row,
+    without a column or value.
+
+    :param failure_cases: Pandera failure cases, or a native report that already holds counts.
+    :param samples: Number of sample values and rows kept per check.
+    :return: The summary, most frequent failures first.
+    """
+    if "failures" in failure_cases.columns:
+        summary = failure_cases.groupby(["column", "check"], dropna=False, sort=False)["failures"].sum()
+        return summary.reset_index().sort_values("failures", ascending=False, ignore_index=True)
+
+    if "schema_context" in failure_cases.columns:
+        # A frame-wide check fails once per column of a bad row; count it once per row. The
+        # rows are masked in place rather than concatenated, since the frame-wide part is
+        # empty or has all-null columns, which pandas warns about when concatenating.
+        frame_wide = failure_cases["schema_context"] == "DataFrameSchema"
+        repeated = frame_wide & failure_cases.duplicated(["schema_context", "check", "index"])
+        failure_cases = failure_cases[~repeated].copy()
+        failure_cases.loc[frame_wide[~repeated], ["column", "failure_case"]] = None
+    grouped = failure_cases.groupby(["column", "check"], dropna=False, sort=False)
+    summary = grouped.agg(
+        failures=("check", "size"),
+        sample_cases=("failure_case", lambda cases: list(cases.dropna().astype(str).unique()[:samples])),
+        sample_rows=("index", lambda rows: [int(row) for row in rows.dropna().unique()[:samples]]),
+    )
+    return summary.reset_index().sort_values("failures", ascending=False, ignore_index=True)
+
+
+def write_quarantine(quarantine_dir: str, name: str, failure_cases: pd.DataFrame, rejected_rows: pd.DataFrame) -> list:
+    """
+    Writes the failure cases and the rejected rows to zstd-compressed Parquet files.
+
+    Failure case values are stored as strings, since a single column holds values of
+    every checked column. Rejected rows keep their row number in the input as "row".
+
+    :param quarantine_dir: Directory for the quarantine files.
+    :param name: Name of the validated input, used as the file name prefix.
+    :param failure_cases: Failure cases or report of the failed checks.
+    :param rejected_rows: The rows dropped as invalid, indexed by their row number.
+    :return: The paths written.
+    """
+    os.makedirs(quarantine_dir, exist_ok=True)
+    failure_cases = failure_cases.reset_index(drop=True)
+    if "failure_case" in failure_cases.columns:
+        failure_cases["failure_case"] = failure_cases["failure_case"].astype(str)
+    return [
+        write_table(failure_cases, os.path.join(quarantine_dir, f"{name}_failure_cases"), "parquet"),
+        write_table(rejected_rows.rename_axis("row").reset_index(),
+                    os.path.join(quarantine_dir, f"{name}_rejected_rows"), "parquet"),
+    ]
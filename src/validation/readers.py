@@ -0,0 +1,224 @@
+import csv
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+from pandera import DataFrameSchema
+from .schema import get_taxi_data_schema
+from ..data_io import iter_frames
+
+# Datetime layout written by pandas and the TLC exports; ISO 8601 is accepted as a fallback.
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_ARROW_TYPES = {
+    "int64": pa.int64(),
+    "float64": pa.float64(),
+    "str": pa.string(),
+    "datetime64[ns]": pa.timestamp("ns"),
+}
+
+
+def schema_arrow_types(schema: DataFrameSchema = None) -> dict:
+    """
+    Builds an explicit Arrow column type map from a pandera schema.
+
+    The types are the ones pandera coerces the columns to, so a frame read with
+    them already matches the schema and coercion is a no-op.
+
+    :param schema: Schema to translate. Defaults to the taxi data schema.
+    :return: Mapping of column name to Arrow type.
+    """
+    schema = schema or get_taxi_data_schema()
+    return {
+        name: _ARROW_TYPES[str(column.dtype)]
+        for name, column in schema.columns.items()
+        if str(column.dtype) in _ARROW_TYPES
+    }
+
+
+def recover_numeric(df: pd.DataFrame, schema: DataFrameSchema = None) -> pd.DataFrame:
+    """
+    Restores the numbers in numeric schema columns that pandas read as strings.
+
+    One unparsable cell makes pandas read a whole column as strings, so every row
+    would fail the schema's value checks. Parsable values are turned back into
+    numbers and the rest are kept as they are, so only the rows holding them fail.
+
+    :param df: Frame read with pandas type inference.
+    :param schema: Schema providing the column types. Defaults to the taxi data schema.
+    :return: The frame with the parsable values of those columns restored.
+    """
+    schema = schema or get_taxi_data_schema()
+    for name, column in schema.columns.items():
+        if name not in df.columns or df[name].dtype != object or str(column.dtype) not in ("int64", "float64"):
+            continue
+        values = pd.to_numeric(df[name], errors="coerce")
+        df[name] = values.astype(object).where(values.notna() | df[name].isna(), df[name])
+    return df
+
+
+def read_header(file_path: str, delimiter: str = ",") -> list:
+    """Returns the column names from the first line of a CSV file."""
+    with open(file_path, "r", newline="") as f:
+        return next(csv.reader(f, delimiter=delimiter), [])
+
+
+def _csv_options(file_path: str, schema: DataFrameSchema, columns: list, delimiter: str, use_threads: bool,
+                 block_size: int = None) -> dict:
+    header = read_header(file_path, delimiter)
+    include_columns = header if columns is None else [column for column in header if column in columns]
+    column_types = {
+        name: arrow_type
+        for name, arrow_type in schema_arrow_types(schema).items()
+        if name in include_columns
+    }
+    read_options = pv.ReadOptions(use_threads=use_threads)
+    if block_size:
+        read_options.block_size = block_size
+    return dict(
+        read_options=read_options,
+        parse_options=pv.ParseOptions(delimiter=delimiter),
+        convert_options=pv.ConvertOptions(
+            column_types=column_types,
+            include_columns=include_columns,
+            timestamp_parsers=[DATETIME_FORMAT, pv.ISO8601],
+            strings_can_be_null=True,
+        ),
+    )
+
+
+def read_taxi_csv(file_path: str, schema: DataFrameSchema = None, columns: list = None,
+                  delimiter: str = ",", use_threads: bool = True) -> pd.DataFrame:
+    """
+    Reads a taxi CSV file with the multithreaded Arrow CSV reader.
+
+    Column types come from the schema instead of being inferred, and datetimes
+    are parsed with a fixed format rather than guessed row by row.
+
+    :param file_path: Path to the CSV file.
+    :param schema: Schema providing the column types. Defaults to the taxi data schema.
+    :param columns: Columns to decode. Columns missing from the file are skipped. Defaults to all columns.
+    :param delimiter: Field delimiter.
+    :param use_threads: Parse blocks of the file in parallel.
+    :return: The data frame.
+    """
+    table = pv.read_csv(file_path, **_csv_options(file_path, schema, columns, delimiter, use_threads))
+    return table.to_pandas()
+
+
+def iter_taxi_csv(file_path: str, chunk_size: int, schema: DataFrameSchema = None, columns: list = None,
+                  delimiter: str = ",", use_threads: bool = True):
+    """
+    Streams a taxi CSV file as data frames of `chunk_size` rows, typed like `read_taxi_csv`.
+
+    :param file_path: Path to the CSV file.
+    :param chunk_size: Rows per data frame.
+    :param schema: Schema providing the column types. Defaults to the taxi data schema.
+    :param columns: Columns to decode. Defaults to all columns.
+    :param delimiter: Field delimiter.
+    :param use_threads: Parse blocks of the file in parallel.
+    :return: Iterator of data frames.
+    """
+    options = _csv_options(file_path, schema, columns, delimiter, use_threads, block_size=4 << 20)
+    with pv.open_csv(file_path, **options) as reader:
+        yield from iter_frames(reader, chunk_size)
+
+
+def _xlsx_frame(rows: list, indices: list, names: list, column_types: dict) -> pd.DataFrame:
+    arrays, untyped = {}, {}
+    for index, name in zip(indices, names):
+        values = [row[index] if index < len(row) else None for row in rows]
+        try:
+            arrays[name] = pa.array(values, type=column_types.get(name))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Values the schema types cannot hold are left for the schema checks to report
+            untyped[name] = pd.Series(values, dtype=object)
+    df = pa.table(arrays).to_pandas() if arrays else pd.DataFrame(index=pd.RangeIndex(len(rows)))
+    return df.assign(**untyped)[names]
+
+
+def iter_taxi_xlsx(file_path: str, chunk_size: int, schema: DataFrameSchema = None, columns: list = None,
+                   sheet_name: str = None):
+    """
+    Streams a taxi Excel workbook as data frames of `chunk_size` rows.
+
+    The workbook is opened read-only, so openpyxl parses rows as they are
+    iterated instead of building the whole sheet in memory. Cell values are
+    converted to the schema's column types with Arrow; a column whose values do
+    not fit is kept as objects for the schema checks to report. Blank rows are
+    skipped, as the CSV reader skips empty lines.
+
+    :param file_path: Path to the .xlsx file.
+    :param chunk_size: Rows per data frame.
+    :param schema: Schema providing the column types. Defaults to the taxi data schema.
+    :param columns: Columns to decode. Columns missing from the sheet are skipped. Defaults to all columns.
+    :param sheet_name: Worksheet to read. Defaults to the active sheet.
+    :return: Iterator of data frames.
+    """
+    # openpyxl is only needed for Excel input, as for pd.read_excel
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook[sheet_name] if sheet_name else workbook.active
+        rows = sheet.iter_rows(values_only=True)
+        header = [f"Unnamed: {i}" if name is None else str(name) for i, name in enumerate(next(rows, ()))]
+        indices = [i for i, name in enumerate(header) if columns is None or name in columns]
+        names = [header[i] for i in indices]
+        column_types = {name: arrow_type for name, arrow_type in schema_arrow_types(schema).items() if name in names}
+        batch = []
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            batch.append(row)
+            if len(batch) == chunk_size:
+                yield _xlsx_frame(batch, indices, names, column_types)
+                batch = []
+        if batch:
+            yield _xlsx_frame(batch, indices, names, column_types)
+    finally:
+        workbook.close()
+
+
+def read_taxi_xlsx(file_path: str, schema: DataFrameSchema = None, columns: list = None,
+                   sheet_name: str = None) -> pd.DataFrame:
+    """
+    Reads a taxi Excel workbook with the streaming reader, typed like `iter_taxi_xlsx`.
+
+    :param file_path: Path to the .xlsx file.
+    :param schema: Schema providing the column types. Defaults to the taxi data schema.
+    :param columns: Columns to decode. Defaults to all columns.
+    :param sheet_name: Worksheet to read. Defaults to the active sheet.
+    :return: The data frame.
+    """
+    chunks = list(iter_taxi_xlsx(file_path, 65536, schema, columns=columns, sheet_name=sheet_name))
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+
+def xlsx_to_parquet(file_path: str, parquet_path: str, schema: DataFrameSchema = None, sheet_name: str = None,
+                    chunk_size: int = 65536):
+    """
+    Converts a taxi Excel workbook to a Parquet file, one row group per streamed batch.
+
+    :param file_path: Path to the .xlsx file.
+    :param parquet_path: Path of the Parquet file to write.
+    :param schema: Schema providing the column types. Defaults to the taxi data schema.
+    :param sheet_name: Worksheet to read. Defaults to the active sheet.
+    :param chunk_size: Rows per batch and row group.
+    :raises pyarrow.ArrowException: If the batches cannot share one Arrow schema, e.g. because
+        a column holds values its type cannot represent.
+    """
+    writer = None
+    try:
+        for chunk in iter_taxi_xlsx(file_path, chunk_size, schema, sheet_name=sheet_name):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(parquet_path, table.schema, compression="zstd")
+            else:
+                table = table.cast(writer.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        pq.write_table(pa.table({}), parquet_path)
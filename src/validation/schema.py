@@ -1,6 +1,18 @@
 import pandera as pa
 from pandera import Column, Check, DataFrameSchema
 import numpy as np
+from ..data_io import duplicated_rows
+
+
+def max_null_rate(rate: float, error: str = None) -> Check:
+    """
+    Aggregate check that at most `rate` of a column's values are null.
+
+    The rate is kept in the check's statistics, so chunked validation can count the
+    nulls of every chunk and evaluate the check once over the whole file.
+    """
+    return Check(lambda s: s.isna().mean() <= rate, element_wise=False, error=error,
+                 statistics={"max_null_rate": rate})
 
 
 def get_taxi_data_schema() -> DataFrameSchema:
@@ -25,19 +37,15 @@ def get_taxi_data_schema() -> DataFrameSchema:
             "passenger_count": Column(
                 pa.Float,
                 checks=[
-                    Check.ge(
-                        0, element_wise=True
-                    ),  # Passenger count should be non-negative
-                    Check.le(
-                        6, element_wise=True
-                    ),  # Assuming a reasonable max passenger count
+                    Check.ge(0),  # Passenger count should be non-negative
+                    Check.le(6),  # Assuming a reasonable max passenger count
                 ],
                 nullable=True,
                 description="Number of passengers in the vehicle.",
             ),
             "trip_distance": Column(
                 pa.Float,
-                checks=Check.ge(0, element_wise=True),
+                checks=Check.ge(0),
                 nullable=False,
                 description="Elapsed trip distance in miles reported by the taximeter.",
             ),
@@ -55,15 +63,13 @@ def get_taxi_data_schema() -> DataFrameSchema:
             ),
             "PULocationID": Column(
                 pa.Int,
-                checks=Check.ge(
-                    1, element_wise=True
-                ),  # Location IDs are positive integers
+                checks=Check.ge(1),  # Location IDs are positive integers
                 nullable=False,
                 description="A unique identifier for the pickup location.",
             ),
             "DOLocationID": Column(
                 pa.Int,
-                checks=Check.ge(1, element_wise=True),
+                checks=Check.ge(1),
                 nullable=False,
                 description="A unique identifier for the drop-off location.",
             ),
@@ -75,73 +81,71 @@ def get_taxi_data_schema() -> DataFrameSchema:
             ),
             # "fare_amount": Column(
             #     pa.Float,
-            #     checks=Check.ge(0, element_wise=True),
+            #     checks=Check.ge(0),
             #     nullable=False,
             #     description="Fare amount in USD.",
             # ),
             "extra": Column(
                 pa.Float,
-                checks=Check.ge(0, element_wise=True),
+                checks=Check.ge(0),
                 nullable=False,
                 description="Extra fees in USD.",
             ),
             "mta_tax": Column(
                 pa.Float,
-                checks=Check.ge(0, element_wise=True),
+                checks=Check.ge(0),
                 nullable=False,
                 description="MTA tax in USD.",
             ),
             "tip_amount": Column(
                 pa.Float,
-                checks=Check.ge(0, element_wise=True),
+                checks=Check.ge(0),
                 nullable=False,
                 description="Tip amount in USD.",
             ),
             "fare_amount": Column(
                 pa.Float,
                 checks=[
-                    Check.ge(0, element_wise=True),
-                    Check(lambda s: s.isna().mean() <= 0.01, 
-                         element_wise=False,
-                         error="Too many null values (>1%) in fare_amount column.")
+                    Check.ge(0),
+                    max_null_rate(0.01, error="Too many null values (>1%) in fare_amount column.")
                 ],
                 nullable=False,
                 description="Fare amount in USD.",
             ),
             "tolls_amount": Column(
                 pa.Float,
-                checks=Check.ge(0, element_wise=True),
+                checks=Check.ge(0),
                 nullable=False,
                 description="Tolls amount in USD.",
             ),
             "improvement_surcharge": Column(
                 pa.Float,
-                checks=Check.ge(0, element_wise=True),
+                checks=Check.ge(0),
                 nullable=False,
                 description="Improvement surcharge in USD.",
             ),
             "total_amount": Column(
                 pa.Float,
-                checks=Check.ge(0, element_wise=True),
+                checks=Check.ge(0),
                 nullable=False,
                 description="Total amount charged to the passenger in USD.",  # TODO: check for non negative values
             ),
             "congestion_surcharge": Column(
                 pa.Float,
-                checks=Check.ge(0, element_wise=True),
+                checks=Check.ge(0),
                 nullable=True,
                 description="Congestion surcharge in USD.",
             ),
             "Airport_fee": Column(
                 pa.Float,
-                checks=Check.ge(0, element_wise=True),
+                checks=Check.ge(0),
                 nullable=True,
                 description="Airport fee in USD.",
             ),
         },
         checks=[
             # Check for duplicate rows
-            Check(lambda df: ~df.duplicated().any(), error="Duplicate rows found."),
+            Check(lambda df: ~duplicated_rows(df).any(), error="Duplicate rows found."),
             # Check for empty rows
             Check(lambda df: ~(df.isna().all(axis=1)).any(), error="Empty rows found."),
             # Logical checks: pickup datetime should be before dropoff datetime
@@ -1,6 +1,7 @@
 import pandera as pa
 from pandera import Column, Check, DataFrameSchema
 import numpy as np
+from ..data_io import duplicated_rows
 
 def get_taxi_postEDA_data_schema() -> DataFrameSchema:
     schema = pa.DataFrameSchema(
@@ -19,8 +20,9 @@ def get_taxi_postEDA_data_schema() -> DataFrameSchema:
             )
         },
         checks=[
-            Check(lambda df: ~df.duplicated().any(), error="Duplicate rows found."),
+            Check(lambda df: ~duplicated_rows(df).any(), error="Duplicate rows found."),
             Check(lambda df: ~(df.isna().all(axis=1)).any(), error="Empty rows found."),
-        ]
+        ],
+        coerce=True,  # Loaded frames may use compact float32 columns
     )
     return schema
@@ -1,20 +1,144 @@
+import contextlib
+import copy
+import itertools
 import logging
-import json
 import pandas as pd
 import pandera as pa
+from pyarrow import ArrowInvalid
 from .schema import get_taxi_data_schema
 from .correlation_validator import CorrelationValidator
+from .dtypes import optimize_dtypes
+from .readers import (
+    iter_taxi_csv, iter_taxi_xlsx, read_taxi_csv, read_taxi_xlsx, recover_numeric, schema_arrow_types,
+    xlsx_to_parquet,
+)
+from .native import NativeSchemaValidator, check_label
+from .parallel import ParallelSchemaValidator
+from .incremental import ValidationResultCache, chunk_fingerprint, row_group_fingerprint
+from .quarantine import invalid_mask, summarize_failures, write_quarantine
+from .profiling import ValidationProfiler
+from ..data_io import (
+    DataCache, DuplicateIndex, apply_filters, iter_parquet, iter_parquet_row_group_chunks, iter_table, read_columns,
+    read_parquet, read_table,
+)
 import os
 
+
+class _TimedCheck(pa.Check):
+    """
+    A pandera check that times its own calls as a step of one profiler. Column checks
+    are nested under their column, as the native backend reports them.
+    """
+
+    @classmethod
+    def get_backend(cls, check_obj):
+        # Backends are registered for pa.Check itself, not for its subclasses
+        return pa.Check.get_backend(check_obj)
+
+    def __deepcopy__(self, memo):
+        # pandera copies the column schemas it validates; the copies time into the same profiler
+        memo[id(self._profiler)] = self._profiler
+        timed = _TimedCheck.__new__(_TimedCheck)
+        memo[id(self)] = timed
+        timed.__dict__.update(copy.deepcopy(self.__dict__, memo))
+        return timed
+
+    def __call__(self, check_obj, column=None):
+        label = check_label(self)
+        with contextlib.ExitStack() as steps:
+            if self._timed_column is not None:
+                steps.enter_context(self._profiler.step(self._timed_column, "column", len(check_obj)))
+                steps.enter_context(self._profiler.step(label, "column_check", len(check_obj)))
+            else:
+                steps.enter_context(self._profiler.step(label, "frame_check", len(check_obj)))
+            return super().__call__(check_obj, column)
+
+
+def _timed_check(check: pa.Check, profiler: ValidationProfiler, column: str = None) -> _TimedCheck:
+    timed = _TimedCheck.__new__(_TimedCheck)
+    timed.__dict__.update(check.__dict__)
+    timed._profiler = profiler
+    timed._timed_column = column
+    return timed
+
+
+def timed_schema(schema: pa.DataFrameSchema, profiler: ValidationProfiler) -> pa.DataFrameSchema:
+    """
+    Copies a schema with checks that time every call as a profiler step.
+
+    The timings are pandera's own, and the schema passed in, its checks and
+    pandera's classes are left untouched, so other validators are not timed.
+
+    :param schema: Schema to copy.
+    :param profiler: Profiler recording the check timings.
+    :return: The timed copy of the schema.
+    """
+    timed = schema.update_columns({
+        name: {"checks": [_timed_check(check, profiler, name) for check in column.checks]}
+        for name, column in schema.columns.items()
+    })
+    timed.checks = [_timed_check(check, profiler) for check in schema.checks]
+    return timed
+
+
 class DataValidator:
-    ALLOWED_FORMATS = ["csv", "parquet", "xlsx"]
+    ALLOWED_FORMATS = ["csv", "parquet", "arrow", "xlsx"]
+    BACKENDS = ["pandera", "native"]
+    DATETIME_COLUMNS = ["tpep_pickup_datetime", "tpep_dropoff_datetime"]
     
-    def __init__(self, target: str, log_file: str = "logs/validation_errors.log", correlation_log_file: str = "logs/correlation_errors.log"):
+    def __init__(self, target: str, log_file: str = "logs/validation_errors.log", correlation_log_file: str = "logs/correlation_errors.log",
+                 cache_dir: str = None, compact_dtypes: bool = True, chunk_size: int = None,
+                 backend: str = "pandera", executor: str = None, max_workers: int = None,
+                 duplicate_index: DuplicateIndex = None, incremental: bool = False,
+                 correlation_backend: str = "deepchecks", correlation_sample_size: int = 100000,
+                 pps_sample_size: int = 5000, quarantine_dir: str = None, profile: bool = False,
+                 flamegraph: bool = False, track_memory: bool = True, use_threads: bool = True,
+                 buffer_size: int = 0, memory_map: bool = False, convert_xlsx: bool = True):
         
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown validation backend: expected one of {self.BACKENDS}, got '{backend}'.")
         self.schema = get_taxi_data_schema()
+        self.backend = backend
+        self.native_validator = NativeSchemaValidator(self.schema) if backend == "native" else None
+        # Column checks of the pandera backend can run on a thread or process pool
+        self.parallel_validator = (
+            ParallelSchemaValidator(get_taxi_data_schema, executor, max_workers)
+            if executor and backend == "pandera" else None
+        )
+        # No cache unless a directory is given; the pipeline passes the configured one
+        self.cache = DataCache(cache_dir) if cache_dir else None
+        # Excel workbooks are converted to a cached Parquet copy on first read, so later runs skip Excel parsing
+        self.convert_xlsx = convert_xlsx
+        # Shared across run_validation calls to drop rows already seen in earlier files
+        self.duplicate_index = duplicate_index
+        # Reuse the validity masks of chunks already validated with the same settings
+        self.incremental = incremental
+        self._result_cache = None
+        # Failure cases and rejected rows go to Parquet here; the log only gets a summary
+        self.quarantine_dir = quarantine_dir
+        self.compact_dtypes = compact_dtypes
+        self.chunk_size = chunk_size
+        # Parquet row groups are decoded on a thread pool unless use_threads is off
+        self.parquet_options = {"use_threads": use_threads, "buffer_size": buffer_size, "memory_map": memory_map}
+        # Per-step timings go to validation_profile.json next to the log, plus a folded-stack
+        # file for flamegraph tools when `flamegraph` is set
+        self.profiler = ValidationProfiler(enabled=profile, track_memory=track_memory)
+        self.flamegraph = flamegraph
+        # pandera's checks are timed by a copy of the schema whose checks time their own calls
+        self._timed_schema = (
+            timed_schema(self.schema, self.profiler)
+            if profile and backend == "pandera" and self.parallel_validator is None else None
+        )
+        self.profile_path = os.path.join(os.path.dirname(log_file), "validation_profile.json")
         self.correlation_validator = CorrelationValidator(
             target=target, 
-            log_file=correlation_log_file
+            log_file=correlation_log_file,
+            backend=correlation_backend,
+            sample_size=correlation_sample_size,
+            pps_sample_size=pps_sample_size,
+            max_workers=max_workers,
+            cache=self.cache,
+            profiler=self.profiler
         )
         
         # Configure logging for validation errors
@@ -37,18 +161,66 @@ class DataValidator:
             logging.info(f"File format '{ext}' verified successfully.")
             return ext
     
-    def load_data(self, file_path: str, file_format: str) -> pd.DataFrame:
+    def _read_file(self, file_path: str, file_format: str, columns: list = None, filters: list = None) -> pd.DataFrame:
+        needed = read_columns(columns, filters)
+        usecols = None if needed is None else (lambda column: column in needed)
+        parse_dates = [column for column in self.DATETIME_COLUMNS if needed is None or column in needed]
+        if file_format == "csv":
+            try:
+                df = read_taxi_csv(file_path, self.schema, columns=needed, delimiter=",")
+            except ArrowInvalid as e:
+                # Values the schema types cannot hold are left for the schema checks to report
+                logging.warning(f"Typed CSV read failed ({e}); falling back to pandas type inference.")
+                df = recover_numeric(
+                    pd.read_csv(file_path, delimiter=",", usecols=usecols, parse_dates=parse_dates), self.schema
+                )
+        elif file_format == "parquet":
+            return read_parquet(file_path, columns=columns, filters=filters, **self.parquet_options)
+        elif file_format == "arrow":
+            return read_table(file_path, "ipc", columns=columns, filters=filters)
+        elif file_format == "xlsx":
+            df = read_taxi_xlsx(file_path, self.schema, columns=needed)
+        else:
+            error_msg = f"Unsupported file format: {file_format}."
+            logging.error(error_msg)
+            raise ValueError(error_msg)
+        return apply_filters(df, filters, columns)
+
+    def _xlsx_parquet(self, local_path: str) -> str:
+        """Returns the cached Parquet conversion of a workbook, or None if conversion is off or failed."""
+        if not self.convert_xlsx:
+            return None
+        return self.cache.convert(
+            local_path, ".parquet", lambda source, destination: xlsx_to_parquet(source, destination, self.schema),
+            reader="openpyxl", column_types={name: str(t) for name, t in schema_arrow_types(self.schema).items()},
+        )
+
+    def load_data(self, file_path: str, file_format: str, columns: list = None, filters: list = None) -> pd.DataFrame:
+        """
+        Loads the data file, decoding only `columns` and keeping only rows that match
+        every predicate in `filters` (e.g. "fare_amount >= 0"). Both are pushed down
+        into the reader for Parquet and Arrow IPC files.
+        """
         try:
-            if file_format == "csv":
-                df = pd.read_csv(file_path, delimiter=",", parse_dates=["tpep_pickup_datetime", "tpep_dropoff_datetime"])
-            elif file_format == "parquet":
-                df = pd.read_parquet(file_path, engine='pyarrow')  # Ensure pyarrow is installed
-            elif file_format == "xlsx":
-                df = pd.read_excel(file_path, engine='openpyxl', parse_dates=["tpep_pickup_datetime", "tpep_dropoff_datetime"])
+            if self.cache is None:
+                df = self._read_file(file_path, file_format, columns, filters)
             else:
-                error_msg = f"Unsupported file format: {file_format}."
-                logging.error(error_msg)
-                raise ValueError(error_msg)
+                local_path = self.cache.fetch(file_path)
+                parquet_path = self._xlsx_parquet(local_path) if file_format == "xlsx" else None
+                if parquet_path is not None:
+                    df = read_parquet(parquet_path, columns=columns, filters=filters, **self.parquet_options)
+                elif file_format in ("parquet", "arrow"):
+                    # Parquet and Arrow IPC are already typed and columnar, so a cached copy would not save any parsing.
+                    df = self._read_file(local_path, file_format, columns, filters)
+                else:
+                    df = self.cache.load_frame(
+                        local_path,
+                        lambda: self._read_file(local_path, file_format, columns, filters),
+                        file_format=file_format,
+                        reader="arrow",
+                        columns=columns,
+                        filters=filters,
+                    )
             logging.info(f"Data loaded successfully from '{file_path}'.")
             return df
         except Exception as e:
@@ -56,47 +228,328 @@ class DataValidator:
             logging.error(error_msg)
             raise ValueError(error_msg)
     
-    def validate_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
+    def iter_chunks(self, file_path: str, file_format: str, chunk_size: int, columns: list = None,
+                    filters: list = None):
+        """
+        Streams the data file as data frames of `chunk_size` rows, typed and
+        projected/filtered the same way as `load_data`.
+        """
         try:
-            validated_df = self.schema.validate(df, lazy=True)
-            logging.info("Schema validation passed.")
-            
-            self.correlation_validator.run_all_checks(validated_df)
-            
+            if file_format == "csv":
+                yield from self._iter_csv(file_path, chunk_size, columns, filters)
+            elif file_format == "parquet":
+                yield from self._iter_parquet(file_path, columns, filters, chunk_size)
+            elif file_format == "arrow":
+                yield from iter_table(file_path, "ipc", columns=columns, filters=filters, chunk_size=chunk_size)
+            else:
+                parquet_path = self._xlsx_parquet(self.cache.fetch(file_path)) if self.cache is not None else None
+                if parquet_path is not None:
+                    yield from self._iter_parquet(parquet_path, columns, filters, chunk_size)
+                    return
+                needed = read_columns(columns, filters)
+                for chunk in iter_taxi_xlsx(file_path, chunk_size, self.schema, columns=needed):
+                    yield apply_filters(chunk, filters, columns)
+        except Exception as e:
+            error_msg = f"Error loading data from '{file_path}': {e}"
+            logging.error(error_msg)
+            raise ValueError(error_msg)
+
+    def _iter_csv(self, file_path: str, chunk_size: int, columns: list, filters: list):
+        """
+        Streams a CSV file typed by the schema, falling back to pandas type inference for
+        the rest of the file from the first chunk holding a value the schema types cannot
+        hold, as `_read_file` does for the whole file.
+        """
+        needed = read_columns(columns, filters)
+        rows = 0
+        try:
+            for chunk in iter_taxi_csv(file_path, chunk_size, self.schema, columns=needed, delimiter=","):
+                rows += len(chunk)
+                yield apply_filters(chunk, filters, columns)
+            return
+        except ArrowInvalid as e:
+            # Values the schema types cannot hold are left for the schema checks to report
+            logging.warning(f"Typed CSV read failed ({e}); falling back to pandas type inference after row {rows}.")
+        usecols = None if needed is None else (lambda column: column in needed)
+        parse_dates = [column for column in self.DATETIME_COLUMNS if needed is None or column in needed]
+        # The rows already yielded are skipped; line 0 is the header
+        for chunk in pd.read_csv(file_path, delimiter=",", usecols=usecols, parse_dates=parse_dates,
+                                 skiprows=range(1, rows + 1), chunksize=chunk_size):
+            yield apply_filters(recover_numeric(chunk, self.schema), filters, columns)
+
+    def _iter_parquet(self, path: str, columns: list, filters: list, chunk_size: int):
+        """
+        Streams a Parquet file, decoding row groups ahead on a thread pool while earlier
+        chunks are validated. For incremental runs, chunks stay within a row group and
+        carry a fingerprint of its statistics and compressed bytes in `attrs`, so the
+        result cache is looked up without hashing their decoded rows.
+        """
+        if not self.incremental or self.cache is None:
+            yield from iter_parquet(path, columns=columns, filters=filters, chunk_size=chunk_size,
+                                    **self.parquet_options)
+            return
+        for metadata, start, chunk in iter_parquet_row_group_chunks(path, columns, filters, chunk_size,
+                                                                    **self.parquet_options):
+            chunk.attrs["fingerprint"] = row_group_fingerprint(metadata, start, len(chunk), columns, filters)
+            yield chunk
+
+    def _check_expected_columns(self, columns, expected_columns: list):
+        if expected_columns:
+            missing_columns = set(expected_columns) - set(columns)
+            if missing_columns:
+                error_msg = f"Missing columns in data file: {missing_columns}"
+                logging.error(error_msg)
+                raise ValueError(error_msg)
+            else:
+                logging.info("All expected columns are present in the data file.")
+
+    def _report_failures(self, failure_cases: pd.DataFrame, rejected_rows: pd.DataFrame, name: str):
+        """
+        Logs a per-check summary of the failures and quarantines the full failure
+        cases and the rejected rows when `quarantine_dir` is set.
+        """
+        summary = summarize_failures(failure_cases)
+        logging.error(
+            f"Schema validation failed with errors: {int(summary['failures'].sum())} failures, "
+            f"{len(rejected_rows)} rows rejected.\n{summary.to_string(index=False)}"
+        )
+        if self.quarantine_dir:
+            paths = write_quarantine(self.quarantine_dir, name, failure_cases, rejected_rows)
+            logging.info(f"Failure cases and rejected rows written to {', '.join(paths)}.")
+
+    def validate_chunks(self, chunks, name: str = "validation") -> pd.DataFrame:
+        """
+        Validates a stream of data frames one chunk at a time.
+
+        Each chunk is indexed by its global row offset, so the combined failure
+        cases and quarantined rows point at rows of the whole file, which is
+        named `name` in the quarantine files. Invalid rows are dropped chunk by
+        chunk, and duplicates are dropped as the chunks stream in, by checking
+        64-bit row hashes against the rows kept so far. Empty rows are dropped
+        from the combined result, which gives the same cleaned rows as
+        `validate_dataframe`.
+        Aggregate checks such as the fare_amount null rate hold for the whole
+        file, not for each chunk: their per-chunk failures are discarded, the
+        nulls of every chunk are counted, and each check is evaluated once at
+        the end.
+        """
+        cleaned, failure_cases, rejected, offset, duplicates = [], [], [], 0, 0
+        aggregate_checks = self._aggregate_checks()
+        nulls = dict.fromkeys(aggregate_checks, 0)
+        duplicate_index = DuplicateIndex()
+        for chunk in chunks:
+            fingerprint = chunk.attrs.get("fingerprint")
+            chunk = chunk.set_axis(pd.RangeIndex(offset, offset + len(chunk)))
+            offset += len(chunk)
+            for column, check in aggregate_checks:
+                if column in chunk.columns:
+                    nulls[column, check] += int(chunk[column].isna().sum())
+            _, invalid, chunk_failure_cases = self._run_schema(chunk, fingerprint)
+            if chunk_failure_cases is not None:
+                # Aggregate checks fail as a whole rather than on rows, so no row is kept for them
+                aggregate = pd.MultiIndex.from_frame(chunk_failure_cases[["column", "check"]]).isin(aggregate_checks)
+                if not aggregate.all():
+                    failure_cases.append(chunk_failure_cases[~aggregate])
+                rejected.append(chunk[invalid])
+                chunk = chunk[~invalid]
+            with self.profiler.step("dedupe", "dedupe", len(chunk)):
+                kept = duplicate_index.drop_duplicates(chunk)
+            duplicates += len(chunk) - len(kept)
+            cleaned.append(kept)
+            logging.info(f"Validated rows up to {offset}.")
+        duplicate_index.close()
+        for (column, check), max_rate in aggregate_checks.items():
+            if offset and nulls[column, check] / offset > max_rate:
+                failure_cases.append(self._aggregate_failure(column, check))
+
+        df = pd.concat(cleaned).reset_index(drop=True) if cleaned else pd.DataFrame()
+        if failure_cases:
+            self._report_failures(pd.concat(failure_cases, ignore_index=True), pd.concat(rejected), name)
+            validated_df = df.dropna(how="all")
+            logging.info("Invalid rows have been dropped from the dataframe.")
+            return validated_df
+
+        if duplicates:
+            logging.error(f"Schema validation failed with errors: {duplicates} duplicate rows found across chunks.")
+            validated_df = df.dropna(how="all")
+            logging.info("Invalid rows have been dropped from the dataframe.")
             return validated_df
+
+        logging.info("Schema validation passed.")
+        validated_df = self.schema.coerce_dtype(df)
+        try:
+            self.correlation_validator.run_all_checks(validated_df)
+        except ValueError as ve:
+            logging.error(str(ve))
+            raise
+        return validated_df
+
+    def _aggregate_checks(self) -> dict:
+        """:return: The maximum null rate of every null-rate check, by (column, check label)."""
+        return {
+            (name, check_label(check)): check.statistics["max_null_rate"]
+            for name, column in self.schema.columns.items() for check in column.checks
+            if "max_null_rate" in (check.statistics or {})
+        }
+
+    def _aggregate_failure(self, column: str, check: str) -> pd.DataFrame:
+        """:return: The failure report of an aggregate check, in the format of the configured backend."""
+        if self.backend == "native":
+            return pd.DataFrame({"column": [column], "check": [check], "failures": [1]})
+        return pd.DataFrame({"schema_context": ["Column"], "column": [column], "check": [check],
+                             "check_number": [None], "failure_case": [False], "index": [None]})
+
+    def _validation_result_cache(self):
+        if not self.incremental or self.cache is None:
+            return None
+        # Thresholds may be changed after construction, so the settings are read on use
+        settings = {
+            "backend": self.backend,
+            "target": self.correlation_validator.target,
+            "correlation_backend": self.correlation_validator.backend,
+            "feature_label": self.correlation_validator.feature_threshold,
+            "feature_feature": self.correlation_validator.feature_feature_threshold,
+        }
+        if self._result_cache is None or self._result_cache.settings != settings:
+            self._result_cache = ValidationResultCache(self.cache, self.schema, **settings)
+        return self._result_cache
+
+    def _run_schema(self, df: pd.DataFrame, fingerprint: str = None):
+        """
+        Runs the schema checks, reusing the cached result when `incremental` is set and
+        this exact chunk was validated before with the same schema and settings.
+
+        :param fingerprint: Fingerprint of the chunk, e.g. from its Parquet row group.
+            Defaults to hashing its rows with `chunk_fingerprint`.
+
+        :return: The coerced frame, a boolean mask of the invalid rows and the failure
+            report, which is None when the frame passed.
+        """
+        result_cache = self._validation_result_cache()
+        if result_cache is None:
+            return self._evaluate_schema(df)
+
+        fingerprint = fingerprint or chunk_fingerprint(df)
+        cached = result_cache.get(df, fingerprint)
+        if cached is not None:
+            logging.info(f"Reused cached validation result for {len(df)} rows.")
+            invalid, failure_cases = cached
+            if failure_cases is None:
+                return self.schema.coerce_dtype(df), None, None
+            return None, invalid, failure_cases
+
+        validated_df, invalid, failure_cases = self._evaluate_schema(df)
+        result_cache.put(df, fingerprint, invalid, failure_cases)
+        return validated_df, invalid, failure_cases
+
+    def _evaluate_schema(self, df: pd.DataFrame):
+        """
+        Runs the schema checks with the configured backend, timed as the "schema" step.
+
+        When profiling, every check is also timed on its own inside that step: the native
+        backend times its own steps, and pandera's checks are timed as it calls them, so
+        the timings are pandera's own. Checks run by the parallel backend are only timed as
+        part of the "schema" step.
+
+        :return: The coerced frame, a boolean mask of the invalid rows and the failure
+            report, which is None when the frame passed. The pandera backend reports
+            every failure case; the native backend reports failure counts per check.
+        """
+        with self.profiler.step("schema", "schema", len(df)):
+            return self._evaluate_backend(df)
+
+    def _evaluate_backend(self, df: pd.DataFrame):
+        if self.backend == "native":
+            result = self.native_validator.validate(df, self.profiler)
+            if result.passed:
+                return result.coerced, None, None
+            return None, ~result.valid, result.report()
+        if self.parallel_validator is not None:
+            coerced, failure_cases = self.parallel_validator.validate(df)
+            if failure_cases is None:
+                return coerced, None, None
+            return None, invalid_mask(df.index, failure_cases), failure_cases
+        try:
+            schema = self.schema if self._timed_schema is None else self._timed_schema
+            return schema.validate(df, lazy=True), None, None
         except pa.errors.SchemaErrors as e:
-            error_details = e.failure_cases.to_dict(orient="records")
-            error_message = json.dumps(error_details, indent=2)
-            logging.error(f"Schema validation failed with errors:\n{error_message}")
+            return None, invalid_mask(df.index, e.failure_cases), e.failure_cases
+
+    def validate_dataframe(self, df: pd.DataFrame, name: str = "validation") -> pd.DataFrame:
+        try:
+            validated_df, invalid, failure_cases = self._run_schema(df)
+            if failure_cases is None:
+                logging.info("Schema validation passed.")
+                
+                self.correlation_validator.run_all_checks(validated_df)
+                
+                return validated_df
             
-            # Drop invalid rows based on the error cases
-            invalid_indices = e.failure_cases["index"].dropna().unique()
-            validated_df = (
-                df.drop(index=invalid_indices)
-                .reset_index(drop=True)
-                .drop_duplicates()
-                .dropna(how="all")
-            )
+            self._report_failures(failure_cases, df[invalid], name)
+            
+            # Drop invalid rows with the boolean mask from the error cases
+            validated_df = DuplicateIndex().drop_duplicates(
+                df[~invalid].reset_index(drop=True)
+            ).dropna(how="all")
             logging.info("Invalid rows have been dropped from the dataframe.")
             return validated_df
         except ValueError as ve:
             logging.error(str(ve))
             raise
     
-    def run_validation(self, file_path: str, expected_columns: list = None) -> pd.DataFrame:
+    def run_validation(self, file_path: str, expected_columns: list = None, columns: list = None,
+                       filters: list = None, chunk_size: int = None) -> pd.DataFrame:
         file_format = self.check_file_format(file_path)
+        chunk_size = chunk_size or self.chunk_size
+        # Quarantine files are named after the input file
+        name = os.path.splitext(os.path.basename(file_path))[0]
         
-        df = self.load_data(file_path, file_format)
+        try:
+            with self.profiler.step(name, "file") as file_step:
+                validated_df = self._validate_file(file_path, file_format, name, expected_columns, columns,
+                                                   filters, chunk_size)
+                file_step["rows"] = len(validated_df)
+        finally:
+            # The pool is kept across chunks and released once the file is done
+            if self.parallel_validator is not None:
+                self.parallel_validator.shutdown()
+            if self.profiler.enabled:
+                self._write_profile()
+        return validated_df
+
+    def _validate_file(self, file_path: str, file_format: str, name: str, expected_columns: list, columns: list,
+                       filters: list, chunk_size: int) -> pd.DataFrame:
+        if chunk_size:
+            chunks = self.iter_chunks(file_path, file_format, chunk_size, columns=columns, filters=filters)
+            chunks = self.profiler.iterate(chunks, "load")
+            first_chunk = next(chunks, pd.DataFrame())
+            self._check_expected_columns(first_chunk.columns, expected_columns)
+            validated_df = self.validate_chunks(itertools.chain([first_chunk], chunks), name=name)
+        else:
+            with self.profiler.step("load", "load") as load_step:
+                df = self.load_data(file_path, file_format, columns=columns, filters=filters)
+                load_step["rows"] = len(df)
+            self._check_expected_columns(df.columns, expected_columns)
+            validated_df = self.validate_dataframe(df, name=name)
         
-        if expected_columns:
-            missing_columns = set(expected_columns) - set(df.columns)
-            if missing_columns:
-                error_msg = f"Missing columns in data file: {missing_columns}"
-                logging.error(error_msg)
-                raise ValueError(error_msg)
-            else:
-                logging.info("All expected columns are present in the data file.")
+        if self.duplicate_index is not None:
+            with self.profiler.step("cross_file_dedupe", "dedupe", len(validated_df)):
+                kept = self.duplicate_index.drop_duplicates(validated_df)
+            if len(kept) < len(validated_df):
+                logging.info(f"Dropped {len(validated_df) - len(kept)} rows already seen in earlier files.")
+                validated_df = kept.reset_index(drop=True)
         
-        validated_df = self.validate_dataframe(df)
+        # Schema coercion widens every column, so compact dtypes are applied to the validated frame
+        if self.compact_dtypes:
+            with self.profiler.step("optimize_dtypes", "dtypes", len(validated_df)):
+                validated_df = optimize_dtypes(validated_df, self.schema)
         
         return validated_df
+
+    def _write_profile(self):
+        """Writes the timings of every step so far, and the flamegraph profile if requested."""
+        paths = [self.profiler.write_json(self.profile_path)]
+        if self.flamegraph:
+            paths.append(self.profiler.write_folded(os.path.splitext(self.profile_path)[0] + ".folded"))
+        logging.info(f"Validation profile written to {', '.join(paths)}.")
+        self.profiler.close()
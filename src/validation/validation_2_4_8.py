@@ -1,6 +1,8 @@
 import pandera as pa
 from pandera import Column, Check, DataFrameSchema
 import numpy as np
+from ..data_io import duplicated_rows
+from .composition import FusedSchemaValidator, compose_schemas
 
 def column_name_validation() -> DataFrameSchema:
     schema = pa.DataFrameSchema(
@@ -23,7 +25,7 @@ def column_name_validation() -> DataFrameSchema:
                             )
         },
          checks=[
-            Check(lambda df: ~df.duplicated().any(), error="Duplicate rows found."),
+            Check(lambda df: ~duplicated_rows(df).any(), error="Duplicate rows found."),
             Check(lambda df: ~(df.isna().all(axis=1)).any(), error="Empty rows found."),
         ]
     )
@@ -39,7 +41,7 @@ def threhold_validation() -> DataFrameSchema:
                                 nullable=True)
         },
         checks=[
-            Check(lambda df: ~df.duplicated().any(), error="Duplicate rows found."),
+            Check(lambda df: ~duplicated_rows(df).any(), error="Duplicate rows found."),
             Check(lambda df: ~(df.isna().all(axis=1)).any(), error="Empty rows found."),
         ]
     )
@@ -78,8 +80,18 @@ def category_level_validation() -> DataFrameSchema:
                 )
         },
          checks=[
-            Check(lambda df: ~df.duplicated().any(), error="Duplicate rows found."),
+            Check(lambda df: ~duplicated_rows(df).any(), error="Duplicate rows found."),
             Check(lambda df: ~(df.isna().all(axis=1)).any(), error="Empty rows found."),
         ]
     )
-    return schema
\ No newline at end of file
+    return schema
+
+def fused_validation(*schema_functions) -> FusedSchemaValidator:
+    """
+    Fuses schemas of this module into one plan that checks a frame in a single pass,
+    computing the duplicate and empty-row checks they share only once.
+
+    :param schema_functions: The schema functions to fuse; all three by default.
+    :return: The fused validator, whose results are keyed by function name.
+    """
+    return compose_schemas(*(schema_functions or (column_name_validation, threhold_validation, category_level_validation)))
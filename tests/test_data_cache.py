@@ -0,0 +1,116 @@
+import os
+import pytest
+import pandas as pd
+from unittest.mock import patch
+from src.data_io import DataCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Fixture providing an empty cache in a temporary directory"""
+    return DataCache(os.path.join(tmp_path, "cache"))
+
+@pytest.fixture
+def source_csv(tmp_path):
+    """Fixture creating a small CSV file to be parsed through the cache"""
+    path = os.path.join(tmp_path, "trips.csv")
+    pd.DataFrame({'trip_distance': [1.0, 2.5], 'fare_amount': [5.0, 9.5]}).to_csv(path, index=False)
+    return path
+
+def test_load_frame_reuses_parsed_frame(cache, source_csv):
+    """Second load of an unchanged file does not call the loader again"""
+    calls = []
+    def loader():
+        calls.append(1)
+        return pd.read_csv(source_csv)
+
+    first = cache.load_frame(source_csv, loader, reader="read_csv")
+    second = cache.load_frame(source_csv, loader, reader="read_csv")
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(first, second)
+
+    # different parsing parameters are a different entry
+    cache.load_frame(source_csv, loader, reader="other")
+    assert len(calls) == 2
+
+def test_load_frame_invalidated_by_source_change(cache, source_csv):
+    """Rewriting the source file makes the cached frame stale"""
+    cache.load_frame(source_csv, lambda: pd.read_csv(source_csv))
+    pd.DataFrame({'trip_distance': [3.0], 'fare_amount': [12.0]}).to_csv(source_csv, index=False)
+    os.utime(source_csv, ns=(0, 0))
+
+    df = cache.load_frame(source_csv, lambda: pd.read_csv(source_csv))
+    assert len(df) == 1
+
+def test_corrupt_entry_is_discarded(cache, source_csv):
+    """Entries whose content no longer matches their hash are reloaded"""
+    cache.load_frame(source_csv, lambda: pd.read_csv(source_csv))
+    (entry,) = cache.entries()
+    with open(os.path.join(cache.cache_dir, f"{entry['key']}.data.parquet"), "ab") as f:
+        f.write(b"garbage")
+
+    calls = []
+    cache.load_frame(source_csv, lambda: calls.append(1) or pd.read_csv(source_csv))
+    assert calls == [1]
+
+def test_evicts_least_recently_used(tmp_path):
+    """Cache stays under its size cap by dropping the oldest entries"""
+    paths = []
+    for i in range(3):
+        path = os.path.join(tmp_path, f"part_{i}.csv")
+        pd.DataFrame({'fare_amount': range(100 * i, 100 * i + 100)}).to_csv(path, index=False)
+        paths.append(path)
+
+    probe = DataCache(os.path.join(tmp_path, "probe"))
+    probe.load_frame(paths[0], lambda: pd.read_csv(paths[0]))
+    entry_size = probe.entries()[0]["size"]
+
+    cache = DataCache(os.path.join(tmp_path, "cache"), max_bytes=int(entry_size * 2.5))
+    for path in paths:
+        cache.load_frame(path, lambda path=path: pd.read_csv(path))
+
+    sources = [entry["source"] for entry in cache.entries()]
+    assert sources == paths[1:]
+
+def test_fetch_unreachable_url_not_cached(cache):
+    """Offline fetch of an unknown URL fails instead of returning stale data"""
+    cache.offline = True
+    with pytest.raises(FileNotFoundError):
+        cache.fetch("https://example.invalid/yellow_tripdata_2024-01.parquet")
+    assert cache.fetch("data/raw/local.parquet") == "data/raw/local.parquet"
+
+def test_tampered_entry_is_caught_by_the_opt_in_hash(tmp_path, source_csv):
+    """Same-size edits that keep the modification time are only caught by re-hashing"""
+    cache = DataCache(os.path.join(tmp_path, "cache"))
+    path = cache.store_file(source_csv, "file", source_csv)
+    stat = os.stat(path)
+    with open(path, "r+b") as f:
+        f.write(b"X")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert cache.cached_file("file", source_csv) == path
+    assert DataCache(cache.cache_dir, verify_hash=True).cached_file("file", source_csv) is None
+
+def test_entry_over_the_size_cap_is_kept_until_the_next_store(tmp_path, source_csv):
+    """An entry larger than the cap is not evicted by its own store, so its path stays valid"""
+    cache = DataCache(os.path.join(tmp_path, "cache"), max_bytes=1)
+    path = cache.store_file(source_csv, "file", "first")
+    assert os.path.exists(path)
+
+    cache.store_file(source_csv, "file", "second")
+    assert not os.path.exists(path)
+
+def test_fetch_trusts_a_recent_download(tmp_path, source_csv):
+    """A download confirmed within the TTL is reused without asking the server again"""
+    url = "https://example.invalid/trips.csv"
+    cache = DataCache(os.path.join(tmp_path, "cache"))
+    with patch.object(DataCache, "_remote_validator", return_value='"etag"') as validator, \
+            patch("urllib.request.urlopen", side_effect=lambda *args, **kwargs: open(source_csv, "rb")) as urlopen:
+        path = cache.fetch(url)
+        assert cache.fetch(url) == path
+        assert validator.call_count == 1
+
+        cache.ttl = 0
+        assert cache.fetch(url) == path
+        assert validator.call_count == 2
+        assert urlopen.call_count == 1
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+import pandas as pd
+from src.data_io import DuplicateIndex, duplicated_rows
+
+
+@pytest.fixture
+def trips():
+    """Fixture providing trips with repeated rows, nulls and a string column"""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'VendorID': rng.integers(1, 3, 200),
+        'fare_amount': rng.choice([5.0, 9.5, np.nan], 200),
+        'store_and_fwd_flag': rng.choice(['Y', 'N', None], 200),
+    })
+    return pd.concat([df, df.sample(50, random_state=1)], ignore_index=True)
+
+def test_duplicated_rows_matches_pandas(trips):
+    """Hash-based duplicate marks agree with DataFrame.duplicated"""
+    np.testing.assert_array_equal(duplicated_rows(trips), trips.duplicated().to_numpy())
+
+def test_index_drops_duplicates_across_chunks(trips, tmp_path):
+    """Streaming chunks through the index (with spilling) matches drop_duplicates on the whole frame"""
+    with DuplicateIndex(spill_dir=str(tmp_path), max_in_memory=10) as index:
+        kept = pd.concat([index.drop_duplicates(trips.iloc[start:start + 32]) for start in range(0, len(trips), 32)])
+        assert index._spilled
+    pd.testing.assert_frame_equal(kept, trips.drop_duplicates())
+    assert not list(tmp_path.iterdir())
+
+def test_integer_and_float_chunks_hash_alike():
+    """A row repeated in a later chunk is found even if nulls made its integer column float"""
+    index = DuplicateIndex()
+    index.mark(pd.DataFrame({'VendorID': [1, 2]}))
+    assert index.mark(pd.DataFrame({'VendorID': [2.0, np.nan]})).tolist() == [True, False]
@@ -0,0 +1,95 @@
+import os
+import pytest
+import numpy as np
+import pandas as pd
+from src.data_io import (
+    infer_format, iter_parquet, iter_parquet_row_group_chunks, parse_predicate, read_parquet, read_table, with_format, write_table,
+)
+
+
+@pytest.fixture
+def trips():
+    """Fixture providing a small typed trip frame"""
+    return pd.DataFrame({
+        'tpep_pickup_datetime': pd.to_datetime(['2024-01-30 17:40:12', '2024-01-29 12:25:03']),
+        'VendorID': pd.Series([2, 1], dtype='int32'),
+        'store_and_fwd_flag': ['N', None],
+        'fare_amount': [7.9, 34.73],
+    })
+
+@pytest.mark.parametrize("file_format", ["parquet", "ipc"])
+def test_round_trip_keeps_dtypes(tmp_path, trips, file_format):
+    """Parquet and Arrow IPC hand-off files keep the column dtypes"""
+    path = write_table(trips, os.path.join(tmp_path, "trips.data"), file_format)
+    assert infer_format(path) == file_format
+    pd.testing.assert_frame_equal(read_table(path), trips)
+
+def test_csv_export(tmp_path, trips):
+    """CSV remains available as an export format"""
+    path = write_table(trips, os.path.join(tmp_path, "trips.csv"))
+    assert path.endswith(".csv")
+    assert len(read_table(path)) == 2
+
+def test_unknown_format(tmp_path):
+    """Unknown extensions and format names are rejected"""
+    with pytest.raises(ValueError):
+        infer_format("trips.txt")
+    with pytest.raises(ValueError):
+        with_format("trips.csv", "json")
+
+@pytest.mark.parametrize("file_format", ["parquet", "ipc", "csv"])
+def test_projection_and_filters(tmp_path, file_format):
+    """Only requested columns and matching rows are returned for every format"""
+    df = pd.DataFrame({
+        'trip_distance': [1.0, 2.0, 3.0, 4.0],
+        'fare_amount': [-5.0, 10.0, None, 20.0],
+        'payment_type': [1, 2, 1, 2],
+    })
+    path = write_table(df, os.path.join(tmp_path, "trips.parquet"), file_format)
+
+    result = read_table(path, columns=['trip_distance', 'fare_amount', 'missing'],
+                        filters=["fare_amount >= 0", ("payment_type", "==", 2)])
+    assert list(result.columns) == ['trip_distance', 'fare_amount']
+    assert result['trip_distance'].tolist() == [2.0, 4.0]
+
+    # Columns come back in the requested order, not the file's
+    reordered = read_table(path, columns=['fare_amount', 'trip_distance'], filters=["fare_amount >= 0"])
+    assert list(reordered.columns) == ['fare_amount', 'trip_distance']
+
+def test_parse_predicate():
+    """Predicate strings are split into column, operator and a typed value"""
+    assert parse_predicate("fare_amount >= 0") == ("fare_amount", ">=", 0)
+    assert parse_predicate("store_and_fwd_flag == 'Y'") == ("store_and_fwd_flag", "==", "Y")
+    with pytest.raises(ValueError):
+        parse_predicate("fare_amount ~ 0")
+
+@pytest.mark.parametrize("read_options", [
+    {},
+    {"use_threads": False},
+    {"memory_map": True, "buffer_size": 4096, "max_workers": 2},
+])
+def test_parallel_parquet_reader_matches_read_table(tmp_path, read_options):
+    """Row groups decoded in parallel come back in file order, projected and filtered like read_table"""
+    df = pd.DataFrame({
+        'trip_distance': np.arange(10000, dtype='float64'),
+        'store_and_fwd_flag': np.where(np.arange(10000) % 3, 'N', None),
+        'fare_amount': np.arange(10000) % 7 - 1.0,
+    })
+    path = os.path.join(tmp_path, "trips.parquet")
+    df.to_parquet(path, row_group_size=700, index=False)
+    columns, filters = ['trip_distance', 'store_and_fwd_flag'], ["fare_amount >= 0", "trip_distance > 2500"]
+
+    expected = read_table(path, columns=columns, filters=filters)
+    pd.testing.assert_frame_equal(read_parquet(path, columns=columns, filters=filters, **read_options), expected)
+    chunks = list(iter_parquet(path, columns=columns, filters=filters, chunk_size=1000, **read_options))
+    assert [len(chunk) for chunk in chunks[:-1]] == [1000] * (len(chunks) - 1)
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), expected)
+
+    # Row group chunks never span row groups and carry the metadata of their row group
+    keyed = list(iter_parquet_row_group_chunks(path, columns=columns, filters=filters, chunk_size=500,
+                                               **read_options))
+    assert all(len(chunk) <= 500 for _, _, chunk in keyed)
+    assert all(start + len(chunk) <= metadata["rows"] for metadata, start, chunk in keyed)
+    row_groups = [metadata["row_group"] for metadata, start, _ in keyed if start == 0]
+    assert row_groups == sorted(set(row_groups)) and row_groups[0] == 2500 // 700
+    pd.testing.assert_frame_equal(pd.concat([chunk for _, _, chunk in keyed], ignore_index=True), expected)
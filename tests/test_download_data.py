@@ -1,7 +1,17 @@
 import pytest
+import numpy as np
 import pandas as pd
 import os
-from scripts.download_data import download_and_save_data
+from unittest.mock import patch
+from click.testing import CliRunner
+from scripts.download_data import (
+    MONTHLY_URL_TEMPLATE,
+    download_and_save_data,
+    download_and_save_months,
+    main,
+    month_links,
+    reservoir_sample_parquet,
+)
 
 def test_download_and_save_data(tmp_path):
     """
@@ -56,4 +66,109 @@ def test_download_and_save_data(tmp_path):
     for column in expected_columns:
         assert column in df.columns, f"Expected column {column} not found in DataFrame"
             
-   
\ No newline at end of file
+   
+
+@pytest.fixture
+def local_parquet(tmp_path):
+    """Small multi-row-group parquet file standing in for a monthly trip file."""
+    parquet_path = os.path.join(tmp_path, "trips.parquet")
+    df = pd.DataFrame({
+        'trip_distance': np.arange(1000) / 10,
+        'fare_amount': np.arange(1000) * 1.5,
+    })
+    df.to_parquet(parquet_path, index=False, row_group_size=128)
+    return parquet_path
+
+def test_reservoir_sample_is_reproducible(local_parquet):
+    """
+    Streaming sample has the requested size, has no repeated rows and does
+    not depend on the batch size for a fixed seed.
+    """
+    sample = reservoir_sample_parquet(local_parquet, 50, random_state=7, batch_size=64)
+    same_seed = reservoir_sample_parquet(local_parquet, 50, random_state=7, batch_size=300)
+    other_seed = reservoir_sample_parquet(local_parquet, 50, random_state=8, batch_size=64)
+
+    assert len(sample) == 50
+    assert not sample.duplicated().any()
+    pd.testing.assert_frame_equal(sample, same_seed)
+    assert not sample.equals(other_seed)
+
+def test_reservoir_sample_too_large(local_parquet):
+    """Asking for more rows than the file holds raises, like DataFrame.sample."""
+    with pytest.raises(ValueError):
+        reservoir_sample_parquet(local_parquet, 1001)
+
+def test_download_and_save_data_streaming(local_parquet, tmp_path):
+    """Streaming mode writes the requested number of rows from a local file."""
+    test_output = os.path.join(tmp_path, "streamed.csv")
+    download_and_save_data(local_parquet, test_output, sample_size=25, streaming=True)
+
+    df = pd.read_csv(test_output)
+    assert len(df) == 25
+    assert list(df.columns) == ['trip_distance', 'fare_amount']
+
+def test_month_links():
+    """Month range expands inclusively in calendar order, across year ends."""
+    links = month_links("2023-11", "2024-02", template="trips_{month}.parquet")
+    assert links == [
+        "trips_2023-11.parquet",
+        "trips_2023-12.parquet",
+        "trips_2024-01.parquet",
+        "trips_2024-02.parquet",
+    ]
+
+def test_download_and_save_months_independent_of_workers(local_parquet, tmp_path):
+    """
+    Multi-month sampling gives every month its quota and the merged output
+    does not depend on the number of worker processes.
+    """
+    links = [local_parquet] * 3
+    single_output = os.path.join(tmp_path, "single.csv")
+    pooled_output = os.path.join(tmp_path, "pooled.csv")
+
+    download_and_save_months(links, single_output, sample_size=31, max_workers=1)
+    download_and_save_months(links, pooled_output, sample_size=31, max_workers=3)
+
+    single = pd.read_csv(single_output)
+    pooled = pd.read_csv(pooled_output)
+    assert len(single) == 31
+    pd.testing.assert_frame_equal(single, pooled)
+    # each month is sampled with its own seed
+    assert not single.iloc[:10].equals(single.iloc[11:21].reset_index(drop=True))
+
+@pytest.mark.parametrize("links, flags, streaming", [
+    (1, [], False),
+    (3, [], True),
+    (3, ["--no-streaming"], False),
+    (1, ["--streaming"], True),
+])
+def test_streaming_defaults_to_multi_month_runs(local_parquet, tmp_path, links, flags, streaming):
+    """
+    The command line streams several months by default; a single file keeps pandas sampling unless asked.
+    """
+    args = [arg for _ in range(links) for arg in ("-d", local_parquet)]
+    with patch("scripts.download_data.download_and_save_data") as single, \
+            patch("scripts.download_data.download_and_save_months") as several:
+        result = CliRunner().invoke(main, args + flags + ["--no-cache", "-o", str(tmp_path / "out.csv")])
+    assert result.exit_code == 0, result.output
+    download = several if links > 1 else single
+    assert download.call_args.kwargs["streaming"] is streaming
+
+@pytest.mark.parametrize("months, links", [("2023-01", 1), ("2023-11:2024-02", 4)])
+def test_months_accepts_a_single_month(tmp_path, months, links):
+    """A single month is a one-month range."""
+    with patch("scripts.download_data.download_and_save_data") as single, \
+            patch("scripts.download_data.download_and_save_months") as several:
+        result = CliRunner().invoke(main, ["--months", months, "--no-cache", "-o", str(tmp_path / "out.csv")])
+    assert result.exit_code == 0, result.output
+    if links == 1:
+        assert single.call_args.args[0] == MONTHLY_URL_TEMPLATE.format(month="2023-01")
+    else:
+        assert len(several.call_args.args[0]) == links
+
+@pytest.mark.parametrize("months", ["2023-13", "2023-01:2023-02:2023-03", "january"])
+def test_months_rejects_malformed_ranges(tmp_path, months):
+    """Malformed months are reported as a usage error rather than a traceback."""
+    result = CliRunner().invoke(main, ["--months", months, "--no-cache", "-o", str(tmp_path / "out.csv")])
+    assert result.exit_code == 2
+    assert "--months" in result.output
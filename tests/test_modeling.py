@@ -45,7 +45,8 @@ def test_main_creates_expected_files(tmp_path):
         f"--y-train-path={y_train_path}",
         f"--x-test-path={x_test_path}",
         f"--y-test-path={y_test_path}",
-        f"--charts-dir={charts_dir}"
+        f"--charts-dir={charts_dir}",
+        f"--chart-cache-dir={tmp_path / 'chart_cache'}"
     ])
 
     # Check the command executed okay
@@ -76,7 +77,8 @@ def test_main_handles_missing_files(tmp_path):
         "--x-train-path=missing_x_train.csv",
         "--y-train-path=missing_y_train.csv",
         "--x-test-path=missing_x_test.csv",
-        "--y-test-path=missing_y_test.csv"
+        "--y-test-path=missing_y_test.csv",
+        f"--chart-cache-dir={tmp_path / 'chart_cache'}"
     ])
 
     # Check command failed with proper error message
@@ -112,7 +114,8 @@ def test_main_creates_correct_metrics(tmp_path):
         f"--y-train-path={y_train_path}",
         f"--x-test-path={x_test_path}",
         f"--y-test-path={y_test_path}",
-        f"--charts-dir={charts_dir}"
+        f"--charts-dir={charts_dir}",
+        f"--chart-cache-dir={tmp_path / 'chart_cache'}"
     ])
 
     # Check the command worked
@@ -1,7 +1,13 @@
 import pytest
+import numpy as np
 import pandas as pd
+import altair as alt
 import os
-from scripts.run_eda import TaxiDataAnalyzer, cli
+from unittest.mock import patch
+from scipy.stats import gaussian_kde
+from click.testing import CliRunner
+from scripts.run_eda import EDA_COLUMNS, EDA_FILTERS, TaxiDataAnalyzer, cli
+from src.charts import DEFAULT_STEPS, ChartRenderer, StreamingCorrelation, scott_bandwidth, vegafusion_available
 
 @pytest.fixture
 def test_data():
@@ -99,7 +105,8 @@ def test_csv(tmp_path, test_data):
 def analyzer(test_csv, tmp_path):
     """Fixture providing initialized TaxiDataAnalyzer"""
     test_charts_dir = os.path.join(tmp_path, "test_charts")
-    analyzer = TaxiDataAnalyzer(test_csv, charts_dir=test_charts_dir)
+    analyzer = TaxiDataAnalyzer(test_csv, charts_dir=test_charts_dir, cache_dir=os.path.join(tmp_path, "cache"),
+                                processed_dir=os.path.join(tmp_path, "processed"))
     analyzer.load_data()
     return analyzer
 
@@ -134,15 +141,47 @@ def test_train_test_split(analyzer):
 def test_split_file_creation(analyzer):
     """Test creation of split data files"""
     analyzer.split_dataset(test_size=0.5, random_state=42)
+    split_files = ['X_train.parquet', 'y_train.parquet', 'X_test.parquet', 'y_test.parquet']
+    for file in split_files:
+        assert os.path.exists(os.path.join(analyzer.processed_dir, file))
+
+def test_split_file_csv_export(analyzer):
+    """Test that CSV can still be chosen as the split file format"""
+    analyzer.data_format = "csv"
+    analyzer.split_dataset(test_size=0.5, random_state=42)
     split_files = ['X_train.csv', 'y_train.csv', 'X_test.csv', 'y_test.csv']
     for file in split_files:
-        assert os.path.exists(os.path.join('data/processed', file))
+        assert os.path.exists(os.path.join(analyzer.processed_dir, file))
+
+def test_data_loading_parquet(tmp_path, test_data):
+    """Test that a Parquet hand-off file keeps its datetime dtypes"""
+    df = pd.DataFrame(test_data)
+    df['tpep_pickup_datetime'] = pd.to_datetime(df['tpep_pickup_datetime'])
+    parquet_path = os.path.join(tmp_path, "test_taxi_data.parquet")
+    df.to_parquet(parquet_path, index=False)
+
+    analyzer = TaxiDataAnalyzer(parquet_path, charts_dir=os.path.join(tmp_path, "charts"))
+    analyzer.load_data()
+    assert len(analyzer.df) == len(df)
+    assert pd.api.types.is_datetime64_any_dtype(analyzer.df['tpep_pickup_datetime'])
 
 def test_density_chart_creation(analyzer):
     """Test density chart creation"""
     analyzer.create_density_chart('fare_amount', 'Test_Density_Chart')
     assert os.path.exists(os.path.join(analyzer.charts_dir, f'Test_Density_Chart.{chart_output_format}'))
 
+def test_density_chart_embeds_only_the_grid(analyzer):
+    """The density chart carries the KDE grid rather than the rows, and the grid matches an exact KDE"""
+    analyzer.df = pd.concat([analyzer.df] * 50, ignore_index=True)
+    with patch.object(alt.Chart, "save", autospec=True) as save:
+        analyzer.create_density_chart('fare_amount', 'Test_Density_Chart')
+    chart = save.call_args[0][0]
+    assert len(chart.data) == DEFAULT_STEPS
+
+    fares = analyzer.df['fare_amount'].to_numpy()
+    exact = gaussian_kde(fares, bw_method=scott_bandwidth(fares) / fares.std(ddof=1))
+    np.testing.assert_allclose(chart.data['density'], exact(chart.data['fare_amount']), rtol=1e-3, atol=1e-5)
+
 def test_correlation_plot_creation(analyzer):
     """Test correlation plot creation"""
     analyzer.split_dataset(test_size=0.5, random_state=42)
@@ -150,6 +189,35 @@ def test_correlation_plot_creation(analyzer):
     assert os.path.exists(os.path.join(analyzer.charts_dir, 
                                      f'Correlation_Plot_Train_Spearman.{chart_output_format}'))
 
+def test_streaming_correlation_plot_matches_pandas(test_data, tmp_path):
+    """Correlations streamed from monthly files in small chunks match pandas on the whole frame"""
+    df = pd.DataFrame(test_data)
+    paths = []
+    for month, part in enumerate([df.iloc[:12], df.iloc[12:]]):
+        paths.append(os.path.join(tmp_path, f"month_{month}.csv"))
+        part.to_csv(paths[-1], index=False)
+    analyzer = TaxiDataAnalyzer(paths[0], charts_dir=os.path.join(tmp_path, "charts"), cache_dir=None)
+    numeric = df.select_dtypes(include="number")
+    for method in ("pearson", "spearman"):
+        with patch.object(alt.Chart, "save", autospec=True) as save:
+            analyzer.create_streaming_correlation_plot(method, paths, chunk_size=5)
+        streamed = save.call_args[0][0].data.set_index(["level_0", "level_1"])["corr"]
+        expected = numeric.corr(method=method).stack()
+        if method == "spearman":
+            # pandas re-ranks columns with nulls for every pair; the streamed ranks are per column
+            complete = numeric.columns[numeric.notna().all()]
+            streamed = streamed[streamed.index.get_level_values(0).isin(complete)
+                                & streamed.index.get_level_values(1).isin(complete)]
+        pd.testing.assert_series_equal(streamed, expected[streamed.index], check_names=False)
+
+    # Partial results of separate months merge into the result of the whole
+    parts = [StreamingCorrelation(numeric.columns).update(part) for part in (numeric.iloc[:12], numeric.iloc[12:])]
+    merged = parts[0].merge(parts[1])
+    pd.testing.assert_frame_equal(merged.pearson(), numeric.corr())
+    complete = numeric.dropna(axis=1)
+    pd.testing.assert_frame_equal(merged.spearman([numeric]).loc[complete.columns, complete.columns],
+                                  complete.corr(method="spearman"))
+
 def test_missing_values_visualization(analyzer):
     """Test missing values visualization"""
     analyzer.split_dataset(test_size=0.5, random_state=42)
@@ -157,6 +225,95 @@ def test_missing_values_visualization(analyzer):
     assert os.path.exists(os.path.join(analyzer.charts_dir, 
                                      f'Missing_Values_Heatmap_Train.{chart_output_format}'))
 
+def test_missing_values_heatmap_is_binned(analyzer):
+    """The heatmap holds null rates per row bin or time bucket, not one record per cell"""
+    analyzer.df = pd.concat([analyzer.df] * 1000, ignore_index=True)
+    with patch.object(alt.Chart, "save", autospec=True) as save:
+        analyzer.visualize_missing_values(subset='all', bins=50)
+        analyzer.visualize_missing_values(subset='all', time_column='tpep_pickup_datetime', freq='D')
+    binned, bucketed = (call[0][0].data for call in save.call_args_list)
+    assert len(binned) == 50 * analyzer.df.shape[1]
+    for rates in (binned, bucketed):
+        weighted = (rates['null_rate'] * rates['rows']).groupby(rates['variable']).sum()
+        pd.testing.assert_series_equal(weighted, analyzer.df.isna().sum().astype(float).sort_index(),
+                                       check_names=False)
+
+def test_missing_values_heatmap_mode(analyzer):
+    """Small frames keep the per-row heatmap by default, and either heatmap can be chosen explicitly"""
+    with patch.object(alt.Chart, "save", autospec=True) as save:
+        analyzer.visualize_missing_values(subset='all')
+        analyzer.visualize_missing_values(subset='all', mode='binned', bins=5)
+        analyzer.visualize_missing_values(subset='all', mode='rows', bins=5)
+        with pytest.raises(ValueError, match="Unknown missing values mode"):
+            analyzer.visualize_missing_values(subset='all', mode='sampled')
+    per_row, binned, forced = (call[0][0] for call in save.call_args_list)
+    assert len(per_row.data) == len(forced.data) == analyzer.df.size
+    assert per_row.width == len(analyzer.df)
+    assert len(binned.data) == 5 * analyzer.df.shape[1]
+
+def test_charts_render_on_a_process_pool(test_csv, tmp_path):
+    """With several workers, charts are queued during the run and rendered in every format at the end"""
+    renderer = ChartRenderer(workers=2, formats=["png", "svg"])
+    analyzer = TaxiDataAnalyzer(test_csv, charts_dir=os.path.join(tmp_path, "charts"), renderer=renderer,
+                                processed_dir=os.path.join(tmp_path, "processed"))
+    analyzer.load_data()
+    analyzer.create_density_chart('fare_amount', 'Test_Density_Chart')
+    assert len(renderer.queue) == 2 and not os.listdir(analyzer.charts_dir)
+
+    analyzer.split_dataset(test_size=0.5, random_state=42)
+    analyzer.create_correlation_plot(subset='train')
+    analyzer.render_charts()
+    expected = {f"{chart}.{file_format}" for chart in ("Test_Density_Chart", "Correlation_Plot_Train_Spearman")
+                for file_format in ("png", "svg")}
+    assert expected <= set(os.listdir(analyzer.charts_dir))
+    assert {f"{timing['chart']}.{timing['format']}" for timing in renderer.timings} == expected
+    assert not renderer.queue
+
+def test_unchanged_charts_are_copied_from_the_cache(analyzer, tmp_path):
+    """A chart whose spec, format and scale are unchanged is written from the cache without rendering"""
+    analyzer.renderer = ChartRenderer(cache_dir=os.path.join(tmp_path, "chart_cache"))
+    analyzer.create_density_chart('fare_amount', 'Test_Density_Chart')
+    path = os.path.join(analyzer.charts_dir, 'Test_Density_Chart.png')
+    with open(path, "rb") as f:
+        rendered = f.read()
+    os.remove(path)
+
+    with patch.object(alt.Chart, "save", autospec=True) as save:
+        analyzer.create_density_chart('fare_amount', 'Test_Density_Chart')
+        assert not save.called
+        with open(path, "rb") as f:
+            assert f.read() == rendered
+        assert analyzer.renderer.timings[-1]["cached"]
+
+        # Different data, or another scale, is rendered again
+        analyzer.df['fare_amount'] = analyzer.df['fare_amount'] * 2
+        analyzer.create_density_chart('fare_amount', 'Test_Density_Chart')
+        analyzer.renderer.scale_factor = 2.0
+        analyzer.create_density_chart('fare_amount', 'Test_Density_Chart')
+        assert save.call_count == 2
+
+    # Exports beyond the size cap are evicted, least recently used first
+    renderer = ChartRenderer(cache_dir=os.path.join(tmp_path, "chart_cache"), cache_max_bytes=len(rendered))
+    renderer.save(alt.Chart(pd.DataFrame({'x': [1, 2]})).mark_point().encode(x='x:Q'),
+                  os.path.join(tmp_path, 'Other.png'))
+    assert [entry["source"] for entry in renderer.cache.entries()] == [os.path.join(tmp_path, 'Other.png')]
+
+def test_pre_aggregate_mode_and_row_limit(test_csv, tmp_path):
+    """Pre-aggregation falls back to inline data without VegaFusion, and oversized charts fail before rendering"""
+    analyzer = TaxiDataAnalyzer(test_csv, charts_dir=os.path.join(tmp_path, "charts"), cache_dir=None, max_rows=100)
+    assert analyzer.transform_mode == ("pre-aggregate" if vegafusion_available() else "inline")
+    analyzer.load_data()
+    analyzer.renderer = ChartRenderer(workers=2)
+    with pytest.raises(alt.MaxRowsError):
+        analyzer.create_density_chart('fare_amount', 'Test_Density_Chart')
+    assert not analyzer.renderer.queue
+
+    analyzer.max_rows = None
+    analyzer.create_density_chart('fare_amount', 'Test_Density_Chart')
+    assert len(analyzer.renderer.queue) == 1
+    # The global data transformer is left as it was
+    assert alt.data_transformers.active == "default" and "max_rows" not in alt.data_transformers.options
+
 def test_schema_validation(analyzer):
     """Test data schema validation"""
     analyzer.split_dataset(test_size=0.5, random_state=42)
@@ -193,3 +350,62 @@ def test_display_summary_statistics(analyzer):
     assert invalid_stats is None  # Should return None for invalid subset
     
 
+
+def test_binned_heatmap_of_a_wide_frame_fits_the_row_limit(test_csv, tmp_path):
+    """The heatmap of a frame with more than 25 columns gets fewer bins rather than failing the 5000-row limit"""
+    analyzer = TaxiDataAnalyzer(test_csv, charts_dir=os.path.join(tmp_path, "charts"), cache_dir=None,
+                                renderer=ChartRenderer(workers=2), transform_mode="inline")
+    rng = np.random.default_rng(0)
+    analyzer.df = pd.DataFrame(np.where(rng.random((10000, 40)) < 0.1, np.nan, 1.0),
+                               columns=[f"column_{i}" for i in range(40)])
+    analyzer.visualize_missing_values(subset='all')
+    spec, = (spec for spec, _, _, _ in analyzer.renderer.queue)
+    assert len(next(iter(spec["datasets"].values()))) == 5000 // 40 * 40
+
+def test_data_loading_projection_and_filters(test_csv, tmp_path):
+    """Test that only the declared columns and matching rows are loaded"""
+    analyzer = TaxiDataAnalyzer(test_csv, charts_dir=os.path.join(tmp_path, "charts"),
+                                columns=['trip_distance', 'fare_amount'],
+                                filters=["fare_amount >= 30"])
+    analyzer.load_data()
+    assert list(analyzer.df.columns) == ['trip_distance', 'fare_amount']
+    assert len(analyzer.df) == 5
+    assert analyzer.df['fare_amount'].min() >= 30
+
+def test_run_all_reads_only_the_analyzed_rows_and_columns(test_csv, tmp_path):
+    """The run-all command projects the columns the analysis uses and drops negative fares in the reader"""
+    with patch.object(TaxiDataAnalyzer, "run_all", autospec=True) as run_all:
+        result = CliRunner().invoke(cli, ["run-all", test_csv, "--charts_dir", str(tmp_path / "charts"),
+                                          "--cache_dir", ""])
+    assert result.exit_code == 0, result.output
+    analyzer = run_all.call_args.args[0]
+    assert analyzer.columns == EDA_COLUMNS and analyzer.filters == list(EDA_FILTERS)
+    analyzer.load_data()
+    assert list(analyzer.df.columns) == EDA_COLUMNS
+    assert analyzer.df['fare_amount'].min() >= 0
+
+def test_split_dataset_writes_the_same_split_as_run_all(test_csv, tmp_path):
+    """The split-dataset command splits the same rows as run-all, so either can write the split files"""
+    df = pd.read_csv(test_csv)
+    df.loc[0, 'fare_amount'] = -5.0
+    path = tmp_path / "negative_fare.csv"
+    df.to_csv(path, index=False)
+    for command in ["run-all", "split-dataset"]:
+        result = CliRunner().invoke(cli, [command, str(path), "--charts_dir", str(tmp_path / "charts"),
+                                          "--cache_dir", "", "--processed_dir", str(tmp_path / command)])
+        assert result.exit_code == 0, result.output
+    for name in ["X_train", "y_train", "X_test", "y_test"]:
+        pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / "split-dataset" / f"{name}.parquet"),
+                                      pd.read_parquet(tmp_path / "run-all" / f"{name}.parquet"))
+
+def test_data_loading_compact_dtypes(analyzer, test_csv):
+    """Test that loaded data uses compact dtypes without changing any value"""
+    raw = pd.read_csv(test_csv)
+    df = analyzer.df
+    assert df['VendorID'].dtype == 'uint8'
+    assert df['PULocationID'].dtype.itemsize <= 2
+    assert isinstance(df['store_and_fwd_flag'].dtype, pd.CategoricalDtype)
+    assert df['passenger_count'].dtype == 'float32'
+    assert df['fare_amount'].dtype == 'float64'  # cents do not survive float32
+    pd.testing.assert_frame_equal(df.astype(raw.dtypes.to_dict()), raw)
+    assert df.memory_usage(deep=True).sum() < raw.memory_usage(deep=True).sum()
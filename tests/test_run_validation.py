@@ -1,10 +1,18 @@
+import json
 import os
 import sys
 import pytest
 import yaml
+import numpy as np
+import pandas as pd
+import pandera as pa
 from unittest.mock import patch
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from scripts.run_validation import load_config, main
+from src.data_io import DataCache, DuplicateIndex
+from src.validation import CorrelationValidator, DataValidator, NativeSchemaValidator, get_taxi_data_schema, read_taxi_csv
+from src.validation.correlation import spearman_blocks
+from src.validation.quarantine import summarize_failures
 from click.testing import CliRunner
 
 @pytest.fixture
@@ -53,4 +61,430 @@ def test_load_config_failure():
     Test loading an invalid YAML config file.
     """
     with pytest.raises(SystemExit):
-        load_config("non_existent_config.yaml")
\ No newline at end of file
+        load_config("non_existent_config.yaml")
+@pytest.fixture
+def trips_csv(tmp_path):
+    """
+    Small taxi CSV with nulls in nullable columns.
+    """
+    path = tmp_path / "trips.csv"
+    path.write_text(
+        "VendorID,tpep_pickup_datetime,tpep_dropoff_datetime,passenger_count,store_and_fwd_flag,fare_amount\n"
+        "2,2024-01-30 17:40:12,2024-01-30 17:47:05,2.0,N,7.9\n"
+        "1,2024-01-29 12:25:03,2024-01-29 12:53:32,,,34.73\n"
+    )
+    return str(path)
+
+def test_typed_csv_read_matches_schema(trips_csv):
+    """
+    The schema-driven CSV reader returns the dtypes pandera would coerce to.
+    """
+    df = read_taxi_csv(trips_csv)
+    schema = get_taxi_data_schema()
+    for column in df.columns:
+        assert str(df[column].dtype) == str(schema.columns[column].dtype).replace("str", "object")
+    assert df["store_and_fwd_flag"].isna().sum() == 1
+    assert df["tpep_pickup_datetime"].iloc[0] == pd.Timestamp("2024-01-30 17:40:12")
+
+def test_load_data_falls_back_on_untyped_values(tmp_path, trips_csv):
+    """
+    Values that do not fit the schema types are still loaded for the checks to report.
+    """
+    with open(trips_csv, "a") as f:
+        f.write("unknown,2024-01-29 12:25:03,2024-01-29 12:53:32,1.0,Y,5.0\n")
+    validator = DataValidator(target="VendorID", log_file=str(tmp_path / "validation.log"), cache_dir=None)
+    df = validator.load_data(trips_csv, "csv")
+    assert len(df) == 3
+
+@pytest.fixture
+def taxi_csv(tmp_path):
+    """
+    Taxi CSV with one unknown vendor, one pickup after dropoff and a duplicate
+    of the first row at the end of the file.
+    """
+    n = 9
+    df = pd.DataFrame({
+        "VendorID": [1, 2] * 4 + [1],
+        "tpep_pickup_datetime": pd.date_range("2024-01-01 08:00", periods=n, freq="h"),
+        "tpep_dropoff_datetime": pd.date_range("2024-01-01 08:20", periods=n, freq="h"),
+        "passenger_count": [1.0] * n,
+        "trip_distance": [float(i) for i in range(1, n + 1)],
+        "RatecodeID": [1.0] * n,
+        "store_and_fwd_flag": ["N"] * n,
+        "PULocationID": [100 + i for i in range(n)],
+        "DOLocationID": [200] * n,
+        "payment_type": [1] * n,
+        "fare_amount": [10.0 + i for i in range(n)],
+        "extra": [0.5] * n,
+        "mta_tax": [0.5] * n,
+        "tip_amount": [1.0] * n,
+        "tolls_amount": [0.0] * n,
+        "improvement_surcharge": [1.0] * n,
+        "total_amount": [20.0] * n,
+        "congestion_surcharge": [2.5] * n,
+        "Airport_fee": [0.0] * n,
+    })
+    df.loc[3, "VendorID"] = 3
+    df.loc[6, "tpep_pickup_datetime"] = df.loc[6, "tpep_dropoff_datetime"] + pd.Timedelta(minutes=5)
+    df.iloc[8] = df.iloc[0]
+    path = tmp_path / "taxi.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+def test_chunked_validation_matches_single_shot(tmp_path, taxi_csv):
+    """
+    Chunked validation drops the same rows as validating the whole file,
+    including duplicates that span chunks.
+    """
+    validator = DataValidator(target="VendorID", log_file=str(tmp_path / "validation.log"), cache_dir=None)
+    single_shot = validator.run_validation(taxi_csv)
+    chunked = validator.run_validation(taxi_csv, chunk_size=2)
+
+    assert len(single_shot) == 6
+    pd.testing.assert_frame_equal(chunked, single_shot)
+
+@pytest.mark.parametrize("chunk_size", [2, 10])
+def test_chunked_validation_falls_back_on_untyped_values(tmp_path, taxi_csv, chunk_size):
+    """
+    A cell the schema types cannot hold rejects only its own row, whether the file
+    is validated in chunks or at once.
+    """
+    df = pd.read_csv(taxi_csv)
+    df["VendorID"] = df["VendorID"].astype(object)
+    df.loc[5, "VendorID"] = "abc"
+    df.to_csv(taxi_csv, index=False)
+    validator = DataValidator(target="VendorID", log_file=str(tmp_path / "validation.log"), cache_dir=None)
+    single_shot = validator.run_validation(taxi_csv)
+    chunked = validator.run_validation(taxi_csv, chunk_size=chunk_size)
+
+    assert len(single_shot) == 5
+    pd.testing.assert_frame_equal(chunked, single_shot)
+
+def test_chunked_validation_reports_global_rows(tmp_path, taxi_csv, caplog):
+    """
+    Failure cases from later chunks carry their row number in the whole file.
+    """
+    validator = DataValidator(target="VendorID", log_file=str(tmp_path / "validation.log"), cache_dir=None,
+                              quarantine_dir=str(tmp_path / "quarantine"))
+    chunks = validator.iter_chunks(taxi_csv, "csv", chunk_size=4)
+    with caplog.at_level("ERROR"):
+        validator.validate_chunks(chunks, name="taxi")
+    failure_cases = pd.read_parquet(tmp_path / "quarantine" / "taxi_failure_cases.parquet")
+    assert {3, 6} <= set(failure_cases["index"])
+    assert "[6]" in caplog.text
+
+@pytest.mark.parametrize("backend", ["pandera", "native"])
+@pytest.mark.parametrize("null_fares, reported", [(1, False), (3, True)])
+def test_chunked_null_rate_is_checked_over_the_whole_file(tmp_path, taxi_csv, backend, null_fares, reported):
+    """
+    The fare_amount null-rate check is evaluated once over all chunks: one null in 200 fares
+    passes although its chunk of 4 rows is 25% null, while 3 nulls (1.5%) fail once.
+    """
+    trips = pd.concat([read_taxi_csv(taxi_csv).iloc[[0]]] * 200, ignore_index=True)
+    trips["trip_distance"] = np.arange(1, 201, dtype=float)
+    trips.loc[:null_fares - 1, "fare_amount"] = np.nan
+    path = tmp_path / "trips.csv"
+    trips.to_csv(path, index=False)
+
+    null_rate = "Too many null values (>1%) in fare_amount column."
+    reports = []
+    for chunk_size in [None, 4]:
+        validator = DataValidator(target="VendorID", log_file=str(tmp_path / "validation.log"), cache_dir=None,
+                                  backend=backend)
+        with patch.object(validator, "_report_failures", wraps=validator._report_failures) as report_failures:
+            validated_df = validator.run_validation(str(path), chunk_size=chunk_size)
+        failure_cases = report_failures.call_args.args[0]
+        reports.append(failure_cases)
+        assert len(validated_df) == 200 - null_fares
+        assert (failure_cases["check"] == null_rate).sum() == reported
+    assert set(reports[0]["check"]) == set(reports[1]["check"])
+
+@pytest.mark.filterwarnings("error::FutureWarning")
+def test_failure_summary_counts_frame_wide_failures_once_per_row():
+    """
+    Frame-wide failures count once per row, and summarizing failure cases with no frame-wide or no
+    column failures raises no pandas FutureWarning about empty or all-null frames.
+    """
+    column_failures = pd.DataFrame({
+        "schema_context": ["Column"], "column": ["fare_amount"], "check": ["greater_than_or_equal_to(0)"],
+        "check_number": [0], "failure_case": [-1.0], "index": [3],
+    })
+    frame_failures = pd.DataFrame({
+        "schema_context": ["DataFrameSchema"] * 3, "column": ["VendorID", "fare_amount", "VendorID"],
+        "check": ["Duplicate rows found."] * 3, "check_number": [0] * 3, "failure_case": [1.0, 2.0, 1.0],
+        "index": [5, 5, 6],
+    })
+    assert summarize_failures(column_failures)["failures"].tolist() == [1]
+    assert summarize_failures(frame_failures)["sample_rows"].tolist() == [[5, 6]]
+    summary = summarize_failures(pd.concat([column_failures, frame_failures], ignore_index=True))
+    assert dict(zip(summary["check"], summary["failures"])) == {"Duplicate rows found.": 2,
+                                                               "greater_than_or_equal_to(0)": 1}
+
+@pytest.mark.parametrize("chunk_size", [None, 4])
+def test_rejected_rows_are_quarantined(tmp_path, taxi_csv, chunk_size):
+    """
+    Rows dropped as invalid are written to the quarantine with their row number in the file.
+    """
+    quarantine_dir = tmp_path / "quarantine"
+    validator = DataValidator(target="VendorID", log_file=str(tmp_path / "validation.log"), cache_dir=None,
+                              quarantine_dir=str(quarantine_dir))
+    validated_df = validator.run_validation(taxi_csv, chunk_size=chunk_size)
+    rejected = pd.read_parquet(quarantine_dir / "taxi_rejected_rows.parquet")
+    failure_cases = pd.read_parquet(quarantine_dir / "taxi_failure_cases.parquet")
+    assert set(rejected["row"]) == set(failure_cases["index"].dropna().astype(int))
+    assert len(validated_df) + len(rejected) <= len(read_taxi_csv(taxi_csv))
+
+@pytest.mark.parametrize("chunk_size", [None, 2])
+def test_native_backend_matches_pandera(tmp_path, taxi_csv, chunk_size):
+    """
+    The native backend drops the same rows as the pandera backend.
+    """
+    log_file = str(tmp_path / "validation.log")
+    pandera_df = DataValidator(target="VendorID", log_file=log_file, cache_dir=None).run_validation(
+        taxi_csv, chunk_size=chunk_size
+    )
+    native_df = DataValidator(target="VendorID", log_file=log_file, cache_dir=None, backend="native").run_validation(
+        taxi_csv, chunk_size=chunk_size
+    )
+    pd.testing.assert_frame_equal(native_df, pandera_df)
+
+def test_native_validator_reports_failing_rows(taxi_csv):
+    """
+    The native result flags the invalid rows and counts failures per check.
+    """
+    result = NativeSchemaValidator().validate(read_taxi_csv(taxi_csv))
+    assert not result.passed
+    assert set(result.valid.nonzero()[0]) == set(range(9)) - {3, 6}
+    report = result.report().set_index("column")
+    assert report.loc["VendorID", "failures"] == 1
+
+def test_unknown_backend_raises(tmp_path):
+    with pytest.raises(ValueError, match="Unknown validation backend"):
+        DataValidator(target="VendorID", log_file=str(tmp_path / "validation.log"), backend="polars")
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_parallel_column_checks_match_serial(tmp_path, taxi_csv, executor):
+    """
+    Running column checks on a pool drops the same rows and reports the same failures.
+    """
+    log_file = str(tmp_path / "validation.log")
+    df = read_taxi_csv(taxi_csv)
+    serial = DataValidator(target="VendorID", log_file=log_file, cache_dir=None)
+    parallel = DataValidator(target="VendorID", log_file=log_file, cache_dir=None, executor=executor, max_workers=2)
+
+    _, serial_invalid, serial_failures = serial._run_schema(df)
+    _, parallel_invalid, parallel_failures = parallel._run_schema(df)
+    parallel.parallel_validator.shutdown()
+
+    assert set(parallel_invalid) == set(serial_invalid)
+    assert list(parallel_failures.columns) == list(serial_failures.columns)
+    key = ["column", "check", "index"]
+    pd.testing.assert_frame_equal(
+        parallel_failures.sort_values(key).reset_index(drop=True)[key],
+        serial_failures.sort_values(key).reset_index(drop=True)[key],
+    )
+    pd.testing.assert_frame_equal(
+        parallel.run_validation(taxi_csv), serial.run_validation(taxi_csv)
+    )
+
+def test_shared_duplicate_index_drops_rows_seen_in_earlier_files(tmp_path, taxi_csv):
+    """
+    Validating the same file twice with a shared index keeps no rows the second time.
+    """
+    validator = DataValidator(target="VendorID", log_file=str(tmp_path / "validation.log"), cache_dir=None,
+                              duplicate_index=DuplicateIndex())
+    assert len(validator.run_validation(taxi_csv)) == 6
+    assert len(validator.run_validation(taxi_csv, chunk_size=4)) == 0
+
+def test_incremental_validation_reuses_unchanged_chunks(tmp_path, taxi_csv):
+    """
+    Re-validating skips chunks whose content and settings are unchanged,
+    and gives the same result.
+    """
+    def make_validator():
+        return DataValidator(target="VendorID", log_file=str(tmp_path / "validation.log"),
+                             cache_dir=str(tmp_path / "cache"), chunk_size=4, incremental=True)
+
+    first = make_validator().run_validation(taxi_csv)
+
+    validator = make_validator()
+    with patch.object(validator, "_evaluate_schema", wraps=validator._evaluate_schema) as evaluate:
+        second = validator.run_validation(taxi_csv)
+        assert evaluate.call_count == 0
+        pd.testing.assert_frame_equal(second, first)
+
+        # Appending rows only re-validates the chunks that changed
+        df = pd.read_csv(taxi_csv)
+        pd.concat([df, df.iloc[[1, 2, 4]].assign(PULocationID=[300, 301, 302])]).to_csv(taxi_csv, index=False)
+        validator.run_validation(taxi_csv)
+        assert evaluate.call_count == 1
+
+        # A different threshold is a different cache key
+        validator.correlation_validator.feature_threshold = 0.5
+        validator.run_validation(taxi_csv)
+        assert evaluate.call_count == 4
+
+def test_incremental_parquet_validation_keys_chunks_on_row_group_content(tmp_path, taxi_csv):
+    """
+    Chunks of a Parquet file are looked up by their row group's statistics and compressed bytes,
+    without hashing their rows, so appending rows to the file only validates the new row group.
+    """
+    trips = read_taxi_csv(taxi_csv)
+    parquet_path = str(tmp_path / "taxi.parquet")
+    trips.iloc[:8].to_parquet(parquet_path, row_group_size=4)
+
+    def make_validator():
+        return DataValidator(target="VendorID", log_file=str(tmp_path / "validation.log"),
+                             cache_dir=str(tmp_path / "cache"), chunk_size=3, incremental=True)
+
+    first = make_validator().run_validation(parquet_path)
+    validator = make_validator()
+    with patch.object(validator, "_evaluate_schema", wraps=validator._evaluate_schema) as evaluate, \
+            patch("src.validation.validate.chunk_fingerprint", side_effect=AssertionError("rows hashed")):
+        pd.testing.assert_frame_equal(validator.run_validation(parquet_path), first)
+        assert evaluate.call_count == 0
+
+        # The rewritten file keeps its two row groups of 4 rows and gains a third of 1 row
+        trips.to_parquet(parquet_path, row_group_size=4)
+        os.utime(parquet_path, ns=(0, 0))
+        appended = validator.run_validation(parquet_path)
+        assert evaluate.call_count == 1
+    fresh = DataValidator(target="VendorID", log_file=str(tmp_path / "validation.log"), cache_dir=None, chunk_size=3)
+    pd.testing.assert_frame_equal(appended, fresh.run_validation(parquet_path))
+
+@pytest.fixture
+def correlated_trips():
+    """Trips where fare tracks distance, the vendor is random and tip_bucket copies the vendor"""
+    rng = np.random.default_rng(0)
+    n = 2000
+    distance = rng.exponential(3.0, n)
+    vendor = rng.integers(1, 3, n)
+    return pd.DataFrame({
+        "VendorID": vendor,
+        "trip_distance": distance,
+        "fare_amount": 3.0 + 2.5 * distance + rng.normal(0, 0.1, n),
+        "tip_amount": rng.exponential(2.0, n),
+        "tip_bucket": np.where(vendor == 1, "low", "high"),
+    })
+
+def test_numpy_spearman_matches_pandas(correlated_trips):
+    numeric = correlated_trips[["trip_distance", "fare_amount", "tip_amount"]]
+    _, block = next(spearman_blocks(numeric.to_numpy()))
+    np.testing.assert_allclose(block, numeric.corr(method="spearman").to_numpy(), atol=1e-12)
+
+def test_numpy_correlation_backend_flags_breaches(correlated_trips):
+    validator = CorrelationValidator("VendorID", backend="numpy")
+    independent = correlated_trips[["VendorID", "trip_distance", "tip_amount"]]
+    validator.run_all_checks(independent)
+
+    breaches = validator.numpy_backend.feature_feature_breaches(correlated_trips, "VendorID", 0.8)
+    assert ("trip_distance", "fare_amount") == breaches[0][:2]
+    with pytest.raises(ValueError, match="Feature-Feature"):
+        validator.check_feature_feature_correlation(correlated_trips.drop(columns="tip_bucket"))
+
+    scores = validator.numpy_backend.feature_label_scores(correlated_trips, "VendorID")
+    assert scores.index[0] == "tip_bucket" and scores.iloc[0] == pytest.approx(1.0)
+    with pytest.raises(ValueError, match="Feature-Label"):
+        validator.check_feature_label_correlation(correlated_trips)
+
+def test_pps_backend_scores_pairs_once(tmp_path, correlated_trips):
+    """
+    The pps backend flags the correlated pair and, with a cache, never scores an unchanged pair twice.
+    """
+    cache = DataCache(str(tmp_path / "cache"))
+    validator = CorrelationValidator("VendorID", backend="pps", pps_sample_size=500, max_workers=2, cache=cache)
+    with pytest.raises(ValueError, match="Feature-Label"):
+        validator.run_all_checks(correlated_trips)
+    label_scores, pair_scores = validator.pps_backend.scores(correlated_trips, "VendorID")
+    assert label_scores.index[0] == "tip_bucket"
+    assert set(pair_scores.iloc[0, :2]) == {"trip_distance", "fare_amount"}
+
+    rerun = CorrelationValidator("VendorID", backend="pps", pps_sample_size=500, cache=cache)
+    with patch("src.validation.pps.ProcessPoolExecutor", side_effect=AssertionError("scored again")):
+        cached_label_scores, _ = rerun.pps_backend.scores(correlated_trips, "VendorID")
+    pd.testing.assert_series_equal(cached_label_scores, label_scores)
+
+@pytest.mark.parametrize("backend", ["pandera", "native"])
+def test_profile_records_every_step(tmp_path, taxi_csv, backend):
+    """
+    Profiling writes per-step timings next to the log and a folded-stack flamegraph profile.
+    """
+    validator = DataValidator(target="VendorID", log_file=str(tmp_path / "validation.log"), cache_dir=None,
+                              backend=backend, chunk_size=4, profile=True, flamegraph=True)
+    validator.run_validation(taxi_csv)
+    with open(tmp_path / "validation_profile.json") as f:
+        steps = {step["step"]: step for step in json.load(f)["steps"]}
+    assert steps["taxi;load"]["rows"] == len(read_taxi_csv(taxi_csv))
+    assert steps["taxi;schema"]["calls"] == steps["taxi;load"]["calls"] - 1
+    checks = [step for step in steps.values() if step["kind"] == "column_check"]
+    assert any(step["step"].endswith(";VendorID;isin([1, 2])") for step in checks)
+    assert any(step["kind"] == "frame_check" for step in steps.values())
+    assert all(step["peak_memory_mb"] >= 0 for step in steps.values())
+    folded = (tmp_path / "validation_profile.folded").read_text().splitlines()
+    assert len(folded) == len(steps)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in folded)
+
+def test_pandera_profile_times_pandera_checks(tmp_path, taxi_csv):
+    """
+    Profiling the pandera backend times pandera's own checks, without running the native evaluator.
+    """
+    validator = DataValidator(target="VendorID", log_file=str(tmp_path / "validation.log"), cache_dir=None,
+                              profile=True)
+    with patch.object(NativeSchemaValidator, "validate", side_effect=AssertionError("native checks ran")):
+        validator.run_validation(taxi_csv)
+    steps = {step["step"]: step for step in validator.profiler.report()}
+    assert "taxi;schema;VendorID;isin([1, 2])" in steps
+    assert "taxi;schema;Duplicate rows found." in steps
+    assert not any(";checks" in step for step in steps)
+    assert pa.Check.__call__.__qualname__ == "Check.__call__"
+    # Only a copy of the schema is timed
+    assert all(type(check) is pa.Check for check in validator.schema.checks)
+    assert all(type(check) is pa.Check for column in validator.schema.columns.values() for check in column.checks)
+
+def test_fused_schemas_match_separate_evaluation():
+    """
+    Fusing the validation_2_4_8 schemas attributes failures per schema exactly as evaluating each
+    one alone, while their shared duplicate check hashes the rows once.
+    """
+    from src.validation import validation_2_4_8
+    df = pd.DataFrame({
+        "trip_distance": [1.0, 2.0, -1.0, 1.0],
+        "fare_amount": [1.0, None, 3.0, 1.0],
+        "VendorID": [1, 2, 3, 1],
+        "RatecodeID": [1.0, 2.0, 9.0, 1.0],
+        "Store_and_fwd_flag": ["N", "Y", None, "N"],
+        "Payment_type": [1, 2, 3, 1],
+    })
+    fused = validation_2_4_8.fused_validation()
+    with patch.object(validation_2_4_8, "duplicated_rows", wraps=validation_2_4_8.duplicated_rows) as hashed:
+        result = fused.validate(df)
+    assert hashed.call_count == 1
+    for name, schema_function in [("column_name_validation", validation_2_4_8.column_name_validation),
+                                  ("threhold_validation", validation_2_4_8.threhold_validation),
+                                  ("category_level_validation", validation_2_4_8.category_level_validation)]:
+        separate = NativeSchemaValidator(schema_function()).validate(df)
+        assert result.results[name].failure_counts == separate.failure_counts
+        np.testing.assert_array_equal(result.results[name].valid, separate.valid)
+    assert result.failed_schemas == ["column_name_validation", "threhold_validation", "category_level_validation"]
+    assert set(result.report()["schema"]) == set(result.failed_schemas)
+
+def test_xlsx_is_streamed_and_converted_once(tmp_path, taxi_csv):
+    """
+    Excel input validates like the same rows in CSV, and later runs read the cached Parquet conversion.
+    """
+    from src.validation import validate
+    xlsx_path = str(tmp_path / "taxi.xlsx")
+    read_taxi_csv(taxi_csv).to_excel(xlsx_path, index=False)
+    log_file = str(tmp_path / "validation.log")
+    expected = DataValidator(target="VendorID", log_file=log_file, cache_dir=None).run_validation(taxi_csv)
+
+    streamed = DataValidator(target="VendorID", log_file=log_file, cache_dir=None).run_validation(
+        xlsx_path, chunk_size=4
+    )
+    pd.testing.assert_frame_equal(streamed, expected)
+
+    with patch.object(validate, "xlsx_to_parquet", wraps=validate.xlsx_to_parquet) as convert:
+        for chunk_size in [None, 4]:
+            validator = DataValidator(target="VendorID", log_file=log_file, cache_dir=str(tmp_path / "cache"))
+            pd.testing.assert_frame_equal(validator.run_validation(xlsx_path, chunk_size=chunk_size), expected)
+    assert convert.call_count == 1